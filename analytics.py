@@ -0,0 +1,440 @@
+"""
+Cross-run analytics over the reconciliation history.
+
+Every saved run of a named client also writes its row-level results (both
+sides: supplier, GSTIN, invoice, amounts in paise, matched or not) to a
+Parquet dataset under ``history/analytics/rows``, partitioned hive-style by
+period and client. A later run of the same client and period replaces that
+partition, so re-running a month never counts it twice. Runs without a
+client are kept in the history but not here: with nothing to tell two
+unnamed workbooks apart, one would replace the other.
+
+Next to it two rollup tables are kept current: per client, period, GSTIN and
+supplier (``supplier_month.parquet``) and per client and period
+(``month.parquet``). A run only re-aggregates its own partition, and the
+Home dashboard reads nothing but the rollups, so trends over years of runs
+come from a few small files instead of dozens of workbooks.
+
+    python analytics.py --backfill --client ACME   # add runs saved before the store
+    python analytics.py --rebuild      # recompute the rollups from the rows
+
+Needs pyarrow.
+"""
+
+import argparse
+import datetime
+import importlib.util
+import os
+import sys
+import tempfile
+import zipfile
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+import run_history
+from normalise import clean_gstin_col
+from reco_engine import TAX_COLS, to_paise
+
+
+STORE_NAME = "analytics"
+ROWS_NAME = "rows"
+SUPPLIER_ROLLUP = "supplier_month.parquet"
+MONTH_ROLLUP = "month.parquet"
+MANIFEST = "runs.parquet"
+
+# supplier rollup measures; BOOKS lines unless suffixed _2b, tax in paise
+MEASURES = ["lines", "matched", "unmatched", "tax", "unmatched_tax",
+            "lines_2b", "matched_2b", "unclaimed_tax_2b"]
+
+MANIFEST_COLUMNS = ["run_id", "client", "period", "created_at", "source_name",
+                    "rows", "current"]
+
+
+def require_pyarrow():
+    if importlib.util.find_spec("pyarrow") is None:
+        raise ImportError("The analytics store needs pyarrow: pip install pyarrow")
+
+
+def store_dir(folder=run_history.HISTORY_DIR):
+    return os.path.join(folder, STORE_NAME)
+
+
+def write_parquet(df, path):
+    # hidden temp name of its own: pyarrow datasets skip it, writers don't clash
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".", prefix=".",
+                                     suffix=".tmp", delete=False) as f:
+        df.to_parquet(f, index=False)
+    os.replace(f.name, path)
+
+
+def read_parquet(path, columns=None):
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path, columns=columns)
+
+
+# ==============================
+# Run -> rows
+# ==============================
+
+def invoice_dates(df):
+    if "Invoice_Date" not in df.columns:
+        return pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    return pd.to_datetime(df["Invoice_Date"], errors="coerce", dayfirst=True)
+
+
+def text(df, col):
+    if col not in df.columns:
+        return np.full(len(df), "", dtype=object)
+    s = df[col].astype(object)
+    return s.where(s.notna(), "").astype(str).to_numpy(dtype=object)
+
+
+def result_rows(gstr2b, books):
+    """
+    Row-level results of both prepared sides in the store's layout, one row
+    per line. Amounts stay in paise.
+    """
+    parts = []
+    for side, df in (("2B", gstr2b), ("BOOKS", books)):
+        amounts = df[TAX_COLS].to_numpy(dtype=np.int64)
+        parts.append(pd.DataFrame({
+            "side": side,
+            "gstin": clean_gstin_col(df).to_numpy(dtype=object),
+            "supplier": text(df, "Supplier_Name_CLEAN"),
+            "invoice_no": text(df, "Invoice_No_CLEAN"),
+            "invoice_date": invoice_dates(df).to_numpy(dtype="datetime64[ns]"),
+            "igst": amounts[:, 0],
+            "cgst": amounts[:, 1],
+            "sgst": amounts[:, 2],
+            "tax": amounts.sum(axis=1),
+            "matched": (df["RECO_REMARK"] == "MATCHED").to_numpy(),
+            "match_score": (pd.to_numeric(df["MATCH_SCORE"], errors="coerce").to_numpy()
+                            if "MATCH_SCORE" in df.columns else np.nan),
+        }))
+    rows = pd.concat(parts, ignore_index=True)
+    for col in ["side", "gstin", "supplier"]:
+        rows[col] = rows[col].astype("category")
+    return rows
+
+
+def run_period(rows, period=None, created_at=None):
+    """
+    "YYYY-MM" of a run: ``period`` when given, else the most common invoice
+    month of its lines, else the month it ran.
+    """
+    if period:
+        return str(period)[:7]
+    months = rows["invoice_date"].dropna().dt.strftime("%Y-%m")
+    if len(months):
+        return months.value_counts().index[0]
+    return str(created_at or datetime.date.today().isoformat())[:7]
+
+
+# ==============================
+# Rollups
+# ==============================
+
+def supplier_rollup(rows, client, period):
+    """One row per GSTIN / supplier of a run with the ``MEASURES``."""
+    books = (rows["side"] == "BOOKS").to_numpy()
+    matched = rows["matched"].to_numpy()
+    tax = rows["tax"].to_numpy()
+
+    flags = pd.DataFrame({
+        "gstin": rows["gstin"],
+        "supplier": rows["supplier"],
+        "lines": books,
+        "matched": books & matched,
+        "unmatched": books & ~matched,
+        "tax": np.where(books, tax, 0),
+        "unmatched_tax": np.where(books & ~matched, tax, 0),
+        "lines_2b": ~books,
+        "matched_2b": ~books & matched,
+        "unclaimed_tax_2b": np.where(~books & ~matched, tax, 0),
+    })
+    out = (
+        flags.groupby(["gstin", "supplier"], observed=True, sort=True)[MEASURES]
+        .sum().astype(np.int64).reset_index()
+    )
+    out["gstin"] = out["gstin"].astype(str)
+    out["supplier"] = out["supplier"].astype(str)
+    out.insert(0, "period", period)
+    out.insert(0, "client", client)
+    return out
+
+
+def month_rollup(suppliers):
+    """Client x period totals of a supplier rollup, with supplier counts."""
+    if suppliers.empty:
+        return pd.DataFrame(columns=["client", "period", "suppliers",
+                                     "suppliers_unmatched"] + MEASURES)
+    keys = ["client", "period"]
+    out = suppliers.groupby(keys, sort=True)[MEASURES].sum()
+    out.insert(0, "suppliers", suppliers.groupby(keys, sort=True).size())
+    out.insert(1, "suppliers_unmatched",
+               (suppliers["unmatched"] > 0).groupby([suppliers[k] for k in keys]).sum())
+    return out.reset_index()
+
+
+def replace_partition(path, new, client, period):
+    """Rewrite a rollup file with ``new`` in place of the (client, period) rows."""
+    old = read_parquet(path)
+    if old is not None:
+        old = old[~((old["client"] == client) & (old["period"] == period))]
+        new = pd.concat([old, new], ignore_index=True)
+    write_parquet(new.sort_values(["client", "period"], ignore_index=True), path)
+
+
+# ==============================
+# Recording runs
+# ==============================
+
+def record_run(run_id, gstr2b, books, client=None, period=None, created_at=None,
+               source_name=None, folder=run_history.HISTORY_DIR):
+    """
+    Store a run's rows in its (period, client) partition, replacing an
+    earlier run of the same partition, and update the rollups. Returns
+    ``(client, period)``.
+    """
+    require_pyarrow()
+    root = store_dir(folder)
+    client = run_history.client_key(client)
+    if not client:
+        raise ValueError("Only runs with a client are added to the analytics store")
+    rows = result_rows(gstr2b, books)
+    period = run_period(rows, period, created_at)
+
+    # partition files, rollups and manifest change together
+    with run_history.HISTORY_LOCK:
+        part = os.path.join(root, ROWS_NAME, f"period={period}", f"client={client}")
+        os.makedirs(part, exist_ok=True)
+        file_name = f"{run_id}.parquet"
+        write_parquet(rows, os.path.join(part, file_name))
+        for name in os.listdir(part):
+            if name != file_name:
+                os.remove(os.path.join(part, name))
+
+        suppliers = supplier_rollup(rows, client, period)
+        replace_partition(os.path.join(root, SUPPLIER_ROLLUP), suppliers, client, period)
+        replace_partition(os.path.join(root, MONTH_ROLLUP), month_rollup(suppliers), client, period)
+
+        manifest = read_parquet(os.path.join(root, MANIFEST))
+        entry = pd.DataFrame([{
+            "run_id": run_id, "client": client, "period": period,
+            "created_at": str(created_at or datetime.datetime.now().isoformat(timespec="seconds")),
+            "source_name": source_name, "rows": len(rows), "current": True,
+        }], columns=MANIFEST_COLUMNS)
+        if manifest is not None:
+            manifest = manifest[manifest["run_id"] != run_id]
+            manifest.loc[(manifest["client"] == client) & (manifest["period"] == period),
+                          "current"] = False
+            entry = pd.concat([manifest, entry], ignore_index=True)
+        write_parquet(entry, os.path.join(root, MANIFEST))
+    return client, period
+
+
+def read_export(file_name, data):
+    """``(gstr2b, books)`` frames of an exported run, amounts back in paise."""
+    if file_name.endswith(".zip"):
+        frames = {}
+        with zipfile.ZipFile(BytesIO(data)) as zf:
+            for name in zf.namelist():
+                stem, ext = os.path.splitext(name)
+                reader = pd.read_csv if ext == ".csv" else pd.read_parquet
+                frames[stem] = reader(BytesIO(zf.read(name)))
+    else:
+        frames = pd.read_excel(BytesIO(data), sheet_name=["GSTR_2B", "BOOKS"])
+
+    sides = []
+    for sheet in ("GSTR_2B", "BOOKS"):
+        df = frames[sheet]
+        for col in TAX_COLS:
+            df[col] = to_paise(pd.to_numeric(df[col], errors="coerce").fillna(0))
+        sides.append(df)
+    return tuple(sides)
+
+
+def run_client(run_id, folder=run_history.HISTORY_DIR):
+    """Client a saved run was made for, from its summary sidecar."""
+    sidecar = os.path.join(folder, f"{run_id}.summary.json")
+    if not os.path.exists(sidecar):
+        return None
+    return run_history.read_summary(sidecar).get("client")
+
+
+def backfill(folder=run_history.HISTORY_DIR, client=None, progress=None):
+    """
+    Record runs of the history index that the store hasn't seen, oldest
+    first, so the latest run of each partition ends up current. Runs saved
+    without a client are recorded for ``client``, or skipped without one.
+    Returns the number of runs added; unreadable exports are skipped.
+    """
+    require_pyarrow()
+    run_history.sync_index(folder)
+    manifest = read_parquet(os.path.join(store_dir(folder), MANIFEST), ["run_id"])
+    seen = set() if manifest is None else set(manifest["run_id"])
+
+    runs = run_history.list_runs(folder, limit=-1)
+    runs = runs[~runs["run_id"].isin(seen)].iloc[::-1]
+    added = 0
+    for run in runs.itertuples(index=False):
+        owner = run_client(run.run_id, folder) or client
+        if not run_history.client_key(owner):
+            continue
+        try:
+            file_name, data = run_history.read_run_bytes(run.run_id, folder)
+            gstr2b, books = read_export(file_name, data)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            continue
+        record_run(run.run_id, gstr2b, books, client=owner, created_at=run.created_at,
+                   source_name=run.source_name, folder=folder)
+        added += 1
+        if progress:
+            progress(added, len(runs))
+    return added
+
+
+def rebuild_rollups(folder=run_history.HISTORY_DIR):
+    """Recompute both rollups from the row partitions."""
+    require_pyarrow()
+    with run_history.HISTORY_LOCK:
+        root = store_dir(folder)
+        rows_dir = os.path.join(root, ROWS_NAME)
+        parts = []
+        for period_dir in sorted(os.listdir(rows_dir)) if os.path.isdir(rows_dir) else []:
+            for client_dir in sorted(os.listdir(os.path.join(rows_dir, period_dir))):
+                path = os.path.join(rows_dir, period_dir, client_dir)
+                for name in os.listdir(path):
+                    if name.startswith("."):
+                        continue  # temp file of an interrupted write
+                    parts.append(supplier_rollup(
+                        pd.read_parquet(os.path.join(path, name)),
+                        client_dir.partition("=")[2], period_dir.partition("=")[2],
+                    ))
+        suppliers = (pd.concat(parts, ignore_index=True) if parts
+                     else pd.DataFrame(columns=["client", "period", "gstin", "supplier"] + MEASURES))
+        os.makedirs(root, exist_ok=True)
+        write_parquet(suppliers, os.path.join(root, SUPPLIER_ROLLUP))
+        write_parquet(month_rollup(suppliers), os.path.join(root, MONTH_ROLLUP))
+        return len(parts)
+
+
+# ==============================
+# Queries (rollups only, except the drill-down)
+# ==============================
+
+def load_rollup(name, folder=run_history.HISTORY_DIR, mtime=None):
+    """
+    A rollup table, None before the first run. ``mtime`` is only there to
+    key callers' caches.
+    """
+    return read_parquet(os.path.join(store_dir(folder), name))
+
+
+def rollup_mtime(name, folder=run_history.HISTORY_DIR):
+    path = os.path.join(store_dir(folder), name)
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def last_periods(df, client=None, last=12):
+    """Rows of ``client`` (all when None) in its ``last`` periods."""
+    if client:
+        df = df[df["client"] == client]
+    periods = np.sort(df["period"].unique())[-last:]
+    return df[df["period"].isin(periods)]
+
+
+def monthly_trend(months, client=None, last=12):
+    """Lines, matches, match % and unmatched tax (rupees) per period."""
+    df = last_periods(months, client, last)
+    trend = df.groupby("period", sort=True)[MEASURES + ["suppliers_unmatched"]].sum()
+    trend["match_pct"] = (trend["matched"] / trend["lines"].where(trend["lines"] > 0) * 100).round(2)
+    for col in ["tax", "unmatched_tax", "unclaimed_tax_2b"]:
+        trend[col] = trend[col] / 100
+    return trend.reset_index()
+
+
+def chronic_suppliers(suppliers, client=None, last=12, min_periods=3, limit=50):
+    """
+    Suppliers with unmatched BOOKS lines in at least ``min_periods`` of the
+    ``last`` periods, most often unmatched first, then by unmatched tax.
+    """
+    df = last_periods(suppliers, client, last)
+    keys = ["gstin", "supplier"] if client else ["client", "gstin", "supplier"]
+    # periods as sorted numbers: a per-group max over strings is slow
+    periods = np.sort(df["period"].unique())
+    stats = df.assign(
+        open=df["unmatched"] > 0,
+        period_no=np.searchsorted(periods, df["period"].to_numpy()),
+    ).groupby(keys, sort=False).agg(
+        periods=("period_no", "size"),
+        periods_unmatched=("open", "sum"),
+        lines=("lines", "sum"),
+        unmatched=("unmatched", "sum"),
+        unmatched_tax=("unmatched_tax", "sum"),
+        last_period=("period_no", "max"),
+    )
+    stats = stats[stats["periods_unmatched"] >= min_periods]
+    stats["last_period"] = periods[stats["last_period"].to_numpy()]
+    stats["unmatched_tax"] = stats["unmatched_tax"] / 100
+    return (
+        stats.sort_values(["periods_unmatched", "unmatched_tax"], ascending=False)
+        .head(limit).reset_index()
+    )
+
+
+def supplier_trend(suppliers, gstin, supplier, client=None, last=24):
+    """Per-period measures of one GSTIN / supplier."""
+    df = last_periods(suppliers, client, last)
+    df = df[(df["gstin"] == gstin) & (df["supplier"] == supplier)]
+    trend = df.groupby("period", sort=True)[MEASURES].sum()
+    trend["unmatched_tax"] = trend["unmatched_tax"] / 100
+    return trend.reset_index()
+
+
+def unmatched_lines(client, gstin=None, supplier=None, side="BOOKS",
+                    folder=run_history.HISTORY_DIR):
+    """
+    Unmatched lines of one client from the row store, newest period first;
+    only that client's partitions are read.
+    """
+    require_pyarrow()
+    filters = [("client", "=", run_history.client_key(client)), ("matched", "=", False),
+               ("side", "=", side)]
+    if gstin:
+        filters.append(("gstin", "=", gstin))
+    if supplier:
+        filters.append(("supplier", "=", supplier))
+    rows_dir = os.path.join(store_dir(folder), ROWS_NAME)
+    if not os.path.isdir(rows_dir):
+        return pd.DataFrame()
+    df = pd.read_parquet(rows_dir, filters=filters)
+    for col in ["igst", "cgst", "sgst", "tax"]:
+        df[col] = df[col] / 100
+    return df.sort_values(["period", "invoice_date"], ascending=[False, True],
+                          ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconciliation analytics store")
+    parser.add_argument("--folder", default=run_history.HISTORY_DIR)
+    parser.add_argument("--backfill", action="store_true",
+                        help="record history runs saved before the store existed")
+    parser.add_argument("--client", default=None,
+                        help="client of backfilled runs saved without one")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recompute the rollups from the row partitions")
+    args = parser.parse_args(argv)
+
+    if args.backfill:
+        print(f"{backfill(args.folder, args.client)} run(s) added")
+    if args.rebuild:
+        print(f"rollups rebuilt from {rebuild_rollups(args.folder)} partition file(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
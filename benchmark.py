@@ -0,0 +1,199 @@
+"""
+Scaling benchmark for the GST reconciliation pipeline.
+
+Generates synthetic workbooks (see ``synthetic.py``) at each size, runs the
+same load -> clean -> prepare -> match -> fuzzy -> combine -> fallback ->
+export pipeline as the GST page, and writes per-stage wall time and peak
+memory to a JSON file. With ``--baseline`` the run is compared to an earlier result
+file and the exit code is 1 when any stage got slower than allowed.
+
+    python benchmark.py --sizes 1000 10000 100000 --out bench.json
+    python benchmark.py --baseline bench.json --max-slowdown 1.3
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import gst_reco
+import synthetic
+from instrument import Stages, peak_rss_mb
+from reco_engine import ENGINE_VERSION
+
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+BENCH_DIR = "benchmarks"
+
+# stages shorter than this are too noisy to flag as regressions
+MIN_COMPARE_SECONDS = 0.25
+
+
+# ==============================
+# One size
+# ==============================
+
+def bench_size(rows, seed=0, memory="rss", fmt="xlsx", rates=None):
+    """
+    Generate a workbook with ``rows`` GSTR_2B lines and time the pipeline
+    over it. Returns one result record.
+    """
+    gstr2b, books = synthetic.generate(rows, seed, **(rates or {}))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "GST_Reco.xlsx")
+        start = time.perf_counter()
+        synthetic.write_workbook(gstr2b, books, path)
+        generate_seconds = round(time.perf_counter() - start, 3)
+        file_mb = round(os.path.getsize(path) / 2**20, 2)
+
+        stages = Stages(memory=memory)
+        with stages.stage("load") as record:
+            gstr2b, books = gst_reco.load_workbook(path)
+            record["rows"] = len(gstr2b) + len(books)
+        gstr2b, books = gst_reco.reconcile(gstr2b, books, stages=stages)
+        with stages.stage("export", rows=len(gstr2b) + len(books)):
+            export_mb = round(len(gst_reco.export_bytes(gstr2b, books, fmt)) / 2**20, 2)
+
+    summary = gst_reco.summarise(gstr2b, books)
+    return {
+        "rows": rows,
+        "rows_2b": summary["rows_2b"],
+        "rows_books": summary["rows_books"],
+        "matched": summary["matched"],
+        "match_pct": summary["match_pct"],
+        "file_mb": file_mb,
+        "export_mb": export_mb,
+        "generate_seconds": generate_seconds,
+        "total_seconds": stages.total_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages.records,
+    }
+
+
+def bench_isolated(rows, **kwargs):
+    """``bench_size`` in a fresh process, so peak RSS is this size's own."""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(bench_size, rows, **kwargs).result()
+
+
+# ==============================
+# Suite
+# ==============================
+
+def environment():
+    return {
+        "engine_version": ENGINE_VERSION,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, seed=0, memory="rss", fmt="xlsx", rates=None,
+              report=print):
+    results = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "params": {"seed": seed, "memory": memory, "format": fmt,
+                   "rates": {**synthetic.DEFAULT_RATES, **(rates or {})}},
+        "runs": [],
+    }
+    for rows in sizes:
+        run = bench_isolated(rows, seed=seed, memory=memory, fmt=fmt, rates=rates)
+        results["runs"].append(run)
+        report(format_run(run))
+    return results
+
+
+def format_run(run):
+    stages = "  ".join(
+        f"{s['stage']} {s['seconds']:.2f}s" for s in run["stages"]
+    )
+    traced = [s["peak_mb"] for s in run["stages"] if s.get("peak_mb") is not None]
+    peak = max(traced) if traced else run.get("peak_rss_mb")
+    return (f"{run['rows']:>9,} rows  {run['match_pct']:>6}% matched  "
+            f"{stages}  total {run['total_seconds']:.2f}s  peak {peak} MB")
+
+
+# ==============================
+# Regressions
+# ==============================
+
+def stage_seconds(run):
+    return {s["stage"]: s["seconds"] for s in run["stages"]}
+
+
+def compare(results, baseline, max_slowdown=1.25):
+    """
+    Stages slower than ``max_slowdown`` x the baseline run of the same size,
+    as ``(rows, stage, baseline_seconds, seconds)`` tuples.
+    """
+    previous = {run["rows"]: run for run in baseline["runs"]}
+    slower = []
+    for run in results["runs"]:
+        old = previous.get(run["rows"])
+        if old is None:
+            continue
+        old_secs = stage_seconds(old)
+        for stage, secs in [*stage_seconds(run).items(), ("total", run["total_seconds"])]:
+            before = old["total_seconds"] if stage == "total" else old_secs.get(stage)
+            if before is None or max(before, secs) < MIN_COMPARE_SECONDS:
+                continue
+            if secs > before * max_slowdown:
+                slower.append((run["rows"], stage, before, secs))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GST reconciliation scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="GSTR_2B rows per run (default: 1k 10k 100k)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", choices=["rss", "trace"], default="rss",
+                        help="peak memory per process (rss) or per stage (trace, slower)")
+    parser.add_argument("--format", choices=list(gst_reco.EXPORT_FORMATS), default="xlsx")
+    parser.add_argument("--out", default=None,
+                        help=f"result JSON (default: {BENCH_DIR}/bench_<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="earlier result JSON to compare with")
+    parser.add_argument("--max-slowdown", type=float, default=1.25)
+    for name, value in synthetic.DEFAULT_RATES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=value)
+    args = parser.parse_args(argv)
+
+    rates = {name: getattr(args, name) for name in synthetic.DEFAULT_RATES}
+    results = run_suite(args.sizes, args.seed, args.memory, args.format, rates)
+
+    out = args.out or os.path.join(
+        BENCH_DIR, f"bench_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nresults written to {out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = compare(results, baseline, args.max_slowdown)
+        for rows, stage, before, secs in slower:
+            print(f"REGRESSION {rows:,} rows  {stage}: {before:.2f}s -> {secs:.2f}s")
+        if slower:
+            return 1
+        print(f"no stage slower than {args.max_slowdown}x "
+              f"engine {baseline['environment']['engine_version']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
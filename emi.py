@@ -0,0 +1,233 @@
+"""
+EMI, amortisation schedules and scenario grids, computed with numpy.
+
+``monthly_emi`` broadcasts over any mix of scalar and array principal, rate
+and tenure, so a rate x tenure grid or a portfolio of loans is one array
+expression. ``amortisation_schedule`` builds the month-by-month table in
+closed form between events (prepayments, rate resets): the balance after k
+months at rate r is ``B(1+r)^k - EMI((1+r)^k - 1)/r``, evaluated for all k
+of a segment at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# balance below half a paisa counts as paid off
+PAID = 0.005
+
+# keep="emi" can stretch the tenure after a rate rise; never past this
+MAX_MONTHS = 1200
+
+SCHEDULE_COLUMNS = ["Month", "Opening", "Rate", "EMI", "Interest", "Principal",
+                    "Prepayment", "Closing"]
+
+# portfolio sheet header (lower case, "_" as space) -> column
+PORTFOLIO_MAPPING = {
+    "loan": "Principal",
+    "loan amount": "Principal",
+    "principal": "Principal",
+    "amount": "Principal",
+    "rate": "Rate",
+    "rate %": "Rate",
+    "interest rate": "Rate",
+    "roi": "Rate",
+    "years": "Years",
+    "tenure": "Years",
+    "tenure years": "Years",
+    "months": "Months",
+    "tenure months": "Months",
+}
+
+
+# ==============================
+# EMI
+# ==============================
+
+def monthly_emi(principal, annual_rate, months):
+    """EMI for broadcastable principal / annual rate (%) / months arrays."""
+    p = np.asarray(principal, dtype=float)
+    r = np.asarray(annual_rate, dtype=float) / 12 / 100
+    n = np.asarray(months, dtype=float)
+
+    # zero interest: straight division
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (1 + r) ** n
+        emi = np.where(r == 0, p / n, p * r * growth / (growth - 1))
+    return emi[()] if emi.ndim == 0 else emi
+
+
+def scenario_grid(principal, rates, years):
+    """
+    EMI and total interest for every (rate, years) pair, as two frames with
+    rates down the index and tenures across the columns.
+    """
+    rates = np.asarray(rates, dtype=float)
+    years = np.asarray(years, dtype=float)
+    months = years[None, :] * 12
+
+    emi = monthly_emi(principal, rates[:, None], months)
+    interest = emi * months - principal
+
+    index = pd.Index(rates, name="Rate %")
+    columns = pd.Index(years, name="Years")
+    return (
+        pd.DataFrame(np.round(emi, 2), index=index, columns=columns),
+        pd.DataFrame(np.round(interest, 2), index=index, columns=columns),
+    )
+
+
+# ==============================
+# Schedule
+# ==============================
+
+def parse_events(text, name="event"):
+    """``"12:100000, 24:50000"`` -> ``{12: 100000.0, 24: 50000.0}``."""
+    events = {}
+    for part in filter(None, (p.strip() for p in str(text or "").split(","))):
+        month, sep, value = part.partition(":")
+        try:
+            if not sep:
+                raise ValueError
+            events[int(month)] = float(value.replace("%", ""))
+        except ValueError:
+            raise ValueError(f"Invalid {name} '{part}' (expected month:value)")
+    return events
+
+
+def segment(balance, rate, emi, start, length):
+    """
+    Up to ``length`` months from ``start`` with a fixed monthly ``rate`` and
+    ``emi``, stopping early at payoff. Returns the schedule columns.
+    """
+    k = np.arange(1, length + 1)
+    if rate:
+        growth = (1 + rate) ** k
+        closing = balance * growth - emi * (growth - 1) / rate
+    else:
+        closing = balance - emi * k
+    opening = np.concatenate([[balance], closing[:-1]])
+
+    paid = np.flatnonzero(closing <= PAID)
+    if len(paid):
+        last = paid[0] + 1
+        opening, closing = opening[:last], closing[:last]
+        closing[-1] = 0.0
+
+    interest = opening * rate
+    principal = opening - closing
+    return {
+        "Month": start + np.arange(len(opening)),
+        "Opening": opening,
+        "EMI": interest + principal,
+        "Interest": interest,
+        "Principal": principal,
+        "Closing": closing,
+    }
+
+
+def remaining_months(balance, rate, emi):
+    """Months an ``emi`` takes to clear ``balance``, MAX_MONTHS if it never does."""
+    if rate == 0:
+        return int(np.ceil(balance / emi - 1e-9))
+    if emi <= balance * rate:
+        return MAX_MONTHS
+    return int(np.ceil(-np.log(1 - rate * balance / emi) / np.log(1 + rate) - 1e-9))
+
+
+def amortisation_schedule(principal, annual_rate, months, prepayments=None,
+                          rate_resets=None, keep="emi"):
+    """
+    Month-by-month schedule of a loan.
+
+    ``prepayments`` ``{month: amount}`` are paid at the end of that month;
+    ``rate_resets`` ``{month: annual_rate}`` apply from that month's interest.
+    After either, ``keep="emi"`` keeps the instalment and lets the tenure
+    move (the usual bank default), ``keep="tenure"`` recomputes the EMI over
+    the months left of the original tenure.
+    """
+    prepayments = prepayments or {}
+    rate_resets = rate_resets or {}
+    months = max(int(months), 1)
+
+    # a segment ends before a reset month and at a prepayment month
+    cuts = sorted({m - 1 for m in rate_resets if m > 1} | set(prepayments))
+
+    balance, rate = float(principal), float(annual_rate)
+    emi = float(monthly_emi(balance, rate, months))
+    start, parts = 1, []
+
+    while balance > PAID and start <= MAX_MONTHS:
+        if start in rate_resets:
+            rate = float(rate_resets[start])
+            if keep == "tenure":
+                emi = float(monthly_emi(balance, rate, max(months - start + 1, 1)))
+        r = rate / 12 / 100
+        if emi <= balance * r and keep == "emi":
+            # instalment no longer covers the interest: spread over what's left
+            emi = float(monthly_emi(balance, rate, max(months - start + 1, 1)))
+
+        end = next((c for c in cuts if c >= start), None)
+        length = (end - start + 1 if end is not None
+                  else remaining_months(balance, r, emi))
+        part = segment(balance, r, emi, start, min(length, MAX_MONTHS - start + 1))
+        part["Rate"] = np.full(len(part["Month"]), rate)
+        part["Prepayment"] = np.zeros(len(part["Month"]))
+
+        last = part["Month"][-1]
+        balance = part["Closing"][-1]
+        if last in prepayments and balance > PAID:
+            paid = min(prepayments[last], balance)
+            part["Prepayment"][-1] = paid
+            part["Closing"][-1] = balance = balance - paid
+            if keep == "tenure" and balance > PAID:
+                emi = float(monthly_emi(balance, rate, max(months - last, 1)))
+        parts.append(part)
+        start = last + 1
+
+    schedule = pd.DataFrame({
+        col: np.concatenate([p[col] for p in parts]) if parts else []
+        for col in SCHEDULE_COLUMNS
+    })
+    return schedule.round({c: 2 for c in SCHEDULE_COLUMNS[1:]})
+
+
+def schedule_summary(schedule):
+    return {
+        "months": len(schedule),
+        "total_interest": round(float(schedule["Interest"].sum()), 2),
+        "total_prepaid": round(float(schedule["Prepayment"].sum()), 2),
+        "total_paid": round(float((schedule["EMI"] + schedule["Prepayment"]).sum()), 2),
+    }
+
+
+# ==============================
+# Portfolio
+# ==============================
+
+def loan_portfolio(df):
+    """
+    EMI, total payment and total interest for every loan of a sheet with
+    Principal, Rate and Years (or Months) columns, in one array operation.
+    """
+    df = df.rename(columns=lambda c: PORTFOLIO_MAPPING.get(
+        str(c).strip().lower().replace("_", " "), c))
+    if "Months" not in df.columns and "Years" in df.columns:
+        df["Months"] = pd.to_numeric(df["Years"], errors="coerce") * 12
+    missing = [c for c in ["Principal", "Rate", "Months"] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Loan sheet is missing column(s): {', '.join(missing)}")
+
+    principal = pd.to_numeric(df["Principal"], errors="coerce").to_numpy(dtype=float)
+    months = pd.to_numeric(df["Months"], errors="coerce").to_numpy(dtype=float)
+    emi = monthly_emi(principal, pd.to_numeric(df["Rate"], errors="coerce"), months)
+
+    df["EMI"] = np.round(emi, 2)
+    df["Total_Payment"] = np.round(emi * months, 2)
+    df["Total_Interest"] = np.round(emi * months - principal, 2)
+    return df
+
+
+def grid_frames(emi, interest):
+    """Scenario grid frames with the rate as a column, ready for export."""
+    return {"EMI": emi.reset_index(), "Total_Interest": interest.reset_index()}
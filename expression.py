@@ -0,0 +1,194 @@
+"""
+Restricted arithmetic expressions for the Calculator page.
+
+User text is parsed with ``ast`` once, checked against a whitelist (numbers,
++ - * / // % **, unary signs, a few functions, sheet column names) and
+compiled into nested closures; nothing reaches ``eval``. Compiled forms are
+cached per expression text. The same compiled expression evaluates on plain
+numbers or on whole numpy columns, so ``Taxable*18%`` over a 200k-row sheet
+is a single vectorised operation.
+
+Percentages are written as ``18%`` (= 0.18) or ``Rate%``; ``%`` between two
+operands is still the remainder. Column names with spaces go in brackets:
+``[Taxable Value]*0.18``.
+"""
+
+import ast
+import operator
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+MAX_LENGTH = 500
+MAX_EXPONENT = 100
+
+BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+UNARY = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+FUNCTIONS = {
+    "abs": np.abs,
+    "round": lambda x, digits=0: np.round(x, int(digits)),
+    "min": np.minimum,
+    "max": np.maximum,
+    "sqrt": np.sqrt,
+    "floor": np.floor,
+    "ceil": np.ceil,
+}
+
+# 18% / Rate% -> (18/100) / (Rate/100), unless an operand follows (then
+# it's a remainder)
+PERCENT = re.compile(r"(?<![\w.])([A-Za-z_]\w*|\d+(?:\.\d+)?)\s*%(?!\s*[\w(.\[])")
+BRACKETED = re.compile(r"\[([^\]]+)\]")
+
+
+class Compiled:
+    """A checked expression: ``names`` it reads and ``evaluate(values)``."""
+
+    def __init__(self, text, fn, names):
+        self.text = text
+        self.fn = fn
+        self.names = names
+
+    def evaluate(self, values=None):
+        values = values or {}
+        missing = [n for n in self.names if n not in values]
+        if missing:
+            raise ValueError(f"Unknown name(s): {', '.join(missing)}")
+        with np.errstate(all="ignore"):
+            return self.fn(values)
+
+
+# ==============================
+# Parse + check
+# ==============================
+
+def preprocess(text):
+    """Percent literals and bracketed names -> plain Python syntax."""
+    aliases = {}
+
+    def alias(match):
+        name = match.group(1).strip()
+        return aliases.setdefault(name, f"_col{len(aliases)}")
+
+    text = BRACKETED.sub(alias, text.replace("₹", ""))
+    text = PERCENT.sub(r"(\1/100)", text)
+    return text, {v: k for k, v in aliases.items()}
+
+
+def build(node, names, aliases):
+    """Closure ``values -> result`` for one whitelisted AST node."""
+    if isinstance(node, ast.Expression):
+        return build(node.body, names, aliases)
+
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported value: {node.value!r}")
+        value = np.float64(node.value)
+        return lambda values: value
+
+    if isinstance(node, ast.Name):
+        name = aliases.get(node.id, node.id)
+        names.append(name)
+        return lambda values: values[name]
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY:
+        op = BINARY[type(node.op)]
+        left = build(node.left, names, aliases)
+        right = build(node.right, names, aliases)
+        if op is operator.pow:
+            def power(values):
+                exponent = right(values)
+                if np.nanmax(np.abs(exponent), initial=0) > MAX_EXPONENT:
+                    raise ValueError(f"Exponent above {MAX_EXPONENT}")
+                return op(left(values), exponent)
+            return power
+        return lambda values: op(left(values), right(values))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY:
+        op = UNARY[type(node.op)]
+        operand = build(node.operand, names, aliases)
+        return lambda values: op(operand(values))
+
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in FUNCTIONS and not node.keywords):
+        fn = FUNCTIONS[node.func.id]
+        args = [build(a, names, aliases) for a in node.args]
+        return lambda values: fn(*(a(values) for a in args))
+
+    raise ValueError(f"Not allowed in an expression: {type(node).__name__}")
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text):
+    """Parse and check ``text`` once; raises ValueError when it isn't allowed."""
+    text = str(text).strip()
+    if not text:
+        raise ValueError("Empty expression")
+    if len(text) > MAX_LENGTH:
+        raise ValueError(f"Expression longer than {MAX_LENGTH} characters")
+
+    source, aliases = preprocess(text)
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError:
+        raise ValueError("Invalid expression")
+
+    names = []
+    try:
+        fn = build(tree, names, aliases)
+    except RecursionError:
+        raise ValueError("Expression nested too deeply")
+    return Compiled(text, fn, tuple(dict.fromkeys(names)))
+
+
+# ==============================
+# Evaluate
+# ==============================
+
+def calculate(text):
+    """Value of an expression of numbers only."""
+    try:
+        result = float(compile_expression(text).evaluate())
+    except (ArithmeticError, TypeError):
+        raise ValueError("Invalid expression")
+    if np.isnan(result):
+        raise ValueError("Result is undefined")
+    if np.isinf(result):
+        raise ValueError("Division by zero or result too large")
+    return int(result) if result.is_integer() and abs(result) < 2**53 else result
+
+
+def evaluate_columns(text, df):
+    """
+    The expression over every row of ``df``, its names being column names,
+    as a float Series (blank / non-numeric cells and x/0 give NaN).
+    """
+    compiled = compile_expression(text)
+    columns = {str(c): c for c in df.columns}
+    values = {
+        name: pd.to_numeric(df[columns[name]], errors="coerce").to_numpy(dtype=float)
+        for name in compiled.names if name in columns
+    }
+    try:
+        result = compiled.evaluate(values)
+    except (ArithmeticError, TypeError):
+        raise ValueError("Invalid expression")
+
+    result = np.broadcast_to(np.asarray(result, dtype=float), (len(df),)).copy()
+    result[~np.isfinite(result)] = np.nan
+    return pd.Series(result, index=df.index)
@@ -0,0 +1,501 @@
+"""
+Headless GST 2B vs Books reconciliation.
+
+The same pipeline the "📊 GST Reconciliation" page runs, usable from scripts
+and from the command line for batch runs over a folder of workbooks:
+
+    python gst_reco.py month_end/ --out reconciled/ --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from normalise import (
+    COLUMN_MAPPING,
+    clean_invoice_col,
+    clean_supplier_col,
+    integral_text,
+    map_columns,
+    normalise_columns,
+    tax_structure_col,
+)
+import sharded
+from instrument import Stages, ThrottledProgress, frame_mb
+from reco_engine import (
+    FUZZY_THRESHOLD,
+    REMARKS,
+    TAX_COLS,
+    TOLERANCE,
+    match_by_amount,
+    match_by_invoice,
+    match_combinations,
+    match_fuzzy,
+    to_paise,
+    to_rupees,
+)
+
+
+SHEETS = ["GSTR_2B", "BOOKS"]
+
+HEADER_KEYWORDS = ("supplier", "party")
+PROBE_ROWS = 10
+
+# headers a GSTR_2B/BOOKS header row is recognised by (lower-case, "_" as space)
+HEADER_NAMES = {
+    name.lower().replace("_", " ")
+    for name in [*COLUMN_MAPPING, *COLUMN_MAPPING.values(), "GSTIN", "Invoice_Date"]
+}
+
+# Text columns kept as categoricals: supplier names and GSTINs repeat on
+# every invoice of a supplier; invoice numbers only when most of them repeat
+# (multi-line invoices), otherwise the codes would only add to the strings.
+CATEGORY_COLS = ["Supplier_Name", "Supplier_Name_CLEAN", "GSTIN"]
+REPEATED_COLS = ["Invoice_No", "Invoice_No_CLEAN"]
+MAX_DISTINCT_SHARE = 0.5
+
+# (creator, sheet, width) -> header row, so repeat uploads of the same
+# export format skip header detection
+LAYOUT_CACHE = {}
+
+
+# ==============================
+# Load
+# ==============================
+
+def find_header_row(rows, names=None):
+    """
+    Index of the header row, or None. The first row with two cells among
+    ``names`` (lower-case headers, "_" as space) wins; failing that, the
+    first row mentioning a supplier/party column. A title such as "Party
+    ledger for FY 2025-26" is so only taken when no row has the headers.
+    """
+    rows = [[str(v).lower().replace("_", " ").strip() for v in row] for row in rows]
+    if names:
+        for i, cells in enumerate(rows):
+            if sum(c in names for c in cells) >= 2:
+                return i
+    for i, cells in enumerate(rows):
+        if any(k in " ".join(cells) for k in HEADER_KEYWORDS):
+            return i
+    return None
+
+
+def layout_fingerprint(xls, sheet):
+    try:
+        book = xls.book
+        return (book.properties.creator, sheet, book[sheet].max_column)
+    except (AttributeError, KeyError):
+        return None
+
+
+def read_sheet_safely(xls, sheet):
+    """
+    Parse one sheet of an open ``pd.ExcelFile``, starting at its header row.
+
+    Portal/Tally exports often carry title rows above the header. Only the
+    first ``PROBE_ROWS`` rows are read to find it, and the result is cached
+    per export layout; the full sheet is then parsed once from that row.
+    Sheets without a recognisable header are read from the first row.
+    """
+    key = layout_fingerprint(xls, sheet)
+    header_row = LAYOUT_CACHE.get(key)
+
+    if header_row is not None:
+        df = xls.parse(sheet, header=header_row)
+        if find_header_row([df.columns], HEADER_NAMES) == 0:
+            return df
+
+    probe = xls.parse(sheet, header=None, nrows=PROBE_ROWS)
+    header_row = find_header_row(probe.itertuples(index=False), HEADER_NAMES)
+    if header_row is None:
+        header_row = 0
+    elif key is not None:
+        LAYOUT_CACHE[key] = header_row
+
+    return xls.parse(sheet, header=header_row)
+
+
+def load_workbook(file, timings=None):
+    """
+    Read the GSTR_2B and BOOKS sheets, opening the workbook once.
+
+    Pass a dict as ``timings`` to get the load time of each sheet in seconds.
+    """
+    frames = []
+    with pd.ExcelFile(file) as xls:
+        for sheet in SHEETS:
+            start = time.perf_counter()
+            frames.append(read_sheet_safely(xls, sheet))
+            if timings is not None:
+                timings[sheet] = round(time.perf_counter() - start, 3)
+    return tuple(frames)
+
+
+# ==============================
+# Clean & prepare
+# ==============================
+
+def clean_columns(df):
+    return map_columns(normalise_columns(df))
+
+
+def compact_text(df):
+    """Store repeated text columns as categoricals (see ``CATEGORY_COLS``)."""
+    for col in CATEGORY_COLS + REPEATED_COLS:
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        # one hash pass both counts the distinct values and builds the codes
+        codes, uniques = pd.factorize(df[col])
+        if col in CATEGORY_COLS or len(uniques) <= len(df) * MAX_DISTINCT_SHARE:
+            df[col] = pd.Categorical.from_codes(codes, categories=uniques.infer_objects())
+    return df
+
+
+def prepare_fields(df):
+    """
+    Add the matching columns. Amounts become int64 paise, ``RECO_REMARK``
+    and ``TAX_STRUCTURE`` one-byte categoricals, repeated text categorical.
+    """
+    df["Invoice_No"] = integral_text(df["Invoice_No"]) if "Invoice_No" in df.columns else ""
+    df["Invoice_No_CLEAN"] = clean_invoice_col(df["Invoice_No"])
+    df["Supplier_Name_CLEAN"] = clean_supplier_col(df["Supplier_Name"])
+
+    for col in TAX_COLS:
+        df[col] = to_paise(pd.to_numeric(df[col], errors="coerce").fillna(0))
+
+    df["RECO_REMARK"] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), dtype=REMARKS)
+    df["USED"] = False
+    df["MATCH_SCORE"] = np.nan
+    df["MATCH_GROUP"] = None
+    df["TAX_STRUCTURE"] = tax_structure_col(df)
+    return compact_text(df)
+
+
+def prepare(df):
+    return prepare_fields(clean_columns(df))
+
+
+# ==============================
+# Reconcile
+# ==============================
+
+def tracker_for(progress):
+    if isinstance(progress, ThrottledProgress):
+        return progress
+    return ThrottledProgress(progress or (lambda pct, text: None))
+
+
+def match(gstr2b, books, tolerance=TOLERANCE, date_window=None, progress=None,
+          stages=None, fuzzy_threshold=FUZZY_THRESHOLD, workers=None):
+    """
+    Run the invoice, fuzzy invoice, split/consolidated invoice and tax
+    amount matching passes on prepared frames. ``fuzzy_threshold`` of
+    0/None skips the fuzzy pass.
+
+    With ``workers`` > 1, large frames run all but the tax amount pass
+    sharded over that many processes (see ``sharded``); the result is the
+    same as with one.
+
+    ``progress`` is an optional ``callable(percent, text)`` (throttled here
+    unless it already is a ``ThrottledProgress``) and ``stages`` an optional
+    ``Stages`` recorder. ``RECO_REMARK``/``USED``/``MATCH_SCORE`` are filled
+    in place.
+    """
+    progress = tracker_for(progress)
+    stages = stages or Stages(memory=None)
+
+    with sharded.matcher(gstr2b, books, workers) as pool:
+        progress(60, "🔍 Matching invoices...", force=True)
+        with stages.stage("match", rows=len(books)) as record:
+            if pool:
+                pool.match_by_invoice(tolerance)
+            else:
+                match_by_invoice(gstr2b, books, tolerance)
+            record["frame_mb"] = frame_mb(gstr2b, books)
+
+        if fuzzy_threshold:
+            progress(75, "🔤 Matching near-miss invoice numbers...", force=True)
+            with stages.stage("fuzzy") as record:
+                record["rows"] = int((~books["USED"]).sum())
+                if pool:
+                    pool.match_fuzzy(tolerance, fuzzy_threshold)
+                else:
+                    match_fuzzy(gstr2b, books, tolerance, fuzzy_threshold,
+                                progress.span(75, 84, "🔤 Fuzzy matching"))
+                record["frame_mb"] = frame_mb(gstr2b, books)
+
+        progress(85, "🧩 Matching split and consolidated invoices...", force=True)
+        with stages.stage("combine") as record:
+            record["rows"] = int((~books["USED"]).sum())
+            if pool:
+                pool.match_combinations(tolerance)
+            else:
+                match_combinations(gstr2b, books, tolerance,
+                                   progress=progress.span(85, 89, "🧩 Combinations"))
+            record["frame_mb"] = frame_mb(gstr2b, books)
+
+    progress(90, "🔁 Running fallback tax matching...", force=True)
+    with stages.stage("fallback") as record:
+        record["rows"] = int((~books["USED"]).sum())
+        match_by_amount(gstr2b, books, tolerance, date_window,
+                        progress.span(90, 99, "🔁 Fallback matching"))
+        record["frame_mb"] = frame_mb(gstr2b, books)
+
+    progress(100, "✅ Reconciliation Completed", force=True)
+    return gstr2b, books
+
+
+def prepare_both(gstr2b, books, progress=None, stages=None):
+    """Clean and prepare both raw sheets, recording the two stages."""
+    progress = tracker_for(progress)
+    stages = stages or Stages(memory=None)
+    rows = len(gstr2b) + len(books)
+
+    with stages.stage("clean", rows=rows) as record:
+        gstr2b = clean_columns(gstr2b)
+        books = clean_columns(books)
+        record["frame_mb"] = frame_mb(gstr2b, books)
+    progress(35, "🧹 Data cleaned", force=True)
+
+    with stages.stage("prepare", rows=rows) as record:
+        gstr2b = prepare_fields(gstr2b)
+        books = prepare_fields(books)
+        record["frame_mb"] = frame_mb(gstr2b, books)
+    progress(55, "⚙ Preparing reconciliation", force=True)
+    return gstr2b, books
+
+
+def reconcile(gstr2b, books, tolerance=TOLERANCE, date_window=None, progress=None,
+              stages=None, fuzzy_threshold=FUZZY_THRESHOLD, workers=None):
+    """
+    Clean both raw sheets and match them (see ``match``). Returns the
+    prepared ``(gstr2b, books)`` frames.
+    """
+    progress = tracker_for(progress)
+    stages = stages or Stages(memory=None)
+    gstr2b, books = prepare_both(gstr2b, books, progress, stages)
+    return match(gstr2b, books, tolerance, date_window, progress, stages,
+                 fuzzy_threshold, workers)
+
+
+def summarise(gstr2b, books):
+    matched = int((books["RECO_REMARK"] == "MATCHED").sum())
+    return {
+        "rows_2b": len(gstr2b),
+        "rows_books": len(books),
+        "matched": matched,
+        "matched_2b": int((gstr2b["RECO_REMARK"] == "MATCHED").sum()),
+        "match_pct": round(matched / len(books) * 100, 2) if len(books) else 0,
+    }
+
+
+# ==============================
+# Export
+# ==============================
+
+EXPORT_FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "application/zip",
+    "parquet": "application/zip",
+}
+
+
+def export_name(fmt, stem="GST_Reco_Reconciled"):
+    return f"{stem}.xlsx" if fmt == "xlsx" else f"{stem}_{fmt}.zip"
+
+
+def cell_rows(df):
+    """Rows of plain Python values with blanks as None, ready for xlsxwriter."""
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def write_xlsx(frames, output):
+    """
+    Write ``{sheet: frame}`` as one workbook.
+
+    Uses xlsxwriter in constant-memory mode, which streams each row to disk
+    as soon as it is written; falls back to openpyxl when it isn't installed.
+    """
+    try:
+        import xlsxwriter
+    except ImportError:
+        with pd.ExcelWriter(output, engine="openpyxl") as writer:
+            for sheet, df in frames.items():
+                df.to_excel(writer, sheet_name=sheet, index=False)
+        return
+
+    wb = xlsxwriter.Workbook(output, {
+        "constant_memory": True,
+        "default_date_format": "dd-mm-yyyy",
+        "strings_to_numbers": False,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+    })
+    for sheet, df in frames.items():
+        ws = wb.add_worksheet(sheet)
+        ws.write_row(0, 0, [str(c) for c in df.columns])
+        for r, row in enumerate(cell_rows(df), start=1):
+            ws.write_row(r, 0, row)
+    wb.close()
+
+
+def write_zip(frames, output, fmt):
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        for sheet, df in frames.items():
+            buf = BytesIO()
+            if fmt == "csv":
+                df.to_csv(buf, index=False)
+            else:
+                df.to_parquet(buf, index=False)
+            zf.writestr(f"{sheet}.{fmt}", buf.getvalue())
+
+
+def frames_bytes(frames, fmt="xlsx"):
+    """``{sheet: frame}`` as xlsx bytes or a zip of CSV/Parquet files."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    output = BytesIO()
+    if fmt == "xlsx":
+        write_xlsx(frames, output)
+    else:
+        write_zip(frames, output, fmt)
+    return output.getvalue()
+
+
+def export_frame(df):
+    """
+    A prepared frame as it is written out: amounts back in rupees.
+    Categoricals are written as their labels by every format.
+    """
+    return df.assign(**{c: to_rupees(df[c]) for c in TAX_COLS if c in df.columns})
+
+
+def export_bytes(gstr2b, books, fmt="xlsx"):
+    """
+    Serialise the reconciled sheets once, as xlsx or a zip of CSV/Parquet
+    files. The same bytes serve the download button and the history copy.
+    """
+    return frames_bytes({"GSTR_2B": export_frame(gstr2b), "BOOKS": export_frame(books)}, fmt)
+
+
+# ==============================
+# Batch / CLI
+# ==============================
+
+def output_path(path, out_dir, fmt="xlsx"):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(out_dir, export_name(fmt, f"{stem}_Reconciled"))
+
+
+def reconcile_file(path, out_dir, tolerance=TOLERANCE, date_window=None, fmt="xlsx",
+                   fuzzy_threshold=FUZZY_THRESHOLD, shards=None):
+    """Reconcile one workbook on disk and write ``<name>_Reconciled.xlsx``."""
+    start = time.perf_counter()
+    stages = Stages(memory=None)
+    load_times = {}
+    with stages.stage("load") as record:
+        gstr2b, books = load_workbook(path, load_times)
+        record["rows"] = len(gstr2b) + len(books)
+        record["frame_mb"] = frame_mb(gstr2b, books)
+    gstr2b, books = reconcile(gstr2b, books, tolerance, date_window, stages=stages,
+                              fuzzy_threshold=fuzzy_threshold, workers=shards)
+
+    target = output_path(path, out_dir, fmt)
+    with stages.stage("export", rows=len(gstr2b) + len(books)):
+        with open(target, "wb") as f:
+            f.write(export_bytes(gstr2b, books, fmt))
+
+    summary = summarise(gstr2b, books)
+    summary.update(file=os.path.basename(path), output=target,
+                   load_times=load_times,
+                   stages=stages.records,
+                   seconds=round(time.perf_counter() - start, 2))
+    return summary
+
+
+def find_workbooks(folder):
+    return sorted(
+        os.path.join(folder, f)
+        for f in os.listdir(folder)
+        if f.lower().endswith(".xlsx")
+        and not f.startswith("~$")
+        and not f.endswith("_Reconciled.xlsx")
+    )
+
+
+def reconcile_folder(folder, out_dir, tolerance=TOLERANCE, date_window=None,
+                     workers=None, fmt="xlsx", fuzzy_threshold=FUZZY_THRESHOLD,
+                     shards=None):
+    """Reconcile every workbook in ``folder`` across a process pool."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = find_workbooks(folder)
+    results = []
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        jobs = {
+            pool.submit(reconcile_file, p, out_dir, tolerance, date_window, fmt,
+                        fuzzy_threshold, shards): p
+            for p in paths
+        }
+        for job in as_completed(jobs):
+            try:
+                results.append(job.result())
+            except Exception as e:
+                results.append({"file": os.path.basename(jobs[job]), "error": str(e)})
+
+    return sorted(results, key=lambda r: r["file"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch GST 2B vs Books reconciliation")
+    parser.add_argument("folder", help="folder of GST_Reco.xlsx workbooks")
+    parser.add_argument("--out", default=None,
+                        help="output folder (default: <folder>/reconciled)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--date-window", type=int, default=None,
+                        help="fallback Invoice_Date window in days")
+    parser.add_argument("--fuzzy-threshold", type=float, default=FUZZY_THRESHOLD,
+                        help="invoice number similarity for fuzzy matches (0 = off)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--shards", type=int, default=None,
+                        help="processes per workbook for very large workbooks")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="xlsx",
+                        help="output format (csv/parquet are zipped per workbook)")
+    args = parser.parse_args(argv)
+
+    out_dir = args.out or os.path.join(args.folder, "reconciled")
+    start = time.perf_counter()
+    results = reconcile_folder(args.folder, out_dir, args.tolerance,
+                               args.date_window, args.workers, args.format,
+                               args.fuzzy_threshold, args.shards)
+
+    failed = 0
+    for r in results:
+        if "error" in r:
+            failed += 1
+            print(f"{r['file']:<40} FAILED  {r['error']}")
+        else:
+            secs = {s["stage"]: s["seconds"] for s in r["stages"]}
+            print(f"{r['file']:<40} {r['matched']:>8}/{r['rows_books']:<8} "
+                  f"{r['match_pct']:>6}%  "
+                  + "  ".join(f"{k} {v:.2f}s" for k, v in secs.items())
+                  + f"  total {r['seconds']:.2f}s")
+
+    print(f"\n{len(results) - failed} reconciled, {failed} failed "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
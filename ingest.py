@@ -0,0 +1,164 @@
+"""
+Chunked ingestion of GSTR_2B / BOOKS data.
+
+``pd.read_excel`` builds the whole sheet in openpyxl's in-memory DOM before
+pandas sees a single row. For very large exports the rows are streamed here
+in bounded chunks instead (openpyxl read-only mode for xlsx, native chunked
+readers for CSV and Parquet), and each chunk is cleaned and compacted as it
+arrives, so the only full-size object is the compact result.
+"""
+
+import os
+from itertools import chain, islice
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from gst_reco import HEADER_NAMES, PROBE_ROWS, compact_text, find_header_row, prepare
+
+
+CHUNK_SIZE = 50_000
+FORMATS = ["xlsx", "csv", "parquet"]
+
+
+def source_format(name):
+    ext = os.path.splitext(str(name))[1].lower().lstrip(".")
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported file type: {name}")
+    return ext
+
+
+# ==============================
+# Raw chunk readers
+# ==============================
+
+def iter_xlsx(source, sheet, chunk_size=CHUNK_SIZE, header_names=None):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        if sheet is None:
+            ws = wb.worksheets[0]
+        elif sheet in wb.sheetnames:
+            ws = wb[sheet]
+        else:
+            raise ValueError(f"Worksheet named '{sheet}' not found")
+        rows = (
+            row for row in ws.iter_rows(values_only=True)
+            if not all(v is None for v in row)
+        )
+
+        # title rows above the header, as in read_sheet_safely
+        probe = list(islice(rows, PROBE_ROWS))
+        if not probe:
+            return
+        header_row = find_header_row(
+            (["" if v is None else v for v in row] for row in probe), header_names
+        ) or 0
+        header = probe[header_row]
+        rows = chain(probe[header_row + 1:], rows)
+
+        columns = [
+            f"Unnamed: {i}" if name is None else name
+            for i, name in enumerate(header)
+        ]
+
+        batch, emitted = [], False
+        for row in rows:
+            batch.append(row[:len(columns)])
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=columns)
+                batch, emitted = [], True
+        if batch or not emitted:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        wb.close()
+
+
+def iter_csv(source, chunk_size=CHUNK_SIZE):
+    # read as text: inferred dtypes differ between chunks (a blank turns a
+    # numeric column float), amounts are converted by prepare anyway
+    yield from pd.read_csv(source, chunksize=chunk_size, dtype=str)
+
+
+def iter_parquet(source, chunk_size=CHUNK_SIZE):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet uploads need pyarrow: pip install pyarrow")
+
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+
+def iter_chunks(source, sheet=None, fmt=None, chunk_size=CHUNK_SIZE, header_names=None):
+    """
+    Yield raw DataFrame chunks of at most ``chunk_size`` rows. xlsx title rows
+    are skipped as in ``find_header_row``, given the sheet's ``header_names``.
+    """
+    fmt = fmt or source_format(getattr(source, "name", source))
+    if fmt == "xlsx":
+        return iter_xlsx(source, sheet, chunk_size, header_names)
+    if fmt == "csv":
+        return iter_csv(source, chunk_size)
+    return iter_parquet(source, chunk_size)
+
+
+# ==============================
+# Clean + compact
+# ==============================
+
+def concat_chunks(chunks):
+    """
+    Concatenate cleaned chunks, keeping categorical columns categorical.
+
+    Consumes ``chunks``: each column is popped from them as it is joined, so
+    the peak is about the result plus one column rather than twice the data.
+    """
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+
+    columns = {}
+    for col in list(chunks[0].columns):
+        parts = [c.pop(col) for c in chunks]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            try:
+                columns[col] = pd.Series(union_categoricals(parts, ignore_order=True))
+                continue
+            except TypeError:
+                pass  # categories of different dtypes, e.g. an all-blank chunk
+        columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_prepared(source, sheet=None, fmt=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream one sheet/file and return it cleaned and ready for matching.
+
+    Equivalent to ``prepare(pd.read_excel(...))`` except that fully blank
+    rows are skipped, and the same for any ``chunk_size``. A column only some
+    chunks stored as categorical is compacted again over the whole sheet.
+    """
+    chunks = [
+        prepare(chunk)
+        for chunk in iter_chunks(source, sheet, fmt, chunk_size, HEADER_NAMES)
+    ]
+    return compact_text(concat_chunks(chunks))
+
+
+def load_sources(gstr2b_source, books_source=None, fmt=None, chunk_size=CHUNK_SIZE):
+    """
+    Prepared ``(gstr2b, books)`` from either one xlsx workbook with both
+    sheets, or two separate CSV/Parquet/xlsx files (first sheet is read).
+    """
+    if books_source is None:
+        return (
+            load_prepared(gstr2b_source, "GSTR_2B", "xlsx", chunk_size),
+            load_prepared(gstr2b_source, "BOOKS", "xlsx", chunk_size),
+        )
+    return (
+        load_prepared(gstr2b_source, None, fmt, chunk_size),
+        load_prepared(books_source, None, fmt, chunk_size),
+    )
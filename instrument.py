@@ -0,0 +1,191 @@
+"""
+Progress throttling and per-stage run instrumentation.
+
+Every ``st.progress`` / ``status.text`` call is a websocket round-trip to the
+browser, so loops report through ``ThrottledProgress``, which forwards at
+most one update per interval. ``Stages`` records wall time, row counts and
+memory for each pipeline stage, and stages that hold the working frames add
+their size (``frame_mb``).
+"""
+
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+class ThrottledProgress:
+    """
+    Wrap a ``callback(percent, text)`` so it fires at most every
+    ``min_interval`` seconds, and only when the percentage moved. Calls with
+    ``force=True`` (stage boundaries, completion) always go through.
+    """
+
+    def __init__(self, callback, min_interval=0.25):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.last_time = 0.0
+        self.last_pct = None
+        self.sent = 0
+        self.skipped = 0
+
+    def __call__(self, pct, text, force=False):
+        now = time.perf_counter()
+        if not force and (
+            pct == self.last_pct or now - self.last_time < self.min_interval
+        ):
+            self.skipped += 1
+            return
+        self.last_time, self.last_pct = now, pct
+        self.sent += 1
+        self.callback(pct, text)
+
+    def span(self, start_pct, end_pct, label):
+        """
+        A ``report(done, total)`` callback for record loops that maps loop
+        progress onto ``start_pct..end_pct`` of the bar.
+        """
+        def report(done, total):
+            pct = start_pct + int((end_pct - start_pct) * done / max(total, 1))
+            self(pct, f"{label} {done:,}/{total:,}")
+        return report
+
+
+def peak_rss_mb():
+    """Process peak resident memory in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+# rows whose strings are measured per object column; the rest is scaled up
+FRAME_SAMPLE = 10_000
+
+
+def column_bytes(s, sample=FRAME_SAMPLE):
+    if s.dtype != object and not pd.api.types.is_string_dtype(s.dtype):
+        return s.memory_usage(index=False, deep=True)
+    sampled = s.iloc[::max(len(s) // sample, 1)]
+    return sampled.memory_usage(index=False, deep=True) * len(s) / max(len(sampled), 1)
+
+
+def frame_mb(*frames):
+    """
+    Memory held by the given frames in MB, categories included. Python
+    string columns are estimated from every n-th row: measuring each string
+    costs as much as a matching pass on large sheets.
+    """
+    total = sum(column_bytes(df.iloc[:, i]) for df in frames for i in range(df.shape[1]))
+    return round(total / 2**20, 1)
+
+
+STAGE_COLUMNS = ["stage", "rows", "seconds", "peak_mb", "rss_growth_mb", "frame_mb"]
+
+
+class Stages:
+    """
+    Wall time, rows and memory per pipeline stage.
+
+    ``memory="rss"`` (default) records ``rss_growth_mb``, how far the stage
+    raised the process peak RSS, which costs nothing; a stage that stays
+    under an earlier stage's high-water mark shows 0 however much it
+    allocates. ``memory="trace"`` measures each stage's own peak
+    (``peak_mb``) with tracemalloc, which is exact but slows Python-heavy
+    stages several times over. ``memory=None`` skips memory.
+    """
+
+    def __init__(self, memory="rss"):
+        self.memory = memory
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Time the enclosed block. The yielded dict may be updated, e.g. with
+        ``rows`` once they are known.
+        """
+        record = dict.fromkeys(STAGE_COLUMNS)
+        record.update(stage=name, rows=rows)
+        trace = self.memory == "trace"
+        started = trace and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        elif trace:
+            tracemalloc.reset_peak()
+
+        rss_before = peak_rss_mb() if self.memory == "rss" else None
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 3)
+            if trace:
+                record["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+            elif rss_before is not None:
+                record["rss_growth_mb"] = round(peak_rss_mb() - rss_before, 1)
+            if started:
+                tracemalloc.stop()
+            self.records.append(record)
+
+    @property
+    def total_seconds(self):
+        return round(sum(r["seconds"] for r in self.records), 3)
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=STAGE_COLUMNS)
+
+
+# ==============================
+# Rerun latency
+# ==============================
+
+RERUN_TARGET_MS = 50
+
+
+def latency_stats(times):
+    """Count, last, p50 and p95 of a list of millisecond timings."""
+    if not times:
+        return None
+    ordered = sorted(times)
+    return {
+        "runs": len(times),
+        "last_ms": times[-1],
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+class RerunProbe:
+    """
+    Script wall time of the last ``keep`` reruns per page, kept in a
+    session-state dict so it survives reruns. This is the server-side part
+    of an interaction's latency (network and browser rendering come on top).
+    """
+
+    def __init__(self, state, key="rerun_probe", keep=50):
+        if key not in state:
+            state[key] = {}
+        self.runs = state[key]
+        self.keep = keep
+
+    def record(self, page, seconds):
+        times = self.runs.setdefault(page, [])
+        times.append(round(seconds * 1000, 1))
+        del times[:-self.keep]
+
+    def stats(self, page):
+        return latency_stats(self.runs.get(page))
+
+    def caption(self, page, target_ms=RERUN_TARGET_MS):
+        s = self.stats(page)
+        if s is None:
+            return ""
+        flag = "✅" if s["p95_ms"] <= target_ms else "⚠️"
+        return (f"{flag} rerun {s['last_ms']:.0f} ms · p50 {s['p50_ms']:.0f} · "
+                f"p95 {s['p95_ms']:.0f} (target {target_ms} ms, {s['runs']} runs)")
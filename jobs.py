@@ -0,0 +1,201 @@
+"""
+Background reconciliation jobs.
+
+Runs submitted here go to a bounded thread pool shared by every session of
+the server process. The page that queued them stays responsive, and at most
+``MAX_JOBS`` reconciliations run at once; the rest wait as queued. Each job
+keeps its own state, progress text and error for the GST page to poll, and
+a finished job saves its export to the run history like an interactive run,
+so the result is kept even when nobody is on the page any more.
+
+Very large files can still shard their matching across processes
+(``workers``); the pool only bounds how many runs are in flight.
+"""
+
+import datetime
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import gst_reco
+import ingest
+import instrument
+import run_history
+
+
+MAX_JOBS = int(os.environ.get("FRIDAY_MAX_JOBS", 2))
+
+# finished jobs kept for the status table; older ones are dropped
+KEEP_FINISHED = 50
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    """One submitted reconciliation and what is known about it so far."""
+
+    def __init__(self, job_id, name, gstr2b, books=None, owner=None, **params):
+        self.job_id = job_id
+        self.name = name
+        self.sources = (gstr2b, books)
+        self.owner = owner
+        self.params = params
+        self.state = QUEUED
+        self.pct = 0
+        self.text = "Waiting for a free worker"
+        self.error = None
+        self.summary = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def active(self):
+        return self.state in (QUEUED, RUNNING)
+
+    def report(self, pct, text):
+        self.pct, self.text = int(pct), text
+
+    def row(self):
+        """The job as one row of the status table."""
+        now = time.time()
+        started = self.started_at or now
+        summary = self.summary or {}
+        return {
+            "Job": self.job_id,
+            "File": self.name,
+            "State": self.state,
+            "Progress": self.pct,
+            "Status": self.error or self.text,
+            "Waited_s": round(started - self.submitted_at, 1),
+            "Run_s": round((self.finished_at or now) - started, 1) if self.started_at else None,
+            "Matched": (f"{summary['matched']}/{summary['total']}"
+                        if "matched" in summary else None),
+        }
+
+
+def run_reconciliation(job, folder=run_history.HISTORY_DIR):
+    """
+    Load, match and export one job's files, then save the run to history.
+    Returns the history summary.
+    """
+    params = job.params
+    gstr2b_source, books_source = job.sources
+    tracker = instrument.ThrottledProgress(job.report)
+    # tracemalloc / RSS peaks are process-wide, meaningless per thread
+    stages = instrument.Stages(memory=None)
+    start = time.perf_counter()
+
+    if books_source is not None or params.get("large_mode"):
+        tracker(5, "📂 Streaming files", force=True)
+        with stages.stage("load + prepare (streamed)") as record:
+            gstr2b, books = ingest.load_sources(gstr2b_source, books_source)
+            record["rows"] = len(gstr2b) + len(books)
+            record["frame_mb"] = instrument.frame_mb(gstr2b, books)
+        tracker(55, "⚙ Preparing reconciliation", force=True)
+    else:
+        tracker(5, "📂 Loading workbook", force=True)
+        with stages.stage("load") as record:
+            gstr2b, books = gst_reco.load_workbook(gstr2b_source)
+            record["rows"] = len(gstr2b) + len(books)
+            record["frame_mb"] = instrument.frame_mb(gstr2b, books)
+        tracker(15, "📂 Files loaded", force=True)
+        gstr2b, books = gst_reco.prepare_both(gstr2b, books, progress=tracker, stages=stages)
+
+    gstr2b, books = gst_reco.match(
+        gstr2b, books, params.get("tolerance", gst_reco.TOLERANCE),
+        params.get("date_window") or None,
+        progress=tracker, stages=stages,
+        fuzzy_threshold=params.get("fuzzy_threshold", gst_reco.FUZZY_THRESHOLD),
+        workers=params.get("workers"),
+    )
+
+    fmt = params.get("fmt", "xlsx")
+    tracker(95, "💾 Saving to history", force=True)
+    with stages.stage(f"export ({fmt})", rows=len(gstr2b) + len(books)):
+        export_data = gst_reco.export_bytes(gstr2b, books, fmt)
+
+    # job id in the name: two jobs can finish within the same second
+    timestamp = datetime.datetime.now().strftime("%d_%b_%Y_%H_%M_%S")
+    file_name = gst_reco.export_name(fmt, f"GST_Reco_{timestamp}_job{job.job_id}")
+    # save_run serialises writers of the shared history files itself
+    return run_history.save_run(
+        gstr2b, books, export_data, file_name, folder=folder,
+        source_name=job.name,
+        source_hash=params.get("source_hash"),
+        seconds=round(time.perf_counter() - start, 2),
+        stages=stages.records,
+        client=params.get("client"),
+    )
+
+
+class JobQueue:
+    """
+    Bounded pool of reconciliation jobs. Hold one per server process (the
+    GST page keeps it in ``st.cache_resource``) so every session shares the
+    same limit and jobs outlive the page that submitted them.
+    """
+
+    def __init__(self, max_jobs=MAX_JOBS, folder=run_history.HISTORY_DIR):
+        self.folder = folder
+        self.max_jobs = max(int(max_jobs), 1)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_jobs,
+                                       thread_name_prefix="reco-job")
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def submit(self, name, gstr2b, books=None, owner=None, **params):
+        """
+        Queue a run of ``gstr2b`` (a workbook with both sheets, or the
+        GSTR_2B file when ``books`` is given). File-like sources are copied
+        into memory, so an upload can be submitted and then discarded.
+        """
+        gstr2b, books = (
+            BytesIO(s.getvalue()) if hasattr(s, "getvalue") else s for s in (gstr2b, books)
+        )
+        with self.lock:
+            job = Job(next(self.ids), name, gstr2b, books, owner=owner, **params)
+            self.jobs[job.job_id] = job
+            self.prune()
+        self.pool.submit(self.run, job)
+        return job
+
+    def run(self, job):
+        job.state, job.started_at = RUNNING, time.time()
+        job.report(1, "⚙ Started")
+        try:
+            job.summary = run_reconciliation(job, self.folder)
+        except Exception as e:
+            job.state, job.error = FAILED, f"{type(e).__name__}: {e}"
+        else:
+            job.report(100, "✅ Saved to history")
+            job.state = DONE
+        finally:
+            job.finished_at = time.time()
+            # the uploaded bytes aren't needed any more
+            job.sources = (None, None)
+
+    def prune(self):
+        finished = [j for j in self.jobs.values() if not j.active]
+        for job in finished[:max(len(finished) - KEEP_FINISHED, 0)]:
+            del self.jobs[job.job_id]
+
+    def list(self, owner=None):
+        """Jobs of ``owner`` (all when None), newest first."""
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [j for j in reversed(jobs) if owner is None or j.owner == owner]
+
+    def counts(self):
+        """``{state: jobs}`` across every session."""
+        counts = dict.fromkeys([QUEUED, RUNNING, DONE, FAILED], 0)
+        for job in self.list():
+            counts[job.state] += 1
+        return counts
+
+    def shutdown(self, wait=True):
+        self.pool.shutdown(wait=wait)
@@ -0,0 +1,54 @@
+"""
+Headless rerun latency check for the app.
+
+Runs ``app.py`` with Streamlit's ``AppTest``, opens every menu page, then
+reruns each one ``--runs`` times and reports the script time the app's own
+``RerunProbe`` recorded. The first visit of a page (module import, cached
+resources) is reported separately. Exit code 1 when a page's p95 is above
+the target.
+
+    python latency_probe.py --runs 20 --target 50
+"""
+
+import argparse
+import sys
+
+import instrument
+import views
+
+
+def probe(runs=10, timeout=60):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file("app.py", default_timeout=timeout)
+    at.run()
+
+    results = {}
+    for label in views.MENU_VIEWS:
+        at.radio(key="menu").set_value(label).run()
+        for _ in range(runs):
+            at.run()
+        times = at.session_state["rerun_probe"][label]
+        results[label] = {"first_ms": times[-runs - 1],
+                          **instrument.latency_stats(times[-runs:])}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rerun latency per page")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target", type=float, default=instrument.RERUN_TARGET_MS,
+                        help="p95 target in ms")
+    args = parser.parse_args(argv)
+
+    slow = 0
+    for label, s in probe(args.runs).items():
+        ok = s["p95_ms"] <= args.target
+        slow += not ok
+        print(f"{'ok  ' if ok else 'SLOW'} {label:<24} first {s['first_ms']:>7.1f} ms  "
+              f"p50 {s['p50_ms']:>6.1f}  p95 {s['p95_ms']:>6.1f}")
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
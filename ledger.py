@@ -0,0 +1,264 @@
+"""
+Persistent invoice ledger for incremental month-over-month reconciliation.
+
+Every GSTR_2B and BOOKS line ever uploaded is kept in the client's ledger,
+``history/ledgers/<client>.sqlite``, with its status (OPEN / MATCHED),
+indexed by GSTIN + ``Invoice_No_CLEAN``. Each client has its own file, so
+one client's open items are never settled against another's.
+
+A run only ingests the rows the ledger hasn't seen, matches them together
+with the items still open from earlier periods (typically supplier filing
+delays), and updates statuses in place, so a monthly run costs in proportion
+to the new data and the open backlog, not to the whole history.
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from reco_engine import (
+    FUZZY_THRESHOLD,
+    REMARKS,
+    TAX_COLS,
+    TOLERANCE,
+    match_by_amount,
+    match_by_invoice,
+    match_combinations,
+    match_fuzzy,
+    to_paise,
+    to_rupees,
+)
+from run_history import HISTORY_DIR, client_key
+
+
+LEDGER_DIR = os.path.join(HISTORY_DIR, "ledgers")
+
+SIDES = {"GSTR_2B": "2B", "BOOKS": "BOOKS"}
+
+# frame column -> ledger column
+COLUMNS = {
+    "GSTIN": "gstin",
+    "Invoice_No": "invoice_no",
+    "Invoice_No_CLEAN": "invoice_no_clean",
+    "Supplier_Name": "supplier_name",
+    "Supplier_Name_CLEAN": "supplier_name_clean",
+    "Invoice_Date": "invoice_date",
+    "IGST": "igst",
+    "CGST": "cgst",
+    "SGST": "sgst",
+    "TAX_STRUCTURE": "tax_structure",
+}
+
+# fields that identify "the same line" when it is uploaded again
+KEY_COLS = ["GSTIN", "Invoice_No_CLEAN", "Supplier_Name_CLEAN", "Invoice_Date",
+            "IGST", "CGST", "SGST"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS invoices (
+    side            TEXT NOT NULL,
+    row_key         TEXT NOT NULL,
+    {", ".join(f"{c} {'REAL' if c in ('igst', 'cgst', 'sgst') else 'TEXT'}" for c in COLUMNS.values())},
+    status          TEXT NOT NULL,
+    period          TEXT,
+    matched_period  TEXT,
+    PRIMARY KEY (side, row_key)
+);
+CREATE INDEX IF NOT EXISTS invoices_key ON invoices (gstin, invoice_no_clean);
+CREATE INDEX IF NOT EXISTS invoices_open ON invoices (side, status);
+"""
+
+
+def ledger_path(client, folder=LEDGER_DIR):
+    """The ledger file of ``client``."""
+    key = client_key(client)
+    if not key:
+        raise ValueError("Incremental runs need a client: each client keeps its own ledger")
+    return os.path.join(folder, f"{key}.sqlite")
+
+
+@contextmanager
+def connect(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# ==============================
+# Row identity
+# ==============================
+
+def normalised_dates(s):
+    return pd.to_datetime(s, errors="coerce", dayfirst=True)
+
+
+def row_keys(df):
+    """
+    Stable key per row: a hash of the identifying fields plus the row's
+    occurrence number, so genuine duplicate lines in one upload stay distinct.
+    Amounts are hashed in rupees, as they were before frames held paise.
+    """
+    fields = pd.DataFrame({
+        col: df[col].astype(str) if col in df.columns else ""
+        for col in KEY_COLS
+    })
+    for col in TAX_COLS:
+        if col in df.columns:
+            fields[col] = pd.Series(to_rupees(df[col]), index=df.index).astype(str)
+    if "Invoice_Date" in df.columns:
+        fields["Invoice_Date"] = normalised_dates(df["Invoice_Date"]).dt.strftime("%Y-%m-%d")
+    h = pd.util.hash_pandas_object(fields, index=False)
+    occurrence = h.groupby(h).cumcount()
+    return pd.Series(
+        [f"{a:016x}-{b}" for a, b in zip(h.to_numpy(), occurrence.to_numpy())],
+        index=df.index,
+    )
+
+
+def statuses(conn, side, keys):
+    """``{row_key: status}`` for the given keys already in the ledger."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS probe (row_key TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM probe")
+    conn.executemany("INSERT OR IGNORE INTO probe VALUES (?)", ((k,) for k in keys))
+    return dict(conn.execute(
+        "SELECT i.row_key, i.status FROM invoices i JOIN probe p USING (row_key) "
+        "WHERE i.side = ?",
+        (side,),
+    ))
+
+
+# ==============================
+# Ledger <-> frames
+# ==============================
+
+def open_items(conn, side):
+    cols = ", ".join(COLUMNS.values())
+    df = pd.read_sql_query(
+        f"SELECT row_key, {cols} FROM invoices WHERE side = ? AND status = 'OPEN' "
+        "ORDER BY rowid",
+        conn,
+        params=(side,),
+    )
+    df = df.rename(columns={v: k for k, v in COLUMNS.items()})
+    df["Invoice_Date"] = pd.to_datetime(df["Invoice_Date"], errors="coerce")
+    # the ledger keeps rupees; frames hold paise
+    for col in TAX_COLS:
+        df[col] = to_paise(df[col].fillna(0))
+    return df.rename(columns={"row_key": "_KEY"})
+
+
+def working_frame(open_df, delta):
+    delta = delta.copy()
+    if "Invoice_Date" in delta.columns:
+        delta["Invoice_Date"] = normalised_dates(delta["Invoice_Date"])
+    cols = ["_KEY"] + [c for c in COLUMNS if c in delta.columns or c in open_df.columns]
+    work = pd.concat(
+        [open_df.reindex(columns=cols), delta.reindex(columns=cols)],
+        ignore_index=True,
+    )
+    for col in TAX_COLS:
+        work[col] = work[col].fillna(0).astype(np.int64)
+    work["Invoice_No_CLEAN"] = work["Invoice_No_CLEAN"].fillna("").astype(object)
+    work["RECO_REMARK"] = "NOT MATCHED"
+    work["USED"] = False
+    work["MATCH_SCORE"] = np.nan
+    work["MATCH_GROUP"] = None
+    return work
+
+
+def ledger_rows(work, side, period):
+    out = pd.DataFrame({"side": side, "row_key": work["_KEY"]})
+    for frame_col, ledger_col in COLUMNS.items():
+        values = work[frame_col] if frame_col in work.columns else None
+        if frame_col == "Invoice_Date" and values is not None:
+            values = values.dt.strftime("%Y-%m-%d")
+        elif frame_col in TAX_COLS and values is not None:
+            values = to_rupees(values)
+        out[ledger_col] = values
+    out["status"] = np.where(work["USED"], "MATCHED", "OPEN")
+    out["period"] = period
+    out["matched_period"] = np.where(work["USED"], period, None)
+    out = out.astype(object).where(out.notna(), None)
+    return out.itertuples(index=False, name=None)
+
+
+# ==============================
+# Incremental run
+# ==============================
+
+def reconcile_incremental(gstr2b, books, period, tolerance=TOLERANCE,
+                          date_window=None, path=None,
+                          fuzzy_threshold=FUZZY_THRESHOLD, client=None):
+    """
+    Match the new rows of prepared ``gstr2b``/``books`` frames against each
+    other and against the open items of ``client``'s ledger (or the ledger
+    at ``path``), then record the outcome.
+
+    Rows already in the ledger are not matched again. The returned frames
+    carry each row's current ledger status in ``RECO_REMARK``/``USED``, and
+    ``MATCH_SCORE``/``MATCH_GROUP`` for rows matched in this run, together
+    with a dict of run statistics.
+    """
+    path = path or ledger_path(client)
+    frames = {"GSTR_2B": gstr2b, "BOOKS": books}
+    keys = {name: row_keys(df) for name, df in frames.items()}
+    stats = {}
+
+    with connect(path) as conn:
+        work = {}
+        for name, df in frames.items():
+            side = SIDES[name]
+            known = statuses(conn, side, keys[name])
+            new = ~keys[name].isin(list(known))
+            # assign the filtered keys: assigning the full Series to an
+            # empty frame would adopt its whole index
+            delta = df[new].assign(_KEY=keys[name][new])
+            carried = open_items(conn, side)
+            work[name] = working_frame(carried, delta)
+            stats[name] = {"new_rows": len(delta), "carried_open": len(carried),
+                           "already_seen": len(df) - len(delta)}
+
+        match_by_invoice(work["GSTR_2B"], work["BOOKS"], tolerance)
+        match_fuzzy(work["GSTR_2B"], work["BOOKS"], tolerance, fuzzy_threshold)
+        match_combinations(work["GSTR_2B"], work["BOOKS"], tolerance)
+        match_by_amount(work["GSTR_2B"], work["BOOKS"], tolerance, date_window)
+
+        for name, w in work.items():
+            side = SIDES[name]
+            carried = stats[name]["carried_open"]
+            old, new = w.iloc[:carried], w.iloc[carried:]
+
+            settled = old.loc[old["USED"], "_KEY"]
+            conn.executemany(
+                "UPDATE invoices SET status = 'MATCHED', matched_period = ? "
+                "WHERE side = ? AND row_key = ?",
+                ((period, side, k) for k in settled),
+            )
+            conn.executemany(
+                f"INSERT INTO invoices VALUES ({', '.join('?' * (len(COLUMNS) + 5))})",
+                ledger_rows(new, side, period),
+            )
+            stats[name]["settled_from_earlier"] = len(settled)
+
+        for name, df in frames.items():
+            current = statuses(conn, SIDES[name], keys[name])
+            matched = (keys[name].map(current) == "MATCHED").to_numpy()
+            df["RECO_REMARK"] = pd.Categorical.from_codes(matched.astype(np.int8), dtype=REMARKS)
+            df["USED"] = matched
+            scored = work[name].set_index("_KEY")
+            df["MATCH_SCORE"] = keys[name].map(scored["MATCH_SCORE"]).to_numpy(dtype=float)
+            group = keys[name].map(scored["MATCH_GROUP"]).astype(object)
+            df["MATCH_GROUP"] = group.where(group.notna(), None)
+            stats[name]["still_open"] = conn.execute(
+                "SELECT COUNT(*) FROM invoices WHERE side = ? AND status = 'OPEN'",
+                (SIDES[name],),
+            ).fetchone()[0]
+
+    return gstr2b, books, stats
@@ -0,0 +1,165 @@
+"""
+Cleaning of column headers, invoice numbers, supplier names and tax structure.
+
+The scalar functions are the original per-cell rules of the GST page. The
+``*_col`` functions apply the same rules to a whole column with pandas
+``.str`` operations and ``np.select`` instead of ``Series.apply``.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+SUPPLIER_NOISE = ["PVT", "LTD", "LIMITED", "LLP", "."]
+
+TAX_STRUCTURES = pd.CategoricalDtype(["IGST", "CGST_SGST", "OTHER"])
+
+COLUMN_MAPPING = {
+    "Supplier Name": "Supplier_Name",
+    "Party Name": "Supplier_Name",
+    "Vendor Name": "Supplier_Name",
+    "Invoice No": "Invoice_No",
+    "Invoice Number": "Invoice_No",
+    "Bill No": "Invoice_No",
+    "Integrated Tax": "IGST",
+    "Central Tax": "CGST",
+    "State Tax": "SGST",
+}
+
+
+# ==============================
+# Column headers
+# ==============================
+
+def normalise_columns(df):
+    df.columns = (
+        df.columns.astype(str)
+        .str.strip()
+        .str.replace("\u00a0", "", regex=True)
+        .str.replace("\n", "", regex=True)
+        .str.replace("\r", "", regex=True)
+    )
+    return df
+
+
+def map_columns(df):
+    df.rename(columns=COLUMN_MAPPING, inplace=True)
+    return df
+
+
+# ==============================
+# Per-cell rules
+# ==============================
+
+def clean_supplier(x):
+    if pd.isna(x):
+        return ""
+    return (
+        str(x).upper()
+        .replace("PVT", "")
+        .replace("LTD", "")
+        .replace("LIMITED", "")
+        .replace("LLP", "")
+        .replace(".", "")
+        .strip()
+    )
+
+
+def clean_invoice(x):
+    if pd.isna(x):
+        return ""
+    return re.sub(r"[^A-Z0-9]", "", str(x).upper())
+
+
+def tax_structure(r):
+    if r["IGST"] > 0 and r["CGST"] == 0 and r["SGST"] == 0:
+        return "IGST"
+    if r["IGST"] == 0 and r["CGST"] > 0 and r["SGST"] > 0:
+        return "CGST_SGST"
+    return "OTHER"
+
+
+# ==============================
+# Column versions
+# ==============================
+
+def integral_text(s):
+    """
+    ``s`` with whole-number floats stored as ints. A numeric code column with
+    blanks is read as float, so without this 1001 would become "1001.0" in
+    one sheet or chunk and "1001" in another.
+    """
+    if not pd.api.types.is_float_dtype(s.dtype):
+        return s
+    values = s.to_numpy(dtype=float, na_value=np.nan)
+    whole = np.isfinite(values) & (values == np.floor(values)) & (np.abs(values) < 2**53)
+    out = s.astype(object)
+    out[whole] = values[whole].astype(np.int64)
+    return out
+
+
+def upper_alnum(text):
+    """
+    Upper-cased ``text`` with everything but A-Z / 0-9 removed. Arrow-backed
+    strings upper-case without Python's special casing (``ß`` -> ``SS``), so
+    the few non-ASCII cells go through ``clean_invoice`` to stay identical.
+    """
+    out = (
+        text.str.upper()
+        .str.replace(r"[^A-Z0-9]", "", regex=True)
+        .fillna("").astype(object)
+    )
+    special = text.str.contains(r"[^\x00-\x7f]", regex=True, na=False).to_numpy(dtype=bool)
+    if special.any():
+        out[special] = text[special].map(clean_invoice)
+    return out
+
+
+def clean_invoice_col(s):
+    """``clean_invoice`` over a whole column."""
+    return upper_alnum(s.astype(str))
+
+
+def clean_supplier_col(s):
+    """
+    ``clean_supplier`` over a whole column.
+
+    Vendor names repeat thousands of times, so each distinct name is cleaned
+    once and the results are broadcast back with the factorized codes.
+    """
+    missing = s.isna().to_numpy()
+    codes, uniques = pd.factorize(s[~missing].astype(str))
+
+    cleaned = pd.Series(uniques, dtype=object).str.upper()
+    for token in SUPPLIER_NOISE:
+        cleaned = cleaned.str.replace(token, "", regex=False)
+    cleaned = cleaned.str.strip().to_numpy(dtype=object)
+
+    out = np.full(len(s), "", dtype=object)
+    out[~missing] = cleaned[codes]
+    return pd.Series(out, index=s.index)
+
+
+def tax_structure_col(df):
+    """``tax_structure`` over every row of ``df``, as a ``TAX_STRUCTURES`` categorical."""
+    igst, cgst, sgst = df["IGST"], df["CGST"], df["SGST"]
+    codes = np.select(
+        [
+            (igst > 0) & (cgst == 0) & (sgst == 0),
+            (igst == 0) & (cgst > 0) & (sgst > 0),
+        ],
+        [0, 1],
+        default=2,
+    )
+    structure = pd.Categorical.from_codes(codes.astype(np.int8), dtype=TAX_STRUCTURES)
+    return pd.Series(structure, index=df.index)
+
+
+def clean_gstin_col(df):
+    """GSTIN upper-cased with separators removed, ``""`` when missing."""
+    if "GSTIN" not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    gstin = df["GSTIN"].astype(object)
+    return upper_alnum(gstin.where(gstin.notna(), "").astype(str))
@@ -0,0 +1,253 @@
+"""
+Notes kept in SQLite with a full-text index.
+
+Each note has tags and optional client / GSTIN links. An FTS5 index over the
+body, tags and client, kept in sync by triggers, answers searches over tens
+of thousands of notes without scanning them, and listing is paged with
+LIMIT / OFFSET like the History page. ``import_notes_txt`` moves the old
+flat ``notes.txt`` in once.
+"""
+
+import datetime
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+NOTES_PATH = "notes.sqlite"
+LEGACY_NOTES = "notes.txt"
+
+# stored as PRAGMA user_version once SCHEMA has been applied to a file
+SCHEMA_VERSION = 1
+
+GSTIN_PATTERN = re.compile(r"\b\d{2}[A-Z]{5}\d{4}[A-Z][0-9A-Z]Z[0-9A-Z]\b")
+
+# "2026-01-05 10:11:12.123456 - text", as the old Save button wrote them
+LEGACY_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?) - (.*)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    note_id     INTEGER PRIMARY KEY,
+    created_at  TEXT NOT NULL,
+    body        TEXT NOT NULL,
+    tags        TEXT NOT NULL DEFAULT '',
+    client      TEXT,
+    gstin       TEXT,
+    source      TEXT
+);
+CREATE INDEX IF NOT EXISTS notes_created ON notes (created_at);
+CREATE INDEX IF NOT EXISTS notes_client ON notes (client);
+CREATE INDEX IF NOT EXISTS notes_gstin ON notes (gstin);
+
+CREATE TABLE IF NOT EXISTS note_tags (
+    note_id  INTEGER NOT NULL REFERENCES notes (note_id) ON DELETE CASCADE,
+    tag      TEXT NOT NULL,
+    PRIMARY KEY (tag, note_id)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    body, tags, client, content='notes', content_rowid='note_id'
+);
+CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts (rowid, body, tags, client)
+    VALUES (new.note_id, new.body, new.tags, new.client);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts (notes_fts, rowid, body, tags, client)
+    VALUES ('delete', old.note_id, old.body, old.tags, old.client);
+END;
+
+CREATE TABLE IF NOT EXISTS imports (
+    path         TEXT PRIMARY KEY,
+    size_bytes   INTEGER,
+    imported_at  TEXT NOT NULL,
+    notes        INTEGER
+);
+"""
+
+
+@contextmanager
+def connect(path=NOTES_PATH):
+    """Open the notes store, committing on success and always closing."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        # a few connections per page rerun: run the DDL (FTS5 table and
+        # triggers included) only on a file that hasn't had it yet
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            conn.executescript(f"{SCHEMA}\nPRAGMA user_version = {SCHEMA_VERSION};")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# ==============================
+# Writing
+# ==============================
+
+def parse_tags(text):
+    """``"GST, refund #urgent"`` -> ``["gst", "refund", "urgent"]``."""
+    tags = re.split(r"[\s,#;]+", str(text or "").lower())
+    return list(dict.fromkeys(t for t in tags if t))
+
+
+def find_gstin(text):
+    match = GSTIN_PATTERN.search(str(text or "").upper())
+    return match.group(0) if match else None
+
+
+def insert_notes(conn, rows):
+    """
+    Insert ``(created_at, body, tags, client, gstin, source)`` rows. A GSTIN
+    mentioned in the body is linked when none is given. Returns the count.
+    """
+    count = 0
+    for created_at, body, tags, client, gstin, source in rows:
+        tags = parse_tags(" ".join(tags) if isinstance(tags, (list, tuple)) else tags)
+        gstin = (gstin or "").strip().upper() or find_gstin(body)
+        cur = conn.execute(
+            "INSERT INTO notes (created_at, body, tags, client, gstin, source) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (created_at, body, " ".join(tags), (client or "").strip() or None,
+             gstin, source),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO note_tags (note_id, tag) VALUES (?, ?)",
+            ((cur.lastrowid, t) for t in tags),
+        )
+        count += 1
+    return count
+
+
+def add_note(body, tags="", client=None, gstin=None, path=NOTES_PATH):
+    body = str(body or "").strip()
+    if not body:
+        raise ValueError("Empty note")
+    now = datetime.datetime.now().isoformat(sep=" ", timespec="seconds")
+    with connect(path) as conn:
+        insert_notes(conn, [(now, body, tags, client, gstin, "app")])
+
+
+def delete_note(note_id, path=NOTES_PATH):
+    with connect(path) as conn:
+        conn.execute("DELETE FROM notes WHERE note_id = ?", (note_id,))
+
+
+# ==============================
+# notes.txt import
+# ==============================
+
+def legacy_notes(lines):
+    """
+    ``(created_at, body)`` per note of the old file. Lines without a
+    timestamp are continuation lines of a multi-line note.
+    """
+    created_at, body = None, []
+    for line in lines:
+        line = line.rstrip("\n")
+        match = LEGACY_LINE.match(line)
+        if match:
+            if created_at is not None:
+                yield created_at, "\n".join(body).strip()
+            created_at = match.group(1)[:19]
+            body = [match.group(2)]
+        elif created_at is not None:
+            body.append(line)
+    if created_at is not None:
+        yield created_at, "\n".join(body).strip()
+
+
+def import_notes_txt(txt_path=LEGACY_NOTES, path=NOTES_PATH):
+    """
+    Import the old flat notes file once. Returns the number of notes
+    imported; 0 when the file is missing or was already imported.
+    """
+    if not os.path.exists(txt_path):
+        return 0
+    key = os.path.abspath(txt_path)
+
+    with connect(path) as conn:
+        if conn.execute("SELECT 1 FROM imports WHERE path = ?", (key,)).fetchone():
+            return 0
+        with open(txt_path, encoding="utf-8", errors="replace") as f:
+            count = insert_notes(conn, (
+                (created_at, body, "", None, None, LEGACY_NOTES)
+                for created_at, body in legacy_notes(f) if body
+            ))
+        conn.execute(
+            "INSERT INTO imports (path, size_bytes, imported_at, notes) VALUES (?, ?, ?, ?)",
+            (key, os.path.getsize(txt_path),
+             datetime.datetime.now().isoformat(timespec="seconds"), count),
+        )
+    return count
+
+
+def legacy_import_pending(txt_path=LEGACY_NOTES, path=NOTES_PATH):
+    if not os.path.exists(txt_path):
+        return False
+    with connect(path) as conn:
+        return conn.execute(
+            "SELECT 1 FROM imports WHERE path = ?", (os.path.abspath(txt_path),)
+        ).fetchone() is None
+
+
+# ==============================
+# Reading
+# ==============================
+
+def fts_query(search):
+    """Free text -> FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r"\w+", str(search or ""))
+    return " AND ".join(f'"{w}"*' for w in words)
+
+
+def note_filters(search="", tag=None, client=None, gstin=None):
+    clauses, params = ["1 = 1"], []
+    query = fts_query(search)
+    if query:
+        clauses.append("note_id IN (SELECT rowid FROM notes_fts WHERE notes_fts MATCH ?)")
+        params.append(query)
+    if tag:
+        clauses.append("note_id IN (SELECT note_id FROM note_tags WHERE tag = ?)")
+        params.append(tag.lower())
+    if client:
+        clauses.append("client LIKE ?")
+        params.append(f"%{client}%")
+    if gstin:
+        clauses.append("gstin = ?")
+        params.append(gstin.strip().upper())
+    return " AND ".join(clauses), params
+
+
+def count_notes(path=NOTES_PATH, **filters):
+    where, params = note_filters(**filters)
+    with connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM notes WHERE {where}", params).fetchone()[0]
+
+
+def list_notes(path=NOTES_PATH, limit=25, offset=0, **filters):
+    """One page of notes, newest first, as a DataFrame."""
+    where, params = note_filters(**filters)
+    with connect(path) as conn:
+        return pd.read_sql_query(
+            f"""
+            SELECT note_id, created_at, body, tags, client, gstin
+            FROM notes WHERE {where}
+            ORDER BY created_at DESC, note_id DESC LIMIT ? OFFSET ?
+            """,
+            conn,
+            params=params + [limit, offset],
+        )
+
+
+def tag_counts(path=NOTES_PATH):
+    """``{tag: notes}``, most used first."""
+    with connect(path) as conn:
+        return dict(conn.execute(
+            "SELECT tag, COUNT(*) FROM note_tags GROUP BY tag ORDER BY COUNT(*) DESC, tag"
+        ))
@@ -0,0 +1,93 @@
+"""
+Cache of reconciliation results keyed by the uploaded file contents.
+
+Streamlit reruns the script on every click, so without this a download or a
+page switch loses the result and the user has to run the reconciliation
+again. Entries hold the reconciled frames and any exports built from them,
+and the cache evicts least recently used entries past a size budget.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+from reco_engine import ENGINE_VERSION
+
+
+MAX_BYTES = 512 * 1024 * 1024
+MAX_ENTRIES = 8
+
+
+def content_key(files, **params):
+    """Hash of the uploaded files' bytes, the run parameters and the engine version."""
+    h = hashlib.sha256()
+    for f in files:
+        if f is None:
+            continue
+        h.update(f.getvalue() if hasattr(f, "getvalue") else f)
+        h.update(b"\0")
+    for name in sorted(params):
+        h.update(f"{name}={params[name]!r};".encode())
+    h.update(f"engine={ENGINE_VERSION}".encode())
+    return h.hexdigest()
+
+
+def entry_size(entry):
+    size = 0
+    for value in entry.values():
+        if hasattr(value, "memory_usage"):
+            size += int(value.memory_usage(deep=True).sum())
+        elif isinstance(value, (bytes, bytearray)):
+            size += len(value)
+        elif isinstance(value, dict):
+            size += entry_size(value)
+    return size
+
+
+class ResultCache:
+    """Size-bounded LRU of ``key -> entry dict``."""
+
+    def __init__(self, max_bytes=MAX_BYTES, max_entries=MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def size(self):
+        return sum(entry_size(e) for e in self.entries.values())
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        self.evict()
+        return entry
+
+    def evict(self):
+        """Drop least recently used entries until within budget. Call again
+        after growing an entry (e.g. adding an export)."""
+        sizes = {key: entry_size(e) for key, e in self.entries.items()}
+        total = sum(sizes.values())
+        # the newest entry is always kept, even when it alone is over budget
+        while len(self.entries) > 1 and (
+            len(self.entries) > self.max_entries or total > self.max_bytes
+        ):
+            key, _ = self.entries.popitem(last=False)
+            total -= sizes[key]
+
+
+def session_cache(state, name="reco_cache"):
+    """The ``ResultCache`` stored in a Streamlit ``session_state``."""
+    if name not in state:
+        state[name] = ResultCache()
+    return state[name]
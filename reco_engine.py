@@ -0,0 +1,668 @@
+"""
+GST 2B vs Books matching engine.
+
+The Streamlit page used to walk every BOOKS invoice group and re-filter the
+whole GSTR_2B frame for it. The functions here do the same matching with
+grouped aggregates and a single hash join, so the cost grows with the number
+of rows instead of groups x rows.
+
+Between the exact invoice pass and the tax amount fallback, ``match_fuzzy``
+pairs near-miss invoice numbers ("INV/001" vs "INV-0001") of the same
+supplier, with a similarity score per match.
+
+Prepared frames carry IGST/CGST/SGST as integer paise and ``RECO_REMARK`` /
+``TAX_STRUCTURE`` as categoricals. Every function here takes ``tolerance``
+in rupees and compares amounts in paise, so a difference of exactly the
+tolerance is always within it.
+"""
+
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+from normalise import clean_gstin_col
+
+
+# Bump whenever a change can alter match results; cached results are keyed on it.
+ENGINE_VERSION = "5"
+
+TOLERANCE = 1
+TAX_COLS = ["IGST", "CGST", "SGST"]
+
+# amounts are fixed point: int64 paise
+PAISE = 100
+
+REMARKS = pd.CategoricalDtype(["NOT MATCHED", "MATCHED"])
+
+PROGRESS_EVERY = 2000
+
+FUZZY_THRESHOLD = 0.8
+NGRAM = 3
+# best n-gram overlaps scored per BOOKS invoice, and the posting list length
+# past which a gram is too common within a block to be worth visiting
+MAX_CANDIDATES = 20
+MAX_POSTING = 1000
+
+
+def to_paise(values):
+    """Rupee amounts (array-like or scalar) -> int64 paise, rounded to the paisa."""
+    return np.rint(np.asarray(values, dtype=float) * PAISE).astype(np.int64)
+
+
+def to_rupees(values):
+    return np.asarray(values) / PAISE
+
+
+def paise_tolerance(tolerance):
+    return int(to_paise(tolerance))
+
+
+def tax_amounts(df):
+    """IGST/CGST/SGST of a prepared frame as an n x 3 int64 paise array."""
+    return df[TAX_COLS].to_numpy(dtype=np.int64)
+
+
+def mark_matched(df, mask, score=None):
+    """Flag ``mask`` rows as matched; ``score`` goes to ``MATCH_SCORE``."""
+    df.loc[mask, "RECO_REMARK"] = "MATCHED"
+    df.loc[mask, "USED"] = True
+    if score is not None:
+        df.loc[mask, "MATCH_SCORE"] = score[mask] if np.ndim(score) else score
+
+
+# ==============================
+# STEP 4 — Invoice number matching
+# ==============================
+
+def match_by_invoice(gstr2b, books, tolerance=TOLERANCE):
+    """
+    Match BOOKS invoice groups against single GSTR_2B lines.
+
+    A BOOKS group is every row sharing an ``Invoice_No_CLEAN``; its tax
+    structure is the one of its first row. A GSTR_2B line is a candidate when
+    it is unused and has the same invoice number and tax structure, and the
+    group is paired with the first candidate (in sheet order) whose IGST, CGST
+    and SGST are each within ``tolerance`` of the group sums. Matched rows get
+    ``RECO_REMARK = "MATCHED"`` and ``USED = True`` on both frames.
+
+    Returns the number of BOOKS groups matched.
+    """
+    tolerance = paise_tolerance(tolerance)
+    keyed = books[books["Invoice_No_CLEAN"] != ""]
+    if keyed.empty:
+        return 0
+
+    grouped = keyed.groupby("Invoice_No_CLEAN", sort=False)
+    groups = grouped[TAX_COLS].sum()
+    groups["TAX_STRUCTURE"] = grouped["TAX_STRUCTURE"].first()
+    groups = groups.reset_index()
+
+    # GSTR_2B lines are kept one per row: a group pairs with a single line,
+    # so summing them by key would change which line gets matched.
+    candidates = gstr2b[["Invoice_No_CLEAN", "TAX_STRUCTURE"] + TAX_COLS].copy()
+    candidates["_POS"] = np.arange(len(gstr2b))
+    candidates = candidates[~gstr2b["USED"].to_numpy()]
+
+    pairs = groups.merge(
+        candidates,
+        on=["Invoice_No_CLEAN", "TAX_STRUCTURE"],
+        suffixes=("_BOOKS", "_2B"),
+    )
+
+    within = np.ones(len(pairs), dtype=bool)
+    for col in TAX_COLS:
+        diff = (pairs[f"{col}_2B"] - pairs[f"{col}_BOOKS"]).abs()
+        within &= (diff <= tolerance).to_numpy()
+
+    hits = (
+        pairs.loc[within, ["Invoice_No_CLEAN", "_POS"]]
+        .sort_values("_POS", kind="stable")
+        .drop_duplicates("Invoice_No_CLEAN", keep="first")
+    )
+    if hits.empty:
+        return 0
+
+    mark_matched(books, books["Invoice_No_CLEAN"].isin(hits["Invoice_No_CLEAN"]), 1.0)
+
+    used = np.zeros(len(gstr2b), dtype=bool)
+    used[hits["_POS"].to_numpy()] = True
+    mark_matched(gstr2b, used, 1.0)
+
+    return len(hits)
+
+
+# ==============================
+# STEP 4A — Fuzzy invoice matching
+# ==============================
+
+LEADING_ZEROS = re.compile(r"(?<![0-9])0+(?=[0-9])")
+
+
+def fuzzy_form(invoice):
+    """Cleaned invoice number with leading zeros of number runs dropped."""
+    return LEADING_ZEROS.sub("", invoice)
+
+
+def invoice_ngrams(text, n=NGRAM):
+    padded = f"^{text}$"
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def similarity(a, b, cutoff=0.0):
+    """
+    1 - Levenshtein distance / length of the longer string. Returns 0 early
+    when the length difference alone keeps it below ``cutoff``.
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    if len(a) < len(b):
+        a, b = b, a
+    if 1 - (len(a) - len(b)) / len(a) < cutoff:
+        return 0.0
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return 1 - prev[-1] / len(a)
+
+
+def block_keys(gstin, name):
+    """Blocks a GSTR_2B line is filed under: its GSTIN and its supplier name."""
+    keys = []
+    if gstin:
+        keys.append(f"GSTIN:{gstin}")
+    if name:
+        keys.append(f"NAME:{name}")
+    return keys
+
+
+def query_blocks(df):
+    """Block each BOOKS row is looked up in: GSTIN, else supplier name."""
+    gstin = clean_gstin_col(df)
+    name = df["Supplier_Name_CLEAN"].astype(object).fillna("").astype(str)
+    block = np.where(
+        gstin != "", "GSTIN:" + gstin, np.where(name != "", "NAME:" + name, "")
+    )
+    return pd.Series(block, index=df.index, dtype=object)
+
+
+class InvoiceNgramIndex:
+    """
+    Character n-gram postings of GSTR_2B invoice numbers per block.
+
+    A lookup only visits lines of the same GSTIN / supplier that share an
+    n-gram with the query, and filters them on tax structure and amounts
+    with array operations, so the number of invoice comparisons stays
+    proportional to the rows instead of BOOKS x GSTR_2B. ``tolerance`` is
+    in paise.
+    """
+
+    def __init__(self, gstr2b, rows, forms, blocks, tolerance=TOLERANCE * PAISE):
+        self.tolerance = tolerance
+        self.amounts = tax_amounts(gstr2b)
+        self.structure = gstr2b["TAX_STRUCTURE"].to_numpy(dtype=object)
+        self.used = gstr2b["USED"].to_numpy().copy()
+
+        postings = {}
+        for pos in rows:
+            grams = invoice_ngrams(forms[pos])
+            for block in blocks[pos]:
+                for gram in grams:
+                    postings.setdefault((block, gram), []).append(pos)
+        self.postings = {
+            key: np.array(positions, dtype=np.int64)
+            for key, positions in postings.items()
+        }
+
+    def candidates(self, block, form, structure, amounts):
+        """
+        Unused positions in ``block`` with the same tax structure and amounts
+        within tolerance that share n-grams with ``form``, most shared
+        first (then in sheet order), at most ``MAX_CANDIDATES``.
+        """
+        lists = [
+            self.postings[(block, gram)]
+            for gram in invoice_ngrams(form)
+            if (block, gram) in self.postings
+        ]
+        if not lists:
+            return []
+        lists.sort(key=len)
+        # skip grams common to most of a big block, but keep at least one
+        lists = [p for p in lists if len(p) <= MAX_POSTING] or lists[:1]
+
+        positions, shared = np.unique(np.concatenate(lists), return_counts=True)
+        keep = ~self.used[positions] & (self.structure[positions] == structure)
+        keep &= (np.abs(self.amounts[positions] - amounts) <= self.tolerance).all(axis=1)
+        positions, shared = positions[keep], shared[keep]
+
+        order = np.lexsort((positions, -shared))[:MAX_CANDIDATES]
+        return positions[order].tolist()
+
+
+def match_fuzzy(gstr2b, books, tolerance=TOLERANCE, threshold=FUZZY_THRESHOLD,
+                progress=None):
+    """
+    Pair still unmatched BOOKS invoice groups with GSTR_2B lines of the same
+    supplier whose invoice number is similar ("INV/001" vs "INV-0001").
+
+    Candidates are blocked by GSTIN, or by ``Supplier_Name_CLEAN`` when the
+    BOOKS row has no GSTIN, and looked up through an ``InvoiceNgramIndex``.
+    Invoice numbers are compared by edit distance after dropping leading
+    zeros of number runs. BOOKS rows are grouped per block and invoice
+    number and amount-checked like in ``match_by_invoice``; among the
+    candidates the most similar one scoring at least ``threshold`` wins (the
+    earliest on ties). The score is written to ``MATCH_SCORE`` on both frames.
+
+    Returns the number of BOOKS groups matched.
+    """
+    pending = ~books["USED"].to_numpy() & (books["Invoice_No_CLEAN"] != "").to_numpy()
+    open_books = books[pending]
+    if open_books.empty or not threshold:
+        return 0
+    tolerance = paise_tolerance(tolerance)
+
+    blocks_books = query_blocks(open_books)
+    grouped = open_books.groupby([blocks_books, open_books["Invoice_No_CLEAN"]], sort=False)
+    groups = grouped[TAX_COLS].sum()
+    groups["TAX_STRUCTURE"] = grouped["TAX_STRUCTURE"].first()
+
+    invoices_2b = gstr2b["Invoice_No_CLEAN"].astype(str).tolist()
+    forms = [fuzzy_form(inv) for inv in invoices_2b]
+    blocks = [
+        block_keys(g, n) for g, n in zip(
+            clean_gstin_col(gstr2b).tolist(),
+            gstr2b["Supplier_Name_CLEAN"].astype(object).fillna("").astype(str).tolist(),
+        )
+    ]
+    rows = [
+        pos for pos in np.flatnonzero(~gstr2b["USED"].to_numpy()).tolist()
+        if invoices_2b[pos]
+    ]
+    index = InvoiceNgramIndex(gstr2b, rows, forms, blocks, tolerance)
+
+    matched_invoices = {}
+    scores_2b = np.full(len(gstr2b), np.nan)
+
+    total = len(groups)
+    for done, ((block, invoice), amounts, structure) in enumerate(zip(
+        groups.index, groups[TAX_COLS].to_numpy(dtype=np.int64), groups["TAX_STRUCTURE"],
+    )):
+        if progress and done % PROGRESS_EVERY == 0:
+            progress(done, total)
+        if not block:
+            continue
+
+        form = fuzzy_form(invoice)
+        best, best_score = None, threshold
+        for pos in index.candidates(block, form, structure, amounts):
+            score = similarity(form, forms[pos], best_score)
+            if score > best_score or (score == best_score and (best is None or pos < best)):
+                best, best_score = pos, score
+
+        if best is not None:
+            index.used[best] = True
+            scores_2b[best] = best_score
+            matched_invoices[(block, invoice)] = best_score
+
+    if not matched_invoices:
+        return 0
+
+    hit_2b = ~np.isnan(scores_2b)
+    mark_matched(gstr2b, hit_2b, np.round(scores_2b, 3))
+
+    scores_books = np.full(len(books), np.nan)
+    scores_books[pending] = [
+        matched_invoices.get(key, np.nan)
+        for key in zip(blocks_books, open_books["Invoice_No_CLEAN"])
+    ]
+    hit_books = ~np.isnan(scores_books)
+    mark_matched(books, hit_books, np.round(scores_books, 3))
+
+    return len(matched_invoices)
+
+
+# ==============================
+# STEP 4B — Split and consolidated invoices
+# ==============================
+
+# lines on the "many" side of one combination
+MAX_PARTS = 4
+# candidates searched per target: two halves of 2^10 subset sums
+MITM_ITEMS = 20
+# parts must carry the target's invoice date (+/- days) when both have one;
+# wider windows mostly add coincidental sums on busy suppliers
+COMBINE_DATE_WINDOW = 0
+# subset sums enumerated per supplier block before the block is given up
+BLOCK_BUDGET = 2_000_000
+
+
+def subset_sums(amounts):
+    """Membership masks (2^n x n) and IGST/CGST/SGST sums of every subset."""
+    n = len(amounts)
+    masks = (np.arange(2 ** n)[:, None] >> np.arange(n)) & 1
+    return masks, masks @ amounts
+
+
+def find_combination(target, amounts, tolerance=TOLERANCE * PAISE, max_parts=MAX_PARTS):
+    """
+    Indices of 2..``max_parts`` rows of ``amounts`` (n x 3, paise) whose
+    IGST, CGST and SGST sums are each within ``tolerance`` paise of
+    ``target``: the fewest parts, then the lowest indices. None when no
+    subset qualifies.
+
+    Meet in the middle: the subset sums of both halves are enumerated, the
+    second half's sorted by total, and every first-half sum finds its
+    complements with a binary search instead of trying all 2^n subsets.
+    """
+    half = len(amounts) // 2
+    masks_a, sums_a = subset_sums(amounts[:half])
+    masks_b, sums_b = subset_sums(amounts[half:])
+    size_a, size_b = masks_a.sum(axis=1), masks_b.sum(axis=1)
+
+    order = np.argsort(sums_b.sum(axis=1), kind="stable")
+    masks_b, sums_b, size_b = masks_b[order], sums_b[order], size_b[order]
+    totals_b = sums_b.sum(axis=1)
+
+    # each column within tolerance bounds the total within 3 x tolerance
+    need = target.sum() - sums_a.sum(axis=1)
+    lo = np.searchsorted(totals_b, need - 3 * tolerance, side="left")
+    hi = np.searchsorted(totals_b, need + 3 * tolerance, side="right")
+
+    best = None
+    for i in np.flatnonzero((hi > lo) & (size_a <= max_parts)).tolist():
+        j = np.arange(lo[i], hi[i])
+        size = size_a[i] + size_b[j]
+        ok = (size >= 2) & (size <= max_parts)
+        ok &= (np.abs(sums_a[i] + sums_b[j] - target) <= tolerance).all(axis=1)
+        for k in j[ok].tolist():
+            members = tuple(np.flatnonzero(np.concatenate([masks_a[i], masks_b[k]])).tolist())
+            if best is None or (len(members), members) < best:
+                best = (len(members), members)
+    return list(best[1]) if best else None
+
+
+def nearest(candidates, days, day, window=COMBINE_DATE_WINDOW, limit=MITM_ITEMS):
+    """
+    Candidates dated within ``window`` days of ``day`` (undated ones are
+    kept), at most the ``limit`` closest, in sheet order.
+    """
+    gap = np.abs(days[candidates] - day)
+    candidates, gap = candidates[~(gap > window)], gap[~(gap > window)]
+    if len(candidates) <= limit:
+        return candidates
+    gap = np.where(np.isnan(gap), np.inf, gap)
+    return np.sort(candidates[np.lexsort((candidates, gap))[:limit]])
+
+
+def match_combinations(gstr2b, books, tolerance=TOLERANCE, date_window=COMBINE_DATE_WINDOW,
+                       budget=BLOCK_BUDGET, positions=None, progress=None):
+    """
+    Match one GSTR_2B line split over several BOOKS entries, and several
+    GSTR_2B lines booked as one consolidated BOOKS entry, within a supplier.
+
+    Suppliers are the blocks of ``match_fuzzy`` (GSTIN, else cleaned name).
+    BOOKS rows are taken per invoice group like in ``match_by_invoice``. In
+    each block, every open line of one side is a target for the open lines
+    of the other side with the same tax structure, no column above the
+    target's and an invoice date within ``date_window`` days; up to
+    ``MITM_ITEMS`` of them (nearest in date) are searched with
+    ``find_combination``. A block stops once ``budget`` subset sums
+    have been enumerated in it, which keeps the stage bounded (and, unlike
+    a time limit, gives the same result on every run).
+
+    Matched rows get ``MATCH_GROUP = "C<n>"``, ``n`` being the 1-based
+    position of the first GSTR_2B line of the combination (``positions``
+    maps rows to global positions when matching a shard).
+
+    Returns the number of combinations matched.
+    """
+    pending = ~books["USED"].to_numpy()
+    open_2b = np.flatnonzero(~gstr2b["USED"].to_numpy())
+    if not pending.any() or len(open_2b) == 0:
+        return 0
+    tolerance = paise_tolerance(tolerance)
+    positions = np.arange(len(gstr2b)) if positions is None else np.asarray(positions)
+
+    # BOOKS items: invoice groups per block; rows without an invoice number alone
+    open_books = books[pending]
+    book_pos = np.flatnonzero(pending)
+    invoice = open_books["Invoice_No_CLEAN"].astype(str)
+    item_key = invoice.where(invoice != "", pd.Series(book_pos, index=open_books.index).map("#{}".format))
+    keys = [query_blocks(open_books), item_key]
+    grouped = open_books.groupby(keys, sort=False)
+    items = grouped[TAX_COLS].sum()
+    item_amounts = items.to_numpy(dtype=np.int64)
+    item_structure = grouped["TAX_STRUCTURE"].first().to_numpy(dtype=object)
+    item_days = pd.Series(invoice_days(open_books), index=open_books.index).groupby(
+        keys, sort=False).first().to_numpy(dtype=float)
+    item_rows = [book_pos[grouped.indices[key]] for key in items.index]
+
+    amounts_2b = tax_amounts(gstr2b)
+    structure_2b = gstr2b["TAX_STRUCTURE"].to_numpy(dtype=object)
+    days_2b = invoice_days(gstr2b)
+
+    block_2b = {}
+    for pos, gstin, name in zip(
+        open_2b.tolist(),
+        clean_gstin_col(gstr2b).to_numpy()[open_2b],
+        gstr2b["Supplier_Name_CLEAN"].astype(object).fillna("").astype(str).to_numpy()[open_2b],
+    ):
+        for block in block_keys(gstin, name):
+            block_2b.setdefault(block, []).append(pos)
+    block_items = {}
+    for i, (block, _) in enumerate(items.index):
+        if block:
+            block_items.setdefault(block, []).append(i)
+
+    used_2b = gstr2b["USED"].to_numpy().copy()
+    used_item = np.zeros(len(items), dtype=bool)
+    group_2b = np.full(len(gstr2b), None, dtype=object)
+    group_books = np.full(len(books), None, dtype=object)
+    matched = 0
+
+    def candidates(pool, used, amounts, structure, target, target_structure):
+        pool = pool[~used[pool]]
+        if len(pool) == 0:
+            return pool
+        fits = (structure[pool] == target_structure) & (amounts[pool].sum(axis=1) > 0)
+        fits &= (amounts[pool] <= target + tolerance).all(axis=1)
+        return pool[fits]
+
+    for done, block in enumerate(block_items):
+        if progress and done % PROGRESS_EVERY == 0:
+            progress(done, len(block_items))
+        lines = np.array(block_2b.get(block, []), dtype=np.int64)
+        entries = np.array(block_items[block], dtype=np.int64)
+        if len(lines) + len(entries) < 3 or len(lines) == 0:
+            continue
+        work = 0
+
+        # one GSTR_2B line booked as several BOOKS entries
+        for pos in lines.tolist():
+            if used_2b[pos]:
+                continue
+            pool = candidates(entries, used_item, item_amounts, item_structure,
+                              amounts_2b[pos], structure_2b[pos])
+            if len(pool) < 2:
+                continue
+            pool = nearest(pool, item_days, days_2b[pos], date_window)
+            if len(pool) < 2:
+                continue
+            work += 2 ** (len(pool) // 2) + 2 ** (len(pool) - len(pool) // 2)
+            if work > budget:
+                break
+            combo = find_combination(amounts_2b[pos], item_amounts[pool], tolerance)
+            if combo:
+                used_2b[pos] = True
+                used_item[pool[combo]] = True
+                label = f"C{positions[pos] + 1}"
+                group_2b[pos] = label
+                for i in pool[combo].tolist():
+                    group_books[item_rows[i]] = label
+                matched += 1
+
+        # several GSTR_2B lines booked as one consolidated BOOKS entry
+        for i in entries.tolist():
+            if used_item[i] or work > budget:
+                continue
+            pool = candidates(lines, used_2b, amounts_2b, structure_2b,
+                              item_amounts[i], item_structure[i])
+            if len(pool) < 2:
+                continue
+            pool = nearest(pool, days_2b, item_days[i], date_window)
+            if len(pool) < 2:
+                continue
+            work += 2 ** (len(pool) // 2) + 2 ** (len(pool) - len(pool) // 2)
+            if work > budget:
+                break
+            combo = find_combination(item_amounts[i], amounts_2b[pool], tolerance)
+            if combo:
+                used_item[i] = True
+                used_2b[pool[combo]] = True
+                label = f"C{positions[pool[combo][0]] + 1}"
+                group_2b[pool[combo]] = label
+                group_books[item_rows[i]] = label
+                matched += 1
+
+    if not matched:
+        return 0
+
+    for df, groups in ((gstr2b, group_2b), (books, group_books)):
+        hit = pd.notna(groups)
+        mark_matched(df, hit)
+        df.loc[hit, "MATCH_GROUP"] = groups[hit]
+    return matched
+
+
+# ==============================
+# STEP 4C — Tax amount fallback
+# ==============================
+
+def invoice_days(df):
+    """Invoice_Date as float days since epoch (NaN when missing/unparseable)."""
+    if "Invoice_Date" not in df.columns:
+        return np.full(len(df), np.nan)
+    dates = pd.to_datetime(df["Invoice_Date"], errors="coerce", dayfirst=True)
+    return ((dates - pd.Timestamp(0)) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+
+
+class TaxAmountIndex:
+    """
+    Bucketed index over GSTR_2B lines for the tax amount fallback.
+
+    Lines are partitioned by ``TAX_STRUCTURE`` and bucketed on their IGST,
+    CGST and SGST paise at ``tolerance`` (paise) granularity, so a lookup only
+    visits the buckets that can hold an amount within tolerance. Every bucket
+    keeps its lines in sheet order and ``lookup`` returns the earliest
+    qualifying line, which is the line a full scan of the sheet would pick.
+    """
+
+    def __init__(self, gstr2b, rows, tolerance=TOLERANCE * PAISE, date_window=None):
+        self.tolerance = tolerance
+        self.width = tolerance if tolerance > 0 else 1
+        self.date_window = date_window
+
+        amounts = tax_amounts(gstr2b)
+        self.amounts = amounts.tolist()
+        self.keys = (amounts // self.width).tolist()
+        self.structure = gstr2b["TAX_STRUCTURE"].tolist()
+        self.days = invoice_days(gstr2b).tolist() if date_window is not None else None
+
+        self.buckets = {}
+        for pos in np.flatnonzero(rows).tolist():
+            self.buckets.setdefault(self._key(pos), []).append(pos)
+
+    def __len__(self):
+        return sum(len(b) for b in self.buckets.values())
+
+    def _key(self, pos):
+        return (self.structure[pos], *self.keys[pos])
+
+    def _ranges(self, amounts):
+        tol, width = self.tolerance, self.width
+        return [range((a - tol) // width, (a + tol) // width + 1) for a in amounts]
+
+    def _qualifies(self, pos, amounts, day):
+        tol = self.tolerance
+        if any(abs(g - b) > tol for g, b in zip(self.amounts[pos], amounts)):
+            return False
+        if self.days is None or math.isnan(day) or math.isnan(self.days[pos]):
+            return True
+        return abs(self.days[pos] - day) <= self.date_window
+
+    def lookup(self, structure, amounts, day=np.nan):
+        """Return the earliest qualifying GSTR_2B position, or None."""
+        i_rng, c_rng, s_rng = self._ranges(amounts)
+
+        best = None
+        for i in i_rng:
+            for c in c_rng:
+                for s in s_rng:
+                    bucket = self.buckets.get((structure, i, c, s))
+                    if not bucket:
+                        continue
+                    for pos in bucket:
+                        if best is not None and pos > best:
+                            break
+                        if self._qualifies(pos, amounts, day):
+                            best = pos
+                            break
+        return best
+
+    def remove(self, pos):
+        key = self._key(pos)
+        bucket = self.buckets[key]
+        bucket.remove(pos)
+        if not bucket:
+            del self.buckets[key]
+
+
+def match_by_amount(gstr2b, books, tolerance=TOLERANCE, date_window=None,
+                    progress=None):
+    """
+    Pair every unused BOOKS row with the first unused GSTR_2B line of the same
+    tax structure whose IGST, CGST and SGST are each within ``tolerance``.
+
+    BOOKS rows are visited in sheet order and each GSTR_2B line is consumed by
+    at most one row. With ``date_window`` (days), lines whose Invoice_Date is
+    further away than that are skipped; rows with no usable date on either
+    side are not restricted. ``progress(done, total)`` is called every
+    ``PROGRESS_EVERY`` rows.
+
+    Returns the number of BOOKS rows matched.
+    """
+    index = TaxAmountIndex(
+        gstr2b, ~gstr2b["USED"].to_numpy(), paise_tolerance(tolerance), date_window
+    )
+
+    open_rows = np.flatnonzero(~books["USED"].to_numpy()).tolist()
+    amounts = tax_amounts(books).tolist()
+    structure = books["TAX_STRUCTURE"].tolist()
+    days = invoice_days(books).tolist()
+
+    books_hit = np.zeros(len(books), dtype=bool)
+    gstr2b_hit = np.zeros(len(gstr2b), dtype=bool)
+
+    for done, pos in enumerate(open_rows):
+        if progress and done % PROGRESS_EVERY == 0:
+            progress(done, len(open_rows))
+        if not index.buckets:
+            break
+        j = index.lookup(structure[pos], amounts[pos], days[pos])
+        if j is None:
+            continue
+        index.remove(j)
+        books_hit[pos] = True
+        gstr2b_hit[j] = True
+
+    mark_matched(books, books_hit)
+    mark_matched(gstr2b, gstr2b_hit)
+
+    return int(books_hit.sum())
@@ -0,0 +1,325 @@
+"""
+Saved reconciliation runs.
+
+Each run's export is written to ``history/`` together with a small JSON
+summary (totals, per-supplier breakdown, timings). The Home dashboard reads
+the latest summary instead of re-parsing the exported workbook.
+
+Runs are also recorded in a SQLite manifest (``history/index.sqlite``) so
+the History page can page and filter without touching the exports, and
+only reads a file's bytes when that run is downloaded. Old exports are
+gzip-compressed and eventually deleted by ``apply_retention``; their rows
+live on in the analytics store (see ``analytics``).
+"""
+
+import datetime
+import gzip
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+HISTORY_DIR = "history"
+LATEST_SUMMARY = os.path.join(HISTORY_DIR, "latest_summary.json")
+INDEX_NAME = "index.sqlite"
+
+COMPRESS_AFTER_DAYS = 30
+DELETE_AFTER_DAYS = 365
+KEEP_LAST = 20
+
+# The latest summary, the index and the analytics rollups are read-modified-
+# written by every save; interactive runs and background jobs take turns.
+# Re-entrant so analytics can take it too when called from save_run.
+HISTORY_LOCK = threading.RLock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       TEXT PRIMARY KEY,
+    created_at   TEXT NOT NULL,
+    file_name    TEXT NOT NULL,
+    stored_name  TEXT,
+    source_name  TEXT,
+    source_hash  TEXT,
+    size_bytes   INTEGER,
+    rows_2b      INTEGER,
+    rows_books   INTEGER,
+    matched      INTEGER,
+    match_pct    REAL,
+    seconds      REAL,
+    compressed   INTEGER NOT NULL DEFAULT 0,
+    purged       INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at);
+CREATE INDEX IF NOT EXISTS runs_source ON runs (source_hash);
+"""
+
+
+def client_key(client):
+    """Client name as used in file and partition names, ``""`` when not given."""
+    return re.sub(r"[^\w.-]+", "_", str(client or "").strip()).strip("_.")
+
+
+def supplier_breakdown(books):
+    """Matched/unmatched BOOKS rows per cleaned supplier name, worst first."""
+    matched = books["RECO_REMARK"] == "MATCHED"
+    by_supplier = (
+        matched.groupby(books["Supplier_Name_CLEAN"].astype(str), observed=True)
+        .agg(["size", "sum"])
+        .rename(columns={"size": "total", "sum": "matched"})
+    )
+    by_supplier["unmatched"] = by_supplier["total"] - by_supplier["matched"]
+    by_supplier = by_supplier.sort_values(["unmatched", "total"], ascending=False)
+
+    return [
+        {"supplier": name or "(blank)", "total": int(r.total),
+         "matched": int(r.matched), "unmatched": int(r.unmatched)}
+        for name, r in by_supplier.iterrows()
+    ]
+
+
+def run_summary(gstr2b, books, **extra):
+    total = len(books)
+    matched = int((books["RECO_REMARK"] == "MATCHED").sum())
+    summary = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "total": total,
+        "matched": matched,
+        "unmatched": total - matched,
+        "match_pct": round(matched / total * 100, 2) if total else 0,
+        "rows_2b": len(gstr2b),
+        "matched_2b": int((gstr2b["RECO_REMARK"] == "MATCHED").sum()),
+        "suppliers": supplier_breakdown(books),
+    }
+    summary.update(extra)
+    return summary
+
+
+def write_json(path, data):
+    # a temp name of its own: two writers of ``path`` must not share one
+    with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path) or ".",
+                                     prefix=".", suffix=".tmp", delete=False) as f:
+        json.dump(data, f, default=str)
+    os.replace(f.name, path)
+
+
+def save_run(gstr2b, books, export_data, file_name, folder=HISTORY_DIR,
+             source_name=None, source_hash=None, **extra):
+    """
+    Write the run's export and its summary sidecar into ``folder``, record it
+    in the index and the analytics store, and make it the latest summary.
+    ``client`` / ``period`` in ``extra`` pick its analytics partition; runs
+    without a client stay out of the analytics store.
+    Returns the summary dict.
+    """
+    os.makedirs(folder, exist_ok=True)
+
+    path = os.path.join(folder, file_name)
+    with open(path, "wb") as f:
+        f.write(export_data)
+
+    summary = run_summary(gstr2b, books, file=file_name, source_name=source_name,
+                          source_hash=source_hash, **extra)
+    write_json(os.path.splitext(path)[0] + ".summary.json", summary)
+
+    with HISTORY_LOCK:
+        write_json(os.path.join(folder, os.path.basename(LATEST_SUMMARY)), summary)
+        with connect(folder) as conn:
+            record_run(conn, file_name, summary, len(export_data))
+
+        if client_key(extra.get("client")):
+            try:
+                import analytics
+
+                analytics.record_run(
+                    os.path.splitext(file_name)[0], gstr2b, books, folder=folder,
+                    client=extra.get("client"), period=extra.get("period"),
+                    created_at=summary["timestamp"], source_name=source_name,
+                )
+            except ImportError:
+                pass  # no pyarrow: the run is saved, just not in the trends
+    return summary
+
+
+def read_summary(path, mtime=None):
+    """Load a summary JSON. ``mtime`` is only there to key callers' caches."""
+    with open(path) as f:
+        return json.load(f)
+
+
+# ==============================
+# Index
+# ==============================
+
+@contextmanager
+def connect(folder=HISTORY_DIR):
+    """Open the run index, committing on success and always closing."""
+    os.makedirs(folder, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(folder, INDEX_NAME))
+    try:
+        conn.executescript(SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def record_run(conn, file_name, summary, size_bytes):
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO runs (
+            run_id, created_at, file_name, stored_name, source_name, source_hash,
+            size_bytes, rows_2b, rows_books, matched, match_pct, seconds
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            os.path.splitext(file_name)[0],
+            summary.get("timestamp"),
+            file_name,
+            file_name,
+            summary.get("source_name"),
+            summary.get("source_hash"),
+            size_bytes,
+            summary.get("rows_2b"),
+            summary.get("total"),
+            summary.get("matched"),
+            summary.get("match_pct"),
+            summary.get("seconds"),
+        ),
+    )
+
+
+def sync_index(folder=HISTORY_DIR):
+    """
+    Add exports found in ``folder`` but missing from the index (runs saved
+    before the index existed), using their summary sidecar when present.
+    """
+    if not os.path.isdir(folder):
+        return 0
+
+    with connect(folder) as conn:
+        known = {row[0] for row in conn.execute("SELECT stored_name FROM runs")}
+        added = 0
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if (name in known or name.endswith((".json", ".tmp", ".sqlite", "-journal"))
+                    or name.startswith(INDEX_NAME) or os.path.isdir(path)):
+                continue
+            sidecar = os.path.splitext(path)[0] + ".summary.json"
+            if os.path.exists(sidecar):
+                summary = read_summary(sidecar)
+            else:
+                mtime = datetime.datetime.fromtimestamp(os.path.getmtime(path))
+                summary = {"timestamp": mtime.isoformat(timespec="seconds")}
+            record_run(conn, name, summary, os.path.getsize(path))
+            added += 1
+    return added
+
+
+def run_filters(search="", min_pct=None, since=None):
+    clauses, params = ["purged = 0"], []
+    if search:
+        clauses.append("(file_name LIKE ? OR source_name LIKE ?)")
+        params += [f"%{search}%", f"%{search}%"]
+    if min_pct is not None:
+        clauses.append("match_pct >= ?")
+        params.append(min_pct)
+    if since is not None:
+        clauses.append("created_at >= ?")
+        params.append(since.isoformat())
+    return " AND ".join(clauses), params
+
+
+def count_runs(folder=HISTORY_DIR, **filters):
+    where, params = run_filters(**filters)
+    with connect(folder) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM runs WHERE {where}", params).fetchone()[0]
+
+
+def list_runs(folder=HISTORY_DIR, limit=25, offset=0, **filters):
+    """One page of runs, newest first, as a DataFrame."""
+    where, params = run_filters(**filters)
+    with connect(folder) as conn:
+        return pd.read_sql_query(
+            f"""
+            SELECT run_id, created_at, file_name, source_name, size_bytes,
+                   rows_books, matched, match_pct, seconds, compressed
+            FROM runs WHERE {where}
+            ORDER BY created_at DESC, rowid DESC LIMIT ? OFFSET ?
+            """,
+            conn,
+            params=params + [limit, offset],
+        )
+
+
+def read_run_bytes(run_id, folder=HISTORY_DIR):
+    """``(file_name, bytes)`` of one run's export, decompressed if archived."""
+    with connect(folder) as conn:
+        row = conn.execute(
+            "SELECT file_name, stored_name, compressed FROM runs WHERE run_id = ?",
+            (run_id,),
+        ).fetchone()
+    if row is None:
+        raise KeyError(run_id)
+
+    file_name, stored_name, compressed = row
+    opener = gzip.open if compressed else open
+    with opener(os.path.join(folder, stored_name), "rb") as f:
+        return file_name, f.read()
+
+
+# ==============================
+# Retention
+# ==============================
+
+def apply_retention(folder=HISTORY_DIR, compress_after_days=COMPRESS_AFTER_DAYS,
+                    delete_after_days=DELETE_AFTER_DAYS, keep_last=KEEP_LAST, now=None):
+    """
+    Gzip exports older than ``compress_after_days`` and delete those older
+    than ``delete_after_days``. The newest ``keep_last`` runs are never
+    touched; deleted runs stay in the index (``purged``) with their stats.
+    Returns ``(compressed, deleted)`` counts.
+    """
+    now = now or datetime.datetime.now()
+    compress_before = (now - datetime.timedelta(days=compress_after_days)).isoformat()
+    delete_before = (now - datetime.timedelta(days=delete_after_days)).isoformat()
+    compressed = deleted = 0
+
+    with connect(folder) as conn:
+        rows = conn.execute(
+            """
+            SELECT run_id, stored_name, compressed, created_at FROM runs
+            WHERE purged = 0 ORDER BY created_at DESC, rowid DESC LIMIT -1 OFFSET ?
+            """,
+            (keep_last,),
+        ).fetchall()
+
+        for run_id, stored_name, is_compressed, created_at in rows:
+            path = os.path.join(folder, stored_name)
+
+            if created_at < delete_before:
+                if os.path.exists(path):
+                    os.remove(path)
+                sidecar = os.path.splitext(path.removesuffix(".gz"))[0] + ".summary.json"
+                if os.path.exists(sidecar):
+                    os.remove(sidecar)
+                conn.execute("UPDATE runs SET purged = 1 WHERE run_id = ?", (run_id,))
+                deleted += 1
+
+            elif created_at < compress_before and not is_compressed and os.path.exists(path):
+                with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(path)
+                conn.execute(
+                    "UPDATE runs SET stored_name = ?, compressed = 1 WHERE run_id = ?",
+                    (stored_name + ".gz", run_id),
+                )
+                compressed += 1
+
+    return compressed, deleted
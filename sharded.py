@@ -0,0 +1,344 @@
+"""
+Multi-process matching of one large workbook.
+
+The prepared columns both sheets are matched on (invoice number, GSTIN and
+supplier name as integer codes, tax structure, amounts, dates, USED flags) are
+copied once into shared memory, and each worker process attaches to them
+instead of receiving pickled frames. Workers run the engine's own matching
+functions on their shard and send back only the positions they matched.
+
+Shards are chosen so no two shards can compete for the same GSTR_2B line,
+which keeps the result identical to a single-process run:
+
+* exact invoice matching is sharded by a hash of ``Invoice_No_CLEAN`` (a
+  BOOKS group and all its candidates share the invoice number);
+* fuzzy and split/consolidated invoice matching are sharded by connected
+  GSTIN / supplier-name blocks (a GSTR_2B line is filed under both its
+  GSTIN and its name).
+
+The tax amount fallback pairs lines across suppliers, so it stays a global
+second phase in the parent process.
+"""
+
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from normalise import clean_gstin_col
+from reco_engine import (
+    REMARKS,
+    mark_matched,
+    match_by_invoice,
+    match_combinations,
+    match_fuzzy,
+    tax_amounts,
+)
+
+
+# below this many BOOKS rows the process start-up costs more than it saves
+SHARD_MIN_ROWS = 50_000
+
+SIDES = ("2b", "books")
+
+
+# ==============================
+# Shared arrays
+# ==============================
+
+class SharedArrays:
+    """Named numpy arrays packed into one shared memory block."""
+
+    def __init__(self, arrays):
+        self.specs, offset = {}, 0
+        for name, a in arrays.items():
+            self.specs[name] = (offset, a.dtype.str, a.shape)
+            offset += -(-a.nbytes // 8) * 8
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 8))
+        self.arrays = self.views(self.shm, self.specs)
+        for name, a in arrays.items():
+            self.arrays[name][...] = a
+
+    @staticmethod
+    def views(shm, specs):
+        return {
+            name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, (offset, dtype, shape) in specs.items()
+        }
+
+    @property
+    def handle(self):
+        return self.shm.name, self.specs
+
+    def close(self):
+        self.arrays = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+# set in each worker by ``attach``
+WORKER = {}
+
+
+def attach(handle, strings):
+    name, specs = handle
+    shm = shared_memory.SharedMemory(name=name)
+    WORKER.update(shm=shm, arrays=SharedArrays.views(shm, specs), strings=strings)
+
+
+# ==============================
+# Columns <-> frames
+# ==============================
+
+def encode(gstr2b, books):
+    """
+    Integer-coded columns of both frames (codes shared across sides) and the
+    string tables to decode them.
+    """
+    arrays, strings = {}, {}
+    columns = {
+        "invoice": lambda df: df["Invoice_No_CLEAN"].astype(str),
+        "structure": lambda df: df["TAX_STRUCTURE"].astype(str),
+        "gstin": clean_gstin_col,
+        "name": lambda df: df["Supplier_Name_CLEAN"].astype(object).fillna("").astype(str),
+    }
+    for col, values in columns.items():
+        both = pd.concat([values(gstr2b), values(books)], ignore_index=True)
+        codes, uniques = pd.factorize(both)
+        strings[col] = np.asarray(uniques, dtype=object)
+        arrays[f"{col}_2b"] = codes[:len(gstr2b)].astype(np.int64)
+        arrays[f"{col}_books"] = codes[len(gstr2b):].astype(np.int64)
+
+    for side, df in zip(SIDES, (gstr2b, books)):
+        arrays[f"tax_{side}"] = tax_amounts(df)
+        arrays[f"used_{side}"] = df["USED"].to_numpy(dtype=bool)
+        arrays[f"date_{side}"] = parsed_dates(df).view(np.int64)
+    return arrays, strings
+
+
+def parsed_dates(df):
+    """Invoice_Date parsed the way ``invoice_days`` does, as datetime64[ns]."""
+    if "Invoice_Date" not in df.columns:
+        return np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+    dates = pd.to_datetime(df["Invoice_Date"], errors="coerce", dayfirst=True)
+    return dates.to_numpy(dtype="datetime64[ns]")
+
+
+def shard_frame(arrays, strings, side, rows):
+    """The prepared-frame columns the engine reads, for ``rows`` of ``side``."""
+    tax = arrays[f"tax_{side}"][rows]
+    used = arrays[f"used_{side}"][rows]
+    return pd.DataFrame({
+        "GSTIN": strings["gstin"][arrays[f"gstin_{side}"][rows]],
+        "Supplier_Name_CLEAN": strings["name"][arrays[f"name_{side}"][rows]],
+        "Invoice_No_CLEAN": strings["invoice"][arrays[f"invoice_{side}"][rows]],
+        "Invoice_Date": arrays[f"date_{side}"][rows].view("datetime64[ns]"),
+        "IGST": tax[:, 0],
+        "CGST": tax[:, 1],
+        "SGST": tax[:, 2],
+        "TAX_STRUCTURE": strings["structure"][arrays[f"structure_{side}"][rows]],
+        "RECO_REMARK": pd.Categorical.from_codes(used.astype(np.int8), dtype=REMARKS),
+        "USED": used,
+        "MATCH_SCORE": np.nan,
+        "MATCH_GROUP": None,
+    })
+
+
+def run_shard(step, shard, tolerance, threshold=None):
+    """
+    Worker: run one matching ``step`` on one shard. Returns the newly
+    matched global positions with their scores and groups for each side.
+    """
+    arrays, strings = WORKER["arrays"], WORKER["strings"]
+    rows = {side: np.flatnonzero(arrays[f"shard_{side}"] == shard) for side in SIDES}
+    frames = {side: shard_frame(arrays, strings, side, rows[side]) for side in SIDES}
+
+    if step == "invoice":
+        match_by_invoice(frames["2b"], frames["books"], tolerance)
+    elif step == "fuzzy":
+        match_fuzzy(frames["2b"], frames["books"], tolerance, threshold)
+    else:
+        match_combinations(frames["2b"], frames["books"], tolerance,
+                           positions=rows["2b"])
+
+    result = {}
+    for side in SIDES:
+        df = frames[side]
+        new = df["USED"].to_numpy() & ~arrays[f"used_{side}"][rows[side]]
+        result[side] = (rows[side][new], df["MATCH_SCORE"].to_numpy()[new],
+                        df["MATCH_GROUP"].to_numpy(dtype=object)[new])
+    return result
+
+
+# ==============================
+# Partitioning
+# ==============================
+
+def invoice_shards(arrays, strings, shards):
+    """Shard per row by invoice number hash; -1 for blank invoice numbers."""
+    hashes = pd.util.hash_array(strings["invoice"].astype(str)) % shards
+    out = {}
+    for side in SIDES:
+        codes = arrays[f"invoice_{side}"]
+        shard = hashes[codes].astype(np.int32)
+        shard[strings["invoice"][codes] == ""] = -1
+        out[side] = shard
+    return out
+
+
+def block_shards(arrays, strings, shards):
+    """
+    Shard per row by connected fuzzy block. GSTIN and supplier-name blocks
+    linked by any GSTR_2B line are unioned; components are spread over the
+    shards largest first. BOOKS rows without a block get -1.
+    """
+    n_gstin = len(strings["gstin"])
+    blank_gstin = strings["gstin"] == ""
+    blank_name = strings["name"] == ""
+
+    # block ids: GSTIN codes first, then name codes offset by n_gstin
+    def gstin_block(codes):
+        return np.where(blank_gstin[codes], -1, codes)
+
+    def name_block(codes):
+        return np.where(blank_name[codes], -1, codes + n_gstin)
+
+    parent = list(range(n_gstin + len(strings["name"])))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    g = gstin_block(arrays["gstin_2b"])
+    n = name_block(arrays["name_2b"])
+    for a, b in set(zip(g.tolist(), n.tolist())):
+        if a >= 0 and b >= 0:
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+    roots = np.array([find(x) for x in range(len(parent))] + [-1], dtype=np.int64)
+
+    # a GSTR_2B line sits in its GSTIN block's component, else its name's;
+    # a BOOKS row is looked up in its GSTIN block, else its name block
+    components = {}
+    for side in SIDES:
+        g = gstin_block(arrays[f"gstin_{side}"])
+        n = name_block(arrays[f"name_{side}"])
+        components[side] = roots[np.where(g >= 0, g, n)]
+
+    sizes = pd.Series(np.concatenate(list(components.values())))
+    sizes = sizes[sizes >= 0].value_counts()
+    order = sorted(sizes.items(), key=lambda kv: (-kv[1], kv[0]))
+
+    load = [(0, s) for s in range(shards)]
+    assign = {}
+    for component, size in order:
+        total, shard = heapq.heappop(load)
+        assign[component] = shard
+        heapq.heappush(load, (total + size, shard))
+
+    lookup = pd.Series(assign, dtype=np.int64)
+    return {
+        side: lookup.reindex(comp).fillna(-1).to_numpy(dtype=np.int32)
+        for side, comp in components.items()
+    }
+
+
+# ==============================
+# Matcher
+# ==============================
+
+class ShardedMatcher:
+    """
+    Runs ``match_by_invoice``, ``match_fuzzy`` and ``match_combinations``
+    over shards in a process pool and applies the results to the parent's
+    frames.
+    """
+
+    def __init__(self, gstr2b, books, workers):
+        self.gstr2b, self.books = gstr2b, books
+        self.shards = workers
+
+        arrays, self.strings = encode(gstr2b, books)
+        for side in SIDES:
+            arrays[f"shard_{side}"] = np.zeros(len(arrays[f"used_{side}"]), dtype=np.int32)
+        self.shared = SharedArrays(arrays)
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=attach,
+            initargs=(self.shared.handle, self.strings),
+        )
+
+    def run(self, step, shards, tolerance, threshold=None):
+        arrays = self.shared.arrays
+        for side in SIDES:
+            arrays[f"shard_{side}"][...] = shards[side]
+
+        jobs = [
+            self.pool.submit(run_shard, step, shard, tolerance, threshold)
+            for shard in range(self.shards)
+        ]
+        # merge in shard order so the result never depends on timing
+        matched = {side: ([], [], []) for side in SIDES}
+        for job in jobs:
+            for side, parts in job.result().items():
+                for collected, part in zip(matched[side], parts):
+                    collected.append(part)
+
+        count = 0
+        for side, df in zip(SIDES, (self.gstr2b, self.books)):
+            rows, scores, groups = (np.concatenate(parts) for parts in matched[side])
+            hit = np.zeros(len(df), dtype=bool)
+            hit[rows] = True
+            if hit.any():
+                full = np.full(len(df), np.nan)
+                full[rows] = scores
+                mark_matched(df, hit, full if step != "combine" else None)
+                if step == "combine":
+                    labels = np.full(len(df), None, dtype=object)
+                    labels[rows] = groups
+                    df.loc[hit, "MATCH_GROUP"] = labels[hit]
+            arrays[f"used_{side}"][rows] = True
+            if side == "books":
+                count = len(rows)
+        return count
+
+    def match_by_invoice(self, tolerance):
+        shards = invoice_shards(self.shared.arrays, self.strings, self.shards)
+        return self.run("invoice", shards, tolerance)
+
+    def match_fuzzy(self, tolerance, threshold):
+        shards = block_shards(self.shared.arrays, self.strings, self.shards)
+        return self.run("fuzzy", shards, tolerance, threshold)
+
+    def match_combinations(self, tolerance):
+        shards = block_shards(self.shared.arrays, self.strings, self.shards)
+        return self.run("combine", shards, tolerance)
+
+    def close(self):
+        self.pool.shutdown()
+        self.shared.close()
+
+
+def use_shards(books, workers):
+    return bool(workers) and workers > 1 and len(books) >= SHARD_MIN_ROWS
+
+
+@contextmanager
+def matcher(gstr2b, books, workers):
+    """A ``ShardedMatcher`` when sharding pays off, else None."""
+    if not use_shards(books, workers):
+        yield None
+        return
+    m = ShardedMatcher(gstr2b, books, workers)
+    try:
+        yield m
+    finally:
+        m.close()
@@ -0,0 +1,219 @@
+"""
+Synthetic GST_Reco workbooks for load testing.
+
+Builds GSTR_2B / BOOKS sheets in the layout of the downloadable template,
+with tunable rates of the problems real books have against 2B: invoices
+split over several lines, formatting noise in invoice numbers and names,
+amounts that drift, and lines missing on either side.
+
+    python synthetic.py 100000 --out GST_Reco_100k.xlsx --noise-rate 0.1
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# same columns as the template on the GST page
+TEMPLATE_COLUMNS = ["Supplier_Name", "GSTIN", "Invoice_Date", "Invoice_No",
+                    "IGST", "CGST", "SGST"]
+
+HOME_STATE = "27"
+STATES = ["27", "27", "27", "29", "24", "07", "33", "09"]
+GST_RATES = [0.05, 0.12, 0.18, 0.18, 0.28]
+
+NAME_WORDS = ["Shree", "Ganesh", "Sai", "Om", "Laxmi", "Bharat", "Metro",
+              "National", "Royal", "Sunrise", "Global", "Apex", "Prime", "Star"]
+NAME_TRADES = ["Traders", "Enterprises", "Steels", "Polymers", "Logistics",
+               "Agencies", "Industries", "Packaging", "Chemicals", "Electricals"]
+NAME_SUFFIXES = ["Pvt Ltd", "Pvt. Ltd.", "Limited", "LLP", ""]
+INVOICE_PREFIXES = ["INV", "BILL", "TI", "SI", "GST", ""]
+SEPARATORS = ["/", "-", ""]
+
+DEFAULT_RATES = {
+    "split_rate": 0.10,
+    "noise_rate": 0.05,
+    "drift_rate": 0.03,
+    "missing_rate": 0.05,
+}
+
+
+# ==============================
+# Suppliers
+# ==============================
+
+def make_suppliers(count, rng):
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+
+    names = [
+        " ".join(filter(None, [a, b, c]))
+        for a, b, c in zip(
+            rng.choice(NAME_WORDS, count),
+            rng.choice(NAME_TRADES, count),
+            rng.choice(NAME_SUFFIXES, count),
+        )
+    ]
+    # names repeat across states; the index keeps them distinct
+    names = [f"{name} {i}" if i >= len(NAME_WORDS) * len(NAME_TRADES) else name
+             for i, name in enumerate(names)]
+
+    states = rng.choice(STATES, count)
+    pan = ["".join(row) for row in rng.choice(letters, (count, 5))]
+    digits = rng.integers(0, 10_000, count)
+    gstins = [
+        f"{state}{p}{d:04d}{letters[i % 26]}1Z{letters[(i * 7) % 26]}"
+        for i, (state, p, d) in enumerate(zip(states, pan, digits))
+    ]
+
+    return pd.DataFrame({
+        "Supplier_Name": names,
+        "GSTIN": gstins,
+        "interstate": states != HOME_STATE,
+        "prefix": rng.choice(INVOICE_PREFIXES, count),
+        "separator": rng.choice(SEPARATORS, count),
+        "width": rng.choice([3, 4, 5], count),
+    })
+
+
+# ==============================
+# Sheets
+# ==============================
+
+def make_gstr2b(rows, rng, period="2026-01", suppliers=None):
+    """``rows`` GSTR_2B lines with unique invoice numbers per supplier."""
+    suppliers = suppliers if suppliers is not None else make_suppliers(max(10, rows // 50), rng)
+
+    # a few large suppliers and a long tail, like real purchase registers
+    weights = rng.pareto(1.2, len(suppliers)) + 1
+    who = rng.choice(len(suppliers), rows, p=weights / weights.sum())
+    s = suppliers.iloc[who].reset_index(drop=True)
+
+    serial = pd.Series(who).groupby(who).cumcount().to_numpy() + 1
+    invoice_no = [
+        f"{p}{sep}{n:0{w}d}"
+        for p, sep, n, w in zip(s["prefix"], s["separator"], serial, s["width"])
+    ]
+
+    start = pd.Timestamp(f"{period}-01")
+    days = rng.integers(0, start.days_in_month, rows)
+    dates = (start + pd.to_timedelta(days, unit="D")).strftime("%d-%m-%Y")
+
+    taxable = np.round(rng.lognormal(9.5, 1.2, rows), 2)
+    tax = np.round(taxable * rng.choice(GST_RATES, rows), 2)
+    interstate = s["interstate"].to_numpy()
+    half = np.round(tax / 2, 2)
+
+    return pd.DataFrame({
+        "Supplier_Name": s["Supplier_Name"],
+        "GSTIN": s["GSTIN"],
+        "Invoice_Date": dates,
+        "Invoice_No": invoice_no,
+        "IGST": np.where(interstate, tax, 0.0),
+        "CGST": np.where(interstate, 0.0, half),
+        "SGST": np.where(interstate, 0.0, half),
+    })
+
+
+def split_lines(df, mask, rng):
+    """Split ``mask`` rows into two lines whose amounts add up to the original."""
+    parts = df[mask]
+    share = rng.uniform(0.2, 0.8, len(parts))
+    first, second = parts.copy(), parts.copy()
+    for col in ["IGST", "CGST", "SGST"]:
+        first[col] = np.round(parts[col] * share, 2)
+        second[col] = np.round(parts[col] - first[col], 2)
+    return pd.concat([df[~mask], first, second])
+
+
+def add_noise(df, mask, rng):
+    """Formatting noise typical of manual entry, on ``mask`` rows."""
+    df = df.copy()
+    idx = np.flatnonzero(mask)
+    kind = rng.integers(0, 4, len(idx))
+
+    invoice = df["Invoice_No"].to_numpy(dtype=object).copy()
+    name = df["Supplier_Name"].to_numpy(dtype=object).copy()
+    gstin = df["GSTIN"].to_numpy(dtype=object).copy()
+
+    for i, k in zip(idx.tolist(), kind.tolist()):
+        if k == 0:
+            invoice[i] = invoice[i].replace("/", "-").lower()
+        elif k == 1:
+            # extra zero padding in the number part: INV/001 -> INV/0001
+            head = invoice[i].rstrip("0123456789")
+            invoice[i] = f"{head}0{invoice[i][len(head):]}"
+        elif k == 2:
+            name[i] = name[i].upper().replace("PVT LTD", "PRIVATE LIMITED")
+        else:
+            gstin[i] = None
+
+    df["Invoice_No"] = invoice
+    df["Supplier_Name"] = name
+    df["GSTIN"] = gstin
+    return df
+
+
+def make_books(gstr2b, rng, split_rate=0.10, noise_rate=0.05, drift_rate=0.03,
+               missing_rate=0.05):
+    """BOOKS entries derived from ``gstr2b`` with the given error rates."""
+    n = len(gstr2b)
+    books = gstr2b[rng.random(n) >= missing_rate].reset_index(drop=True)
+
+    books = split_lines(books, rng.random(len(books)) < split_rate, rng)
+    books = books.reset_index(drop=True)
+    books = add_noise(books, rng.random(len(books)) < noise_rate, rng)
+
+    drift = rng.random(len(books)) < drift_rate
+    for col in ["IGST", "CGST", "SGST"]:
+        nonzero = drift & (books[col] > 0).to_numpy()
+        books.loc[nonzero, col] = np.round(
+            books.loc[nonzero, col] + rng.uniform(-2.5, 2.5, nonzero.sum()), 2
+        )
+
+    return books.sample(frac=1, random_state=int(rng.integers(2**31))).reset_index(drop=True)
+
+
+def generate(rows, seed=0, period="2026-01", **rates):
+    """
+    ``(gstr2b, books)`` frames with ``rows`` GSTR_2B lines. ``rates`` override
+    ``DEFAULT_RATES``. The 2B side also loses ``missing_rate`` of its lines
+    (suppliers that haven't filed), after BOOKS has been derived from it.
+    """
+    rates = {**DEFAULT_RATES, **rates}
+    rng = np.random.default_rng(seed)
+
+    gstr2b = make_gstr2b(rows, rng, period)
+    books = make_books(gstr2b, rng, **rates)
+    gstr2b = gstr2b[rng.random(len(gstr2b)) >= rates["missing_rate"]].reset_index(drop=True)
+
+    return gstr2b[TEMPLATE_COLUMNS], books[TEMPLATE_COLUMNS]
+
+
+def write_workbook(gstr2b, books, output):
+    from gst_reco import write_xlsx
+
+    write_xlsx({"GSTR_2B": gstr2b, "BOOKS": books}, output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic GST_Reco workbook")
+    parser.add_argument("rows", type=int, help="GSTR_2B lines before missing entries")
+    parser.add_argument("--out", default=None, help="default: GST_Reco_<rows>.xlsx")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--period", default="2026-01", help="YYYY-MM of the invoices")
+    for name, value in DEFAULT_RATES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=value)
+    args = parser.parse_args(argv)
+
+    rates = {name: getattr(args, name) for name in DEFAULT_RATES}
+    gstr2b, books = generate(args.rows, args.seed, args.period, **rates)
+    out = args.out or f"GST_Reco_{args.rows}.xlsx"
+    write_workbook(gstr2b, books, out)
+    print(f"{out}: {len(gstr2b):,} GSTR_2B / {len(books):,} BOOKS rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
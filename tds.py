@@ -0,0 +1,477 @@
+"""
+TDS sections and a bulk deduction engine for payment ledgers.
+
+``TDS_SECTIONS`` is the handbook shown on the Taxation Hub page. Besides the
+display text, each computable entry carries the numbers the calculator uses:
+``rate`` (percent, ``rate_ind`` for Individual/HUF deductees where it
+differs), ``single`` (per-payment threshold), ``annual`` / ``monthly``
+(aggregate thresholds per deductee) and ``excess`` (tax only the part above
+the aggregate threshold, as 194Q / 194N do).
+
+``deduction_schedule`` applies them to a whole ledger at once: payments are
+ordered within each deductee / section / financial year (or month), running
+totals come from one grouped cumulative sum over integer paise, and the
+threshold rules become vectorised conditions.
+"""
+
+import numpy as np
+import pandas as pd
+
+from normalise import clean_supplier_col, normalise_columns
+
+
+TDS_SECTIONS = [
+
+    # ================= SALARY =================
+    {"Section":"192","Nature":"Salary",
+     "Threshold":"Basic exemption limit",
+     "Rate":"Slab rates",
+     "Notes":"Employer deducts monthly based on estimated income tax"},
+
+    {"Section":"192A","Nature":"EPF premature withdrawal",
+     "Threshold":"₹50,000",
+     "Rate":"10%",
+     "code":"192A", "rate":10, "single":50_000},
+
+    # ================= INTEREST =================
+    {"Section":"193","Nature":"Interest on securities",
+     "Threshold":"₹10,000","Rate":"10%",
+     "code":"193", "rate":10, "annual":10_000},
+
+    {"Section":"194A","Nature":"Interest other than securities (Bank/FD)",
+     "Threshold":"₹50,000 (₹1,00,000 senior citizens) / ₹10,000 others",
+     "Rate":"10%",
+     "Notes":"Form 15G/15H allowed",
+     "code":"194A", "rate":10, "annual":10_000},
+
+    # ================= LOTTERY / GAMING =================
+    {"Section":"194B","Nature":"Lottery/Gambling winnings",
+     "Threshold":"₹10,000","Rate":"30%",
+     "code":"194B", "rate":30, "single":10_000},
+
+    {"Section":"194BA","Nature":"Online gaming winnings",
+     "Threshold":"₹10,000","Rate":"30%",
+     "code":"194BA", "rate":30, "single":10_000},
+
+    {"Section":"194BB","Nature":"Horse race winnings",
+     "Threshold":"₹10,000","Rate":"30%",
+     "code":"194BB", "rate":30, "single":10_000},
+
+    # ================= CONTRACT =================
+    {"Section":"194C","Nature":"Contractor/Sub-contractor",
+     "Threshold":"₹30,000 single / ₹1,00,000 yearly",
+     "Rate":"1% (Ind/HUF), 2% (Others)",
+     "code":"194C", "rate":2, "rate_ind":1, "single":30_000, "annual":100_000},
+
+    # ================= INSURANCE =================
+    {"Section":"194D","Nature":"Insurance commission",
+     "Threshold":"₹20,000","Rate":"5%",
+     "code":"194D", "rate":5, "annual":20_000},
+
+    {"Section":"194DA","Nature":"Life insurance payout",
+     "Threshold":"₹1,00,000",
+     "Rate":"5% (income portion only)",
+     "code":"194DA", "rate":5, "single":100_000},
+
+    # ================= COMMISSION =================
+    {"Section":"194G","Nature":"Lottery commission",
+     "Threshold":"₹20,000","Rate":"2%",
+     "code":"194G", "rate":2, "annual":20_000},
+
+    {"Section":"194H","Nature":"Commission/Brokerage",
+     "Threshold":"₹20,000","Rate":"2%",
+     "code":"194H", "rate":2, "annual":20_000},
+
+    # ================= RENT (AMENDED) =================
+    {"Section":"194I","Nature":"Rent – Land/Building/Furniture",
+     "Threshold":"₹50,000 per month (₹6 lakh yearly)",
+     "Rate":"10%",
+     "Notes":"Amended from old ₹2.4L yearly limit",
+     "code":"194I(b)", "rate":10, "monthly":50_000},
+
+    {"Section":"194I","Nature":"Rent – Plant/Machinery",
+     "Threshold":"₹50,000 per month",
+     "Rate":"2%",
+     "code":"194I(a)", "rate":2, "monthly":50_000},
+
+    {"Section":"194IB","Nature":"Rent by Individual/HUF (no audit)",
+     "Threshold":"₹50,000 per month",
+     "Rate":"2%",
+     "Notes":"Single deduction at year end",
+     "code":"194IB", "rate":2, "monthly":50_000},
+
+    # ================= PROFESSIONAL (AMENDED) =================
+    {"Section":"194J","Nature":"Professional fees (CA, lawyer, doctor etc)",
+     "Threshold":"₹50,000 yearly",
+     "Rate":"10%",
+     "Notes":"Amended from ₹30k → ₹50k",
+     "code":"194J(b)", "rate":10, "annual":50_000},
+
+    {"Section":"194J","Nature":"Technical services / royalty",
+     "Threshold":"₹50,000 yearly",
+     "Rate":"2%",
+     "code":"194J(a)", "rate":2, "annual":50_000},
+
+    # ================= MUTUAL FUND =================
+    {"Section":"194K","Nature":"Mutual fund income",
+     "Threshold":"₹5,000","Rate":"10%",
+     "code":"194K", "rate":10, "annual":5_000},
+
+    # ================= PROPERTY =================
+    {"Section":"194IA","Nature":"Property purchase",
+     "Threshold":"₹50 lakh property value",
+     "Rate":"1%","Notes":"Form 26QB, no TAN required",
+     "code":"194IA", "rate":1, "single":5_000_000},
+
+     {"Section":"194IB",
+     "Nature":"Rent paid by Individual/HUF (not liable for tax audit)",
+    "Who deducts":"Individual or HUF not covered under 194I",
+    "Threshold":"₹50,000 per month",
+    "Rate":"2%",
+    "When to deduct":"Only once in last month of FY or tenancy",
+    "Deposit due date":"Within 30 days from month end",
+    "Form":"26QC",
+    "Certificate":"Form 16C",
+    "Notes":"TAN not required. Single deduction only (not monthly)."},
+
+    {"Section":"194LA","Nature":"Land acquisition compensation",
+     "Threshold":"₹2.5 lakh","Rate":"10%",
+     "code":"194LA", "rate":10, "single":250_000},
+
+    # ================= HIGH VALUE IND/HUF =================
+    {"Section":"194M","Nature":"High value contract/professional by Individual/HUF",
+     "Threshold":"₹50 lakh yearly","Rate":"5%",
+     "code":"194M", "rate":5, "annual":5_000_000},
+
+    # ================= CASH WITHDRAWAL =================
+    {"Section":"194N","Nature":"Cash withdrawal",
+     "Threshold":"₹1 crore (₹20L if no ITR filed)",
+     "Rate":"2% / 5%",
+     "Notes":"Bank withdrawals",
+     "code":"194N", "rate":2, "annual":10_000_000, "excess":True},
+
+    # ================= E-COMMERCE =================
+    {"Section":"194O","Nature":"E-commerce operator payments",
+     "Threshold":"₹5 lakh","Rate":"0.1%",
+     "code":"194O", "rate":0.1, "annual":500_000, "no_pan_rate":5},
+
+    # ================= PURCHASE OF GOODS =================
+    {"Section":"194Q","Nature":"Purchase of goods",
+     "Threshold":"₹50 lakh purchase & buyer turnover > ₹10 Cr",
+     "Rate":"0.1%",
+     "code":"194Q", "rate":0.1, "annual":5_000_000, "excess":True, "no_pan_rate":5},
+
+    # ================= BENEFIT =================
+    {"Section":"194R","Nature":"Business benefit/perquisite",
+     "Threshold":"₹20,000","Rate":"10%",
+     "code":"194R", "rate":10, "annual":20_000},
+
+    # ================= CRYPTO =================
+    {"Section":"194S","Nature":"Virtual Digital Assets (Crypto)",
+     "Threshold":"₹10k / ₹50k","Rate":"1%",
+     "code":"194S", "rate":1, "annual":50_000},
+
+    # ================= NON RESIDENT =================
+    {"Section":"195","Nature":"Payment to Non-resident",
+     "Threshold":"No limit","Rate":"As per DTAA/Act"},
+
+]
+
+# plain section numbers in a ledger mean the more common sub-clause
+SECTION_ALIASES = {
+    "194I": "194I(b)",
+    "194J": "194J(b)",
+}
+
+# 206AA: no valid PAN -> twice the rate, at least 20% (unless the section says otherwise)
+NO_PAN_MIN_RATE = 20
+
+PAN_PATTERN = r"^[A-Z]{5}[0-9]{4}[A-Z]$"
+
+# ledger header (lower case, "_" as space) -> column
+LEDGER_MAPPING = {
+    "party": "Party",
+    "party name": "Party",
+    "deductee": "Party",
+    "deductee name": "Party",
+    "vendor": "Party",
+    "vendor name": "Party",
+    "supplier name": "Party",
+    "payee": "Party",
+    "pan": "PAN",
+    "pan no": "PAN",
+    "pan number": "PAN",
+    "deductee pan": "PAN",
+    "section": "Section",
+    "tds section": "Section",
+    "section code": "Section",
+    "sec": "Section",
+    "date": "Date",
+    "payment date": "Date",
+    "bill date": "Date",
+    "invoice date": "Date",
+    "voucher date": "Date",
+    "amount": "Amount",
+    "gross amount": "Amount",
+    "payment amount": "Amount",
+    "bill amount": "Amount",
+    "taxable amount": "Amount",
+    "deductee type": "Party_Type",
+    "party type": "Party_Type",
+}
+
+LEDGER_COLUMNS = ["Party", "Section", "Date", "Amount"]
+
+SCHEDULE_COLUMNS = ["Section_Code", "FY", "Cumulative", "TDS_Base", "TDS_Rate",
+                    "TDS_Amount", "TDS_REMARK"]
+
+
+# ==============================
+# Section table
+# ==============================
+
+def section_key(s):
+    """
+    Ledger section text -> lookup key: "Sec. 194 C" -> "194C",
+    "194J(b)" -> "194J(B)". Each distinct value is cleaned once.
+    """
+    codes, uniques = pd.factorize(s.astype(object))
+    cleaned = (
+        pd.Series(uniques, dtype=object).astype(str)
+        .str.upper()
+        .str.replace(r"^\s*(SECTION|SEC|U/S)[\s.:-]*", "", regex=True)
+        .str.replace(r"[^0-9A-Z()]", "", regex=True)
+        .to_numpy(dtype=object)
+    )
+    return np.where(codes >= 0, np.append(cleaned, "")[codes], "").astype(object)
+
+
+def section_table():
+    """One row per computable section, indexed by upper-cased code."""
+    rows = [s for s in TDS_SECTIONS if s.get("rate") is not None]
+    table = pd.DataFrame({
+        "code": [s["code"] for s in rows],
+        "rate": [s["rate"] for s in rows],
+        "rate_ind": [s.get("rate_ind", s["rate"]) for s in rows],
+        "no_pan_rate": [s.get("no_pan_rate", np.nan) for s in rows],
+        "single": [s.get("single", np.nan) for s in rows],
+        "limit": [s.get("annual", s.get("monthly", np.nan)) for s in rows],
+        "monthly": ["monthly" in s for s in rows],
+        "excess": [s.get("excess", False) for s in rows],
+    })
+    table.index = table["code"].str.upper()
+    table = table[~table.index.duplicated()]
+
+    aliases = table.loc[[v.upper() for v in SECTION_ALIASES.values()]]
+    aliases.index = list(SECTION_ALIASES)
+    return pd.concat([table, aliases])
+
+
+def search_sections(text):
+    """Handbook entries whose section or nature contains ``text``."""
+    text = text.lower()
+    return [
+        row for row in TDS_SECTIONS
+        if text in f"{row['Section']} {row['Nature']}".lower() or text == ""
+    ]
+
+
+# ==============================
+# Ledger
+# ==============================
+
+def map_ledger_columns(df):
+    normalise_columns(df)
+    df.columns = [
+        LEDGER_MAPPING.get(c.lower().replace("_", " ").strip(), c) for c in df.columns
+    ]
+    return df
+
+
+def prepare_ledger(df):
+    """Map headers and coerce types of one raw ledger frame."""
+    df = map_ledger_columns(df)
+    missing = [c for c in LEDGER_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Ledger is missing column(s): {', '.join(missing)}")
+
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce", dayfirst=True)
+    df["Amount"] = pd.to_numeric(df["Amount"], errors="coerce").fillna(0)
+    for col in ["Party", "Section", "PAN", "Party_Type"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def load_ledger(source, fmt=None):
+    """Read and prepare a payment ledger (xlsx first sheet, CSV or Parquet)."""
+    from ingest import concat_chunks, iter_chunks
+
+    chunks = iter_chunks(source, fmt=fmt, header_names=LEDGER_MAPPING)
+    return concat_chunks([prepare_ledger(c) for c in chunks])
+
+
+def create_ledger_template():
+    return pd.DataFrame({
+        "Party": ["ABC Contractors", "XYZ Consultants LLP", "ABC Contractors"],
+        "PAN": ["ABCPD1234F", "AAAFX5678L", "ABCPD1234F"],
+        "Section": ["194C", "194J", "194C"],
+        "Date": ["05-04-2025", "12-04-2025", "20-05-2025"],
+        "Amount": [25000, 60000, 80000],
+    })
+
+
+# ==============================
+# Vectorised helpers
+# ==============================
+
+def grouped_cumsum(values, starts):
+    """Running total of ``values`` restarting wherever ``starts`` is True."""
+    total = np.cumsum(values)
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(values)), 0))
+    return total - (total - values)[first]
+
+
+def deductee_keys(df):
+    """PAN where it is valid, else the cleaned party name."""
+    party = clean_supplier_col(df["Party"].astype(object))
+    if "PAN" not in df.columns:
+        return party, np.ones(len(df), dtype=bool)
+    pan = df["PAN"].astype(object).where(df["PAN"].notna(), "").astype(str).str.upper().str.strip()
+    valid = pan.str.match(PAN_PATTERN).to_numpy()
+    return pd.Series(np.where(valid, "PAN:" + pan, party), index=df.index), valid
+
+
+def individual_deductee(df):
+    """Individual/HUF: an explicit type column, else the 4th PAN letter (P/H)."""
+    if "Party_Type" in df.columns:
+        kind = df["Party_Type"].astype(object).where(df["Party_Type"].notna(), "")
+        return kind.astype(str).str.upper().str.match(r"\s*(IND|HUF)").to_numpy()
+    if "PAN" in df.columns:
+        pan = df["PAN"].astype(object).where(df["PAN"].notna(), "").astype(str).str.upper()
+        return pan.str.strip().str[3].isin(["P", "H"]).to_numpy()
+    return np.zeros(len(df), dtype=bool)
+
+
+def fy_labels(start_years):
+    """2025 -> "2025-26", labelling each distinct year once; 0 (no date) -> ""."""
+    years, inverse = np.unique(start_years, return_inverse=True)
+    labels = np.array([f"{y}-{(y + 1) % 100:02d}" if y > 0 else "" for y in years],
+                      dtype=object)
+    return labels[inverse]
+
+
+# ==============================
+# Schedule
+# ==============================
+
+def deduction_schedule(ledger):
+    """
+    TDS per ledger line, in ledger order.
+
+    Adds the matched ``Section_Code``, the financial year, the deductee's
+    running total for the section and period, the amount TDS applies to
+    (``TDS_Base``), the rate and the TDS rounded to the rupee, and a
+    ``TDS_REMARK``. When an aggregate threshold is crossed the base of that
+    line includes the earlier untaxed payments of the year (the catch-up
+    deduction); for ``excess`` sections only the part above it is taxed.
+    """
+    df = ledger.reset_index(drop=True)
+    n = len(df)
+    table = section_table()
+
+    params = table.reindex(section_key(df["Section"]))
+    known = params["rate"].notna().to_numpy()
+
+    dates = df["Date"]
+    fy = np.where(dates.notna(), dates.dt.year - (dates.dt.month < 4), 0).astype(np.int64)
+    month = np.where(dates.notna(), dates.dt.month, 0).astype(np.int64)
+    monthly = params["monthly"].fillna(False).to_numpy(dtype=bool)
+    excess = params["excess"].fillna(False).to_numpy(dtype=bool)
+    period = fy * 100 + np.where(monthly, month, 0)
+
+    keys, valid_pan = deductee_keys(df)
+    party_codes, parties = pd.factorize(keys)
+    section_codes, sections = pd.factorize(params["code"].fillna("").to_numpy())
+    period_codes, periods = pd.factorize(period)
+    group = (party_codes.astype(np.int64) * len(sections) + section_codes) \
+        * len(periods) + period_codes
+
+    # ledger order within a group for payments on the same day
+    day = dates.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    order = np.lexsort((np.arange(n), day, group))
+    g = group[order]
+    starts = np.r_[True, g[1:] != g[:-1]] if n else np.zeros(0, dtype=bool)
+
+    # paise keep thresholds exact over a million additions
+    amount = np.round(df["Amount"].to_numpy(dtype=float) * 100).astype(np.int64)[order]
+    cum = grouped_cumsum(amount, starts)
+    prev = cum - amount
+
+    single = np.round(params["single"].to_numpy()[order] * 100)
+    limit = np.round(params["limit"].to_numpy()[order] * 100)
+    has_limit = ~np.isnan(limit)
+    excess = excess[order] & has_limit
+
+    single_hit = ~np.isnan(single) & (amount > single)
+    untaxed = np.where(single_hit, 0, amount)
+    untaxed_prev = grouped_cumsum(untaxed, starts) - untaxed
+    after = has_limit & (prev > limit)
+    crossing = has_limit & ~after & (cum > limit)
+
+    def over(total):
+        return np.clip(total - np.nan_to_num(limit), 0, None)
+
+    base = np.select(
+        [excess, after, crossing, single_hit],
+        [over(cum) - over(prev), amount, amount + untaxed_prev, amount],
+        0,
+    )
+    remark = np.select(
+        [excess & (base > 0), after, crossing & (untaxed_prev > 0), crossing, single_hit],
+        ["EXCESS OVER THRESHOLD", "ABOVE THRESHOLD", "THRESHOLD CROSSED (CATCH-UP)",
+         "THRESHOLD CROSSED", "SINGLE PAYMENT ABOVE THRESHOLD"],
+        "BELOW THRESHOLD",
+    ).astype(object)
+
+    # back to ledger order
+    unsort = np.empty(n, dtype=np.int64)
+    unsort[order] = np.arange(n)
+    cum, base, remark = cum[unsort], base[unsort], remark[unsort]
+
+    rate = np.where(individual_deductee(df), params["rate_ind"], params["rate"])
+    no_pan = np.nan_to_num(params["no_pan_rate"].to_numpy(),
+                           nan=NO_PAN_MIN_RATE)
+    rate = np.where(valid_pan, rate, np.maximum(2 * rate, no_pan))
+    rate = np.where(known, rate, np.nan)
+    base = np.where(known, base, 0)
+    remark[~known] = "NOT COMPUTED"
+
+    out = df.copy()
+    out["Section_Code"] = params["code"].to_numpy()
+    out["FY"] = fy_labels(fy)
+    out["Cumulative"] = cum / 100
+    out["TDS_Base"] = base / 100
+    out["TDS_Rate"] = rate
+    out["TDS_Amount"] = np.round(base / 100 * np.nan_to_num(rate) / 100)
+    out["TDS_REMARK"] = remark
+    return out
+
+
+def summarise_schedule(schedule):
+    """Totals per financial year, section and deductee."""
+    keys = ["FY", "Section_Code", "Party"]
+    return (
+        schedule.groupby(keys, observed=True, dropna=False, sort=True)
+        .agg(Payments=("Amount", "size"), Amount=("Amount", "sum"),
+             TDS_Base=("TDS_Base", "sum"), TDS_Amount=("TDS_Amount", "sum"))
+        .reset_index()
+    )
+
+
+def export_schedule(schedule, fmt="xlsx"):
+    from gst_reco import frames_bytes
+
+    return frames_bytes(
+        {"Schedule": schedule, "Summary": summarise_schedule(schedule)}, fmt
+    )
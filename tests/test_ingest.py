@@ -0,0 +1,96 @@
+"""Chunked loads give the same prepared frame whatever the chunk size."""
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from gst_reco import load_workbook, prepare
+from ingest import load_prepared
+
+
+HEADER = ["Supplier Name", "GSTIN", "Invoice No", "Invoice Date",
+          "Integrated Tax", "Central Tax", "State Tax"]
+
+# numeric invoice numbers with a blank: only the chunks holding the blank
+# are inferred as float
+ROWS = [
+    ["Alpha Ltd", "27ABCDE1234F1Z5", 1001, "01/04/2026", 100, 0, 0],
+    ["Beta Pvt Ltd", "29PQRSX5678L1Z2", 1002, "02/04/2026", 0, 50.5, 50.5],
+    ["Gamma", None, None, "03/04/2026", 10, 0, 0],
+    ["Alpha Ltd", "27ABCDE1234F1Z5", 1003, "04/04/2026", 100, 0, 0],
+    ["Delta", "27ABCDE1234F1Z6", 1004, "05/04/2026", 1, 0, 0],
+    ["Alpha Ltd", "27ABCDE1234F1Z5", 1005, None, 7.25, 0, 0],
+    ["Epsilon", "29PQRSX5678L1Z3", "A-77", "06/04/2026", 0, 3, 3],
+]
+
+
+def values(df):
+    """Frame contents as plain text, independent of dtypes and categories."""
+    return {
+        col: ["" if pd.isna(v) else str(v) for v in df[col].astype(object)]
+        for col in df.columns
+    }
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "gstr2b.csv"
+    pd.DataFrame(ROWS, columns=HEADER).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def xlsx_path(tmp_path):
+    path = tmp_path / "gstr2b.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["GSTR-2B for April 2026"])
+    ws.append(HEADER)
+    for row in ROWS:
+        ws.append(row)
+    wb.save(path)
+    return path
+
+
+@pytest.mark.parametrize("fmt", ["csv", "xlsx"])
+def test_chunk_size_does_not_change_the_result(fmt, csv_path, xlsx_path):
+    path = csv_path if fmt == "csv" else xlsx_path
+    full = values(load_prepared(path, chunk_size=len(ROWS)))
+    for chunk_size in range(1, len(ROWS) + 2):
+        assert values(load_prepared(path, chunk_size=chunk_size)) == full, chunk_size
+
+
+@pytest.mark.parametrize("fmt", ["csv", "xlsx"])
+def test_numeric_invoice_numbers_keep_no_decimal(fmt, csv_path, xlsx_path):
+    path = csv_path if fmt == "csv" else xlsx_path
+    for chunk_size in (2, 3, len(ROWS)):
+        df = load_prepared(path, chunk_size=chunk_size)
+        assert df["Invoice_No_CLEAN"].astype(object).tolist() == [
+            "1001", "1002", "", "1003", "1004", "1005", "A77"
+        ]
+
+
+def test_matches_whole_sheet_read(xlsx_path):
+    whole = prepare(pd.read_excel(xlsx_path, header=1))
+    streamed = load_prepared(xlsx_path, chunk_size=2)
+    for col in ["Invoice_No_CLEAN", "Supplier_Name_CLEAN", "GSTIN",
+                "IGST", "CGST", "SGST", "TAX_STRUCTURE"]:
+        assert values(streamed)[col] == values(whole)[col], col
+
+
+def test_title_mentioning_party_is_not_the_header(tmp_path):
+    path = tmp_path / "gst.xlsx"
+    wb = openpyxl.Workbook()
+    for sheet in ["GSTR_2B", "BOOKS"]:
+        ws = wb.create_sheet(sheet)
+        ws.append(["Party-wise purchase register for FY 2025-26"])
+        ws.append(HEADER)
+        for row in ROWS:
+            ws.append(row)
+    del wb["Sheet"]
+    wb.save(path)
+
+    assert len(load_prepared(path, "GSTR_2B")["Supplier_Name"]) == len(ROWS)
+    for df in load_workbook(path):
+        assert df.columns.tolist() == HEADER
+        assert len(df) == len(ROWS)
@@ -0,0 +1,41 @@
+"""A first incremental run matches like a one-off reconciliation."""
+
+import pandas as pd
+
+import gst_reco
+import ledger
+import synthetic
+
+
+COLUMNS = ["USED", "MATCH_SCORE", "MATCH_GROUP", "RECO_REMARK"]
+
+
+def prepared(seed):
+    gstr2b, books = synthetic.generate(300, seed=seed)
+    # renumber the second half of each split line, so only the split
+    # invoice pass can pair them
+    second = books.duplicated(["GSTIN", "Invoice_No"])
+    books.loc[second, "Invoice_No"] = books.loc[second, "Invoice_No"] + "-B"
+    return gst_reco.prepare_both(gstr2b, books)
+
+
+def test_first_run_keeps_scores_and_groups(tmp_path):
+    expected = gst_reco.match(*prepared(0))
+    gstr2b, books, stats = ledger.reconcile_incremental(
+        *prepared(0), "2026-01", path=str(tmp_path / "ledger.sqlite")
+    )
+
+    assert expected[1]["MATCH_GROUP"].notna().any()
+    for got, want in zip((gstr2b, books), expected):
+        pd.testing.assert_frame_equal(got[COLUMNS], want[COLUMNS], check_dtype=False)
+
+
+def test_rows_seen_before_keep_no_score(tmp_path):
+    path = str(tmp_path / "ledger.sqlite")
+    ledger.reconcile_incremental(*prepared(0), "2026-01", path=path)
+    gstr2b, books, stats = ledger.reconcile_incremental(*prepared(0), "2026-02", path=path)
+
+    assert stats["BOOKS"]["new_rows"] == 0
+    assert books["USED"].any()
+    assert books["MATCH_SCORE"].isna().all()
+    assert books["MATCH_GROUP"].isna().all()
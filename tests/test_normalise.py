@@ -0,0 +1,82 @@
+"""Parity of the column cleaners with the per-cell rules they replace."""
+
+import numpy as np
+import pandas as pd
+
+from normalise import (
+    clean_gstin_col,
+    clean_invoice,
+    clean_invoice_col,
+    clean_supplier,
+    clean_supplier_col,
+    tax_structure,
+    tax_structure_col,
+)
+
+
+MIXED = pd.Series(
+    [
+        "INV-001", " inv/002 ", "a b\tc\n", "", "   ",
+        np.nan, None, pd.NA,
+        1001, 1001.0, 1001.5, -7, 0,
+        "ｉｎｖ１２", "Café-9", "straße", " X ",
+        "abc pvt. ltd.", "Limited Liability LLP", "pvtltd",
+    ],
+    dtype=object,
+)
+
+
+def test_clean_invoice_col_matches_per_cell_rule():
+    # the GST page always cleaned ``Invoice_No.astype(str)``
+    expected = MIXED.astype(str).apply(clean_invoice)
+    assert clean_invoice_col(MIXED).tolist() == expected.tolist()
+
+
+def test_clean_invoice_col_missing_follows_astype_str():
+    # Known difference from the scalar rule: a missing cell goes through
+    # astype(str) first, as on the GST page. pandas 2 renders it "nan",
+    # which cleans to "NAN"; pandas 3 keeps it missing, which cleans to "".
+    # clean_invoice on the raw cell is always "".
+    s = pd.Series([np.nan, "A-1"], dtype=object)
+    rendered = s.astype(str)[0]
+    expected = "" if pd.isna(rendered) else "NAN"
+    assert clean_invoice_col(s).tolist() == [expected, "A1"]
+    assert [clean_invoice(x) for x in s] == ["", "A1"]
+
+
+def test_clean_invoice_col_numeric_column():
+    s = pd.Series([1001, 2002, 3003])
+    assert clean_invoice_col(s).tolist() == s.astype(str).apply(clean_invoice).tolist()
+    assert clean_invoice_col(s).tolist() == ["1001", "2002", "3003"]
+
+
+def test_clean_supplier_col_matches_per_cell_rule():
+    expected = MIXED.apply(clean_supplier)
+    assert clean_supplier_col(MIXED).tolist() == expected.tolist()
+
+
+def test_clean_supplier_col_keeps_index():
+    s = pd.Series(["abc ltd", np.nan], index=[10, 20], dtype=object)
+    out = clean_supplier_col(s)
+    assert out.index.tolist() == [10, 20]
+    assert out.tolist() == ["ABC", ""]
+
+
+def test_clean_gstin_col_matches_per_cell_rule():
+    df = pd.DataFrame({"GSTIN": MIXED})
+    assert clean_gstin_col(df).tolist() == MIXED.apply(clean_invoice).tolist()
+
+
+def test_clean_gstin_col_without_column():
+    df = pd.DataFrame({"Invoice_No": ["A", "B"]})
+    assert clean_gstin_col(df).tolist() == ["", ""]
+
+
+def test_tax_structure_col_matches_per_row_rule():
+    df = pd.DataFrame({
+        "IGST": [10, 0, 0, 5, 0, -1],
+        "CGST": [0, 5, 0, 5, 5, 0],
+        "SGST": [0, 5, 0, 0, 0, 0],
+    })
+    expected = df.apply(tax_structure, axis=1)
+    assert tax_structure_col(df).astype(str).tolist() == expected.tolist()
@@ -0,0 +1,269 @@
+"""Matching engine against the per-invoice loops of the original GST page."""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from normalise import tax_structure_col
+from reco_engine import (
+    PAISE,
+    REMARKS,
+    TAX_COLS,
+    MAX_PARTS,
+    TOLERANCE,
+    find_combination,
+    invoice_days,
+    match_by_amount,
+    match_by_invoice,
+    match_combinations,
+)
+
+
+TOL = TOLERANCE * PAISE
+
+# amounts in paise: steps of half the tolerance put many pairs exactly on it
+AMOUNTS = [0, 50, 100, 150, 200, 300]
+DATES = ["01/04/2026", "02/04/2026", "04/04/2026", None]
+
+
+def frame(rows, dates=None):
+    """Prepared-style frame from ``(invoice, igst, cgst, sgst)`` paise rows."""
+    df = pd.DataFrame(rows, columns=["Invoice_No_CLEAN"] + TAX_COLS)
+    if dates is not None:
+        df["Invoice_Date"] = dates
+    for col in TAX_COLS:
+        df[col] = df[col].astype(np.int64)
+    df["TAX_STRUCTURE"] = tax_structure_col(df)
+    df["RECO_REMARK"] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), dtype=REMARKS)
+    df["USED"] = False
+    df["MATCH_SCORE"] = np.nan
+    df["MATCH_GROUP"] = None
+    return df
+
+
+def random_rows(rng, n, invoices):
+    return [
+        (str(rng.choice(invoices)), *(int(rng.choice(AMOUNTS)) for _ in TAX_COLS))
+        for _ in range(n)
+    ]
+
+
+def loop_match_by_invoice(gstr2b, books, tolerance=TOL):
+    """Step 4 as the page ran it: one re-filter of GSTR_2B per BOOKS invoice."""
+    for inv_no, grp in books[books["Invoice_No_CLEAN"] != ""].groupby("Invoice_No_CLEAN"):
+        sums = {col: grp[col].sum() for col in TAX_COLS}
+        candidates = gstr2b[
+            (~gstr2b["USED"])
+            & (gstr2b["Invoice_No_CLEAN"] == inv_no)
+            & (gstr2b["TAX_STRUCTURE"] == grp.iloc[0]["TAX_STRUCTURE"])
+        ]
+        for j, g in candidates.iterrows():
+            if all(abs(g[col] - sums[col]) <= tolerance for col in TAX_COLS):
+                books.loc[grp.index, ["RECO_REMARK", "USED"]] = ["MATCHED", True]
+                gstr2b.loc[j, ["RECO_REMARK", "USED"]] = ["MATCHED", True]
+                break
+
+
+def assert_same(engine, loop):
+    assert engine["USED"].tolist() == loop["USED"].tolist()
+    assert engine["RECO_REMARK"].astype(str).tolist() == loop["RECO_REMARK"].astype(str).tolist()
+
+
+def run_both(gstr2b, books, engine, loop):
+    e2b, ebooks, l2b, lbooks = gstr2b.copy(), books.copy(), gstr2b.copy(), books.copy()
+    engine(e2b, ebooks)
+    loop(l2b, lbooks)
+    assert_same(e2b, l2b)
+    assert_same(ebooks, lbooks)
+    return e2b, ebooks
+
+
+# ==============================
+# STEP 4 — Invoice number matching
+# ==============================
+
+def test_invoice_picks_first_unused_line_in_sheet_order():
+    gstr2b = frame([
+        ("A1", 0, 100, 100),      # wrong structure for the group
+        ("A1", 1000, 0, 0),
+        ("A1", 1000, 0, 0),       # duplicate: must stay unused
+        ("B2", 500, 0, 0),
+    ])
+    books = frame([("A1", 600, 0, 0), ("A1", 400, 0, 0), ("B2", 500 + TOL, 0, 0)])
+    e2b, ebooks = run_both(gstr2b, books, match_by_invoice, loop_match_by_invoice)
+    assert e2b["USED"].tolist() == [False, True, False, True]
+    assert ebooks["USED"].all()
+
+
+def test_invoice_tolerance_is_inclusive():
+    gstr2b = frame([("X", 1000, 0, 0), ("Y", 0, 500, 500)])
+    books = frame([("X", 1000 + TOL, 0, 0), ("Y", 0, 500 - TOL - 1, 500)])
+    e2b, ebooks = run_both(gstr2b, books, match_by_invoice, loop_match_by_invoice)
+    assert ebooks["USED"].tolist() == [True, False]
+
+
+def test_invoice_group_structure_comes_from_its_first_row():
+    # the group sums to CGST_SGST amounts but its first row is IGST
+    gstr2b = frame([("M", 100, 100, 100), ("M", 0, 100, 100)])
+    books = frame([("M", 100, 0, 0), ("M", 0, 100, 100)])
+    run_both(gstr2b, books, match_by_invoice, loop_match_by_invoice)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_invoice_matches_loop_on_random_collisions(seed):
+    rng = np.random.default_rng(seed)
+    invoices = ["A", "B", "C", "D", ""]
+    gstr2b = frame(random_rows(rng, int(rng.integers(1, 25)), invoices))
+    books = frame(random_rows(rng, int(rng.integers(1, 25)), invoices))
+    # some lines already consumed by an earlier pass
+    gstr2b["USED"] = rng.random(len(gstr2b)) < 0.2
+    run_both(gstr2b, books, match_by_invoice, loop_match_by_invoice)
+
+
+# ==============================
+# STEP 4C — Tax amount fallback
+# ==============================
+
+def loop_match_by_amount(gstr2b, books, tolerance=TOL, date_window=None):
+    """Step 4B as the page ran it: a boolean mask over GSTR_2B per BOOKS row."""
+    days_2b, days_books = invoice_days(gstr2b), invoice_days(books)
+    for i, b in books[~books["USED"]].iterrows():
+        mask = (~gstr2b["USED"]) & (gstr2b["TAX_STRUCTURE"] == b["TAX_STRUCTURE"])
+        for col in TAX_COLS:
+            mask &= (gstr2b[col] - b[col]).abs() <= tolerance
+        if date_window is not None:
+            gap = np.abs(days_2b - days_books[i])
+            mask &= ~(gap > date_window)
+        candidates = gstr2b[mask]
+        if len(candidates) >= 1:
+            j = candidates.index[0]
+            books.loc[i, ["RECO_REMARK", "USED"]] = ["MATCHED", True]
+            gstr2b.loc[j, ["RECO_REMARK", "USED"]] = ["MATCHED", True]
+
+
+def fallback(date_window):
+    return (
+        lambda g, b: match_by_amount(g, b, TOLERANCE, date_window),
+        lambda g, b: loop_match_by_amount(g, b, TOL, date_window),
+    )
+
+
+def test_amount_bucket_edges():
+    # bucket width is the tolerance: 200 and 300 paise sit in neighbouring
+    # buckets and differ by exactly the tolerance
+    gstr2b = frame([("", 300, 0, 0), ("", 199, 0, 0), ("", 200, 0, 0), ("", 401, 0, 0),
+                    ("", 400, 0, 0)])
+    books = frame([("", 200, 0, 0), ("", 300, 0, 0), ("", 300, 0, 0), ("", 300, 0, 0)])
+    e2b, ebooks = run_both(gstr2b, books, *fallback(None))
+    assert ebooks["USED"].tolist() == [True, True, True, False]
+    assert e2b["USED"].tolist() == [True, False, True, False, True]
+
+
+def test_amount_skips_consumed_lines():
+    gstr2b = frame([("", 500, 0, 0), ("", 500, 0, 0), ("", 0, 250, 250)])
+    gstr2b.loc[0, "USED"] = True
+    books = frame([("", 500, 0, 0), ("", 500, 0, 0), ("", 0, 250, 250)])
+    books.loc[2, "USED"] = True
+    e2b, ebooks = run_both(gstr2b, books, *fallback(None))
+    assert ebooks["USED"].tolist() == [True, False, True]
+    assert e2b["RECO_REMARK"].astype(str).tolist() == ["NOT MATCHED", "MATCHED", "NOT MATCHED"]
+
+
+@pytest.mark.parametrize("date_window", [0, 2])
+def test_amount_date_window(date_window):
+    gstr2b = frame([("", 100, 0, 0)] * 4, dates=["01/04/2026", "03/04/2026", None, "02/04/2026"])
+    books = frame([("", 100, 0, 0)] * 3, dates=["03/04/2026", "02/04/2026", None])
+    run_both(gstr2b, books, *fallback(date_window))
+
+
+@pytest.mark.parametrize("date_window", [None, 0, 2])
+@pytest.mark.parametrize("seed", range(30))
+def test_amount_matches_loop_on_random_collisions(seed, date_window):
+    rng = np.random.default_rng(seed)
+    n_2b, n_books = int(rng.integers(1, 30)), int(rng.integers(1, 30))
+    gstr2b = frame(random_rows(rng, n_2b, [""]), dates=list(rng.choice(DATES, n_2b)))
+    books = frame(random_rows(rng, n_books, [""]), dates=list(rng.choice(DATES, n_books)))
+    gstr2b["USED"] = rng.random(n_2b) < 0.2
+    books["USED"] = rng.random(n_books) < 0.2
+    run_both(gstr2b, books, *fallback(date_window))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_invoice_then_amount_matches_loops(seed):
+    rng = np.random.default_rng(100 + seed)
+    gstr2b = frame(random_rows(rng, 30, ["A", "B", "C", ""]))
+    books = frame(random_rows(rng, 30, ["A", "B", "C", ""]))
+
+    def engine(g, b):
+        match_by_invoice(g, b)
+        match_by_amount(g, b)
+
+    def loop(g, b):
+        loop_match_by_invoice(g, b)
+        loop_match_by_amount(g, b)
+
+    run_both(gstr2b, books, engine, loop)
+
+
+# ==============================
+# STEP 4B — Split and consolidated invoices
+# ==============================
+
+def brute_force_combination(target, amounts, tolerance=TOL, max_parts=MAX_PARTS):
+    """Fewest parts, then lowest indices: the first hit in combinations() order."""
+    for size in range(2, max_parts + 1):
+        for members in combinations(range(len(amounts)), size):
+            if (np.abs(amounts[list(members)].sum(axis=0) - target) <= tolerance).all():
+                return list(members)
+    return None
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_find_combination_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(0, 11))
+    # few distinct amounts, so most targets have several qualifying subsets
+    amounts = rng.choice([0, 100, 150, 250, 400], size=(n, 3)).astype(np.int64)
+    target = rng.choice([0, 250, 400, 500, 650, 900], size=3).astype(np.int64)
+    max_parts = int(rng.integers(2, 5))
+    assert find_combination(target, amounts, TOL, max_parts) == \
+        brute_force_combination(target, amounts, TOL, max_parts)
+
+
+def supplier_frame(rows):
+    """``frame`` of one supplier, every invoice dated the same day."""
+    df = frame(rows, dates=["01/04/2026"] * len(rows))
+    df["Supplier_Name_CLEAN"] = "ACME TRADERS"
+    df["GSTIN"] = "27ABCDE1234F1Z5"
+    return df
+
+
+def test_split_invoice_one_2b_line_to_several_books_entries():
+    gstr2b = supplier_frame([("X9", 1500, 0, 0), ("S1", 1000, 0, 0)])
+    books = supplier_frame([("S1-A", 300, 0, 0), ("OTHER", 50, 0, 0),
+                            ("S1-B", 700, 0, 0)])
+    assert match_combinations(gstr2b, books) == 1
+    assert gstr2b["MATCH_GROUP"].tolist() == [None, "C2"]
+    assert books["MATCH_GROUP"].tolist() == ["C2", None, "C2"]
+    assert books["USED"].tolist() == [True, False, True]
+
+
+def test_consolidated_invoice_several_2b_lines_to_one_books_entry():
+    gstr2b = supplier_frame([("K1", 200, 0, 0), ("K2", 50, 0, 0),
+                             ("K3", 300, 0, 0), ("K4", 500, 0, 0)])
+    books = supplier_frame([("K-ALL", 1000, 0, 0)])
+    assert match_combinations(gstr2b, books) == 1
+    # fewest parts: K1 + K3 + K4, labelled by the first of them
+    assert gstr2b["MATCH_GROUP"].tolist() == ["C1", None, "C1", "C1"]
+    assert books["MATCH_GROUP"].tolist() == ["C1"]
+    assert gstr2b["RECO_REMARK"].astype(str).tolist() == [
+        "MATCHED", "NOT MATCHED", "MATCHED", "MATCHED"]
+
+
+def test_combination_budget_stops_the_block():
+    gstr2b = supplier_frame([("S1", 1000, 0, 0)])
+    books = supplier_frame([("S1-A", 300, 0, 0), ("S1-B", 700, 0, 0)])
+    assert match_combinations(gstr2b.copy(), books.copy(), budget=3) == 0
+    assert match_combinations(gstr2b, books, budget=4) == 1
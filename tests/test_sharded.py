@@ -0,0 +1,30 @@
+"""Sharded matching gives the same result as a single-process run."""
+
+import pandas as pd
+import pytest
+
+import gst_reco
+import sharded
+import synthetic
+
+
+COLUMNS = ["USED", "MATCH_SCORE", "MATCH_GROUP", "RECO_REMARK"]
+
+
+def reconciled(gstr2b, books, workers):
+    gstr2b, books = gst_reco.prepare_both(gstr2b.copy(), books.copy())
+    return gst_reco.match(gstr2b, books, workers=workers)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_workers_match_single_process(monkeypatch, seed):
+    monkeypatch.setattr(sharded, "SHARD_MIN_ROWS", 10)
+    gstr2b, books = synthetic.generate(400, seed=seed)
+    assert sharded.use_shards(books, 2)
+
+    single = reconciled(gstr2b, books, workers=1)
+    pooled = reconciled(gstr2b, books, workers=2)
+
+    for one, two in zip(single, pooled):
+        assert one["USED"].any()
+        pd.testing.assert_frame_equal(one[COLUMNS], two[COLUMNS])
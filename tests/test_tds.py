@@ -0,0 +1,21 @@
+"""Payment ledgers load from the header row, not a title above it."""
+
+import openpyxl
+
+from tds import create_ledger_template, load_ledger
+
+
+def test_title_row_above_header(tmp_path):
+    template = create_ledger_template()
+    path = tmp_path / "ledger.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Party ledger for FY 2025-26"])
+    ws.append(list(template.columns))
+    for row in template.itertuples(index=False):
+        ws.append(list(row))
+    wb.save(path)
+
+    ledger = load_ledger(path)
+    assert ledger["Party"].astype(str).tolist() == template["Party"].tolist()
+    assert ledger["Amount"].tolist() == template["Amount"].tolist()
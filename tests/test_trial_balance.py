@@ -0,0 +1,54 @@
+"""Streamed trial balance totals do not depend on how the GL is chunked."""
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from trial_balance import stream_totals, trial_balance
+
+
+HEADER = ["Voucher Date", "Account Code", "Account Name", "Debit", "Credit"]
+
+ROWS = [
+    ["01/04/2025", 1001, "Cash", 500, None],
+    ["01/04/2025", 2001, "Sales", None, 500],
+    ["02/04/2025", 1001, "Cash", 250, None],
+    ["02/04/2025", None, "Suspense", 10, None],
+    ["03/05/2025", 2001, "Sales", None, 250],
+    ["04/05/2025", 1001, "Cash", 75.5, None],
+    ["04/05/2025", 3001, "Rent", None, 75.5],
+    ["05/05/2025", None, "Suspense", None, 10],
+]
+
+
+@pytest.fixture(params=["csv", "xlsx"])
+def gl_path(request, tmp_path):
+    if request.param == "csv":
+        path = tmp_path / "gl.csv"
+        gl = pd.DataFrame(ROWS, columns=HEADER).astype({"Account Code": "Int64"})
+        gl.to_csv(path, index=False)
+        return path
+    path = tmp_path / "gl.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    # title rows above the header, as in Tally exports
+    ws.append(["ABC Traders"])
+    ws.append(["Ledger report 01-04-2025 to 31-05-2025"])
+    ws.append(HEADER)
+    for row in ROWS:
+        ws.append(row)
+    wb.save(path)
+    return path
+
+
+def test_chunk_size_does_not_change_the_trial_balance(gl_path):
+    full = trial_balance(stream_totals(gl_path, chunk_size=len(ROWS)))
+    assert full["Account_Code"].tolist() == ["", "1001", "2001", "3001", ""]
+    for chunk_size in range(1, len(ROWS) + 1):
+        tb = trial_balance(stream_totals(gl_path, chunk_size=chunk_size))
+        pd.testing.assert_frame_equal(tb, full, check_dtype=False)
+
+
+def test_title_rows_are_skipped(gl_path):
+    tb = trial_balance(stream_totals(gl_path))
+    assert tb.iloc[-1][["Debit", "Credit"]].tolist() == [835.5, 835.5]
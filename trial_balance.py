@@ -0,0 +1,275 @@
+"""
+Trial balance from a general ledger export, streamed in chunks.
+
+The GL is read through ingest's chunk readers and each chunk is reduced to
+debit / credit totals per account and period before the next one is read.
+Only that running total (accounts x periods rows) is kept, so peak memory
+is bounded by one chunk plus the result, whatever the size of the ledger.
+
+    python trial_balance.py gl_2025.csv --freq Q --out TB_2025.xlsx
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from ingest import CHUNK_SIZE, iter_chunks
+from normalise import integral_text, normalise_columns
+
+
+# GL header (lower case, "_" as space) -> column
+GL_MAPPING = {
+    "account": "Account",
+    "account name": "Account",
+    "account head": "Account",
+    "ledger": "Account",
+    "ledger name": "Account",
+    "gl account": "Account",
+    "particulars": "Account",
+    "account code": "Account_Code",
+    "gl code": "Account_Code",
+    "ledger code": "Account_Code",
+    "date": "Date",
+    "voucher date": "Date",
+    "posting date": "Date",
+    "transaction date": "Date",
+    "debit": "Debit",
+    "dr": "Debit",
+    "debit amount": "Debit",
+    "credit": "Credit",
+    "cr": "Credit",
+    "credit amount": "Credit",
+    "amount": "Amount",
+    "dr/cr": "Dr_Cr",
+    "drcr": "Dr_Cr",
+    "dr cr": "Dr_Cr",
+}
+
+FREQUENCIES = {"M": "Monthly", "Q": "Quarterly (FY)", "Y": "Financial year"}
+
+
+# ==============================
+# Chunk -> totals
+# ==============================
+
+def map_gl_columns(df):
+    normalise_columns(df)
+    df.columns = [
+        GL_MAPPING.get(c.lower().replace("_", " ").strip(), c) for c in df.columns
+    ]
+    return df
+
+
+def period_labels(dates, freq="M"):
+    """
+    "2025-04" (M), "FY2025-26 Q1" (Q) or "FY2025-26" (Y); "" without a date.
+    Quarters and years follow the April-March financial year.
+    """
+    valid = dates.notna().to_numpy()
+    year = dates.dt.year.fillna(0).to_numpy(dtype=np.int64)
+    month = dates.dt.month.fillna(0).to_numpy(dtype=np.int64)
+
+    if freq == "M":
+        key = year * 100 + month
+    else:
+        fy = year - (month < 4)
+        key = fy * 10 + ((month - 4) % 12 // 3 + 1 if freq == "Q" else 0)
+
+    codes, keys = pd.factorize(np.where(valid, key, -1))
+
+    def label(k):
+        if k < 0:
+            return ""
+        if freq == "M":
+            return f"{k // 100}-{k % 100:02d}"
+        fy, q = divmod(k, 10)
+        text = f"FY{fy}-{(fy + 1) % 100:02d}"
+        return f"{text} Q{q}" if q else text
+
+    return np.array([label(k) for k in keys], dtype=object)[codes]
+
+
+def per_distinct(s, func):
+    """``func`` applied to each distinct value of ``s`` once and broadcast back."""
+    codes, uniques = pd.factorize(s, use_na_sentinel=False)
+    return np.asarray(func(pd.Series(uniques, dtype=object)))[codes]
+
+
+def text(s):
+    # account codes of a chunk with blanks arrive as floats: 1001.0 -> "1001"
+    s = integral_text(s.infer_objects())
+    return s.where(s.notna(), "").astype(str).str.strip()
+
+
+def debit_credit(df):
+    """Debit and Credit columns from Debit/Credit, Amount + Dr/Cr, or signed Amount."""
+    def numeric(col):
+        return pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    if "Debit" in df.columns or "Credit" in df.columns:
+        debit = numeric("Debit") if "Debit" in df.columns else np.zeros(len(df))
+        credit = numeric("Credit") if "Credit" in df.columns else np.zeros(len(df))
+        return debit, credit
+
+    if "Amount" not in df.columns:
+        raise ValueError("GL needs Debit/Credit columns or an Amount column")
+    amount = numeric("Amount")
+    if "Dr_Cr" in df.columns:
+        credit_side = per_distinct(df["Dr_Cr"], lambda s: text(s).str.upper().str.startswith("C"))
+        amount = np.where(credit_side, -np.abs(amount), np.abs(amount))
+    return np.clip(amount, 0, None), np.clip(-amount, 0, None)
+
+
+def account_keys(df):
+    return ["Account_Code", "Account"] if "Account_Code" in df.columns else ["Account"]
+
+
+def chunk_totals(df, freq="M"):
+    """Debit / credit / line count per account and period for one raw chunk."""
+    df = map_gl_columns(df)
+    if "Account" not in df.columns:
+        raise ValueError("GL is missing an Account column")
+
+    if "Date" in df.columns:
+        dates = pd.Series(per_distinct(
+            df["Date"], lambda s: pd.to_datetime(s, errors="coerce", dayfirst=True)
+        ))
+    else:
+        dates = pd.Series(pd.NaT, index=df.index)
+
+    debit, credit = debit_credit(df)
+    keys = account_keys(df)
+    reduced = pd.DataFrame({
+        **{k: per_distinct(df[k], text) for k in keys},
+        "Period": period_labels(dates, freq),
+        "Debit": debit,
+        "Credit": credit,
+        "Lines": 1,
+    })
+    return reduced.groupby(keys + ["Period"], sort=False).sum().reset_index()
+
+
+def merge_totals(running, totals):
+    """Fold one chunk's totals into the running totals."""
+    if running is None:
+        return totals
+    keys = [c for c in totals.columns if c not in ("Debit", "Credit", "Lines")]
+    return pd.concat([running, totals]).groupby(keys, sort=False).sum().reset_index()
+
+
+def stream_totals(source, fmt=None, freq="M", chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Account x period totals of a GL file (xlsx first sheet, CSV or Parquet),
+    read ``chunk_size`` rows at a time. ``progress(rows_read)`` is called
+    after each chunk.
+    """
+    running, rows = None, 0
+    for chunk in iter_chunks(source, fmt=fmt, chunk_size=chunk_size, header_names=GL_MAPPING):
+        rows += len(chunk)
+        running = merge_totals(running, chunk_totals(chunk, freq))
+        if progress:
+            progress(rows)
+    if running is None:
+        raise ValueError("GL file has no rows")
+
+    keys = [c for c in running.columns if c not in ("Debit", "Credit", "Lines")]
+    return running.sort_values(keys, ignore_index=True)
+
+
+# ==============================
+# Reports
+# ==============================
+
+def trial_balance(totals):
+    """
+    One row per account: total debit and credit, and the closing balance on
+    the debit or credit side, followed by a TOTAL row.
+    """
+    keys = [c for c in totals.columns if c in ("Account_Code", "Account")]
+    tb = totals.groupby(keys, sort=True)[["Debit", "Credit", "Lines"]].sum().reset_index()
+    net = (tb["Debit"] - tb["Credit"]).round(2)
+    tb["Balance_Dr"] = net.clip(lower=0)
+    tb["Balance_Cr"] = (-net).clip(lower=0)
+
+    total = {k: "" for k in keys}
+    total[keys[-1]] = "TOTAL"
+    total.update(tb[["Debit", "Credit", "Lines", "Balance_Dr", "Balance_Cr"]].sum())
+    tb = pd.concat([tb, pd.DataFrame([total])], ignore_index=True)
+    return tb.astype({"Lines": np.int64})
+
+
+def variance(totals):
+    """
+    Net movement (debit - credit) per account and period, next to the
+    previous period's movement, the change and the change in percent.
+    Periods with no postings for an account count as zero movement; undated
+    lines are left out.
+    """
+    keys = [c for c in totals.columns if c in ("Account_Code", "Account")]
+    totals = totals[totals["Period"] != ""]
+    wide = (
+        totals.assign(Net=totals["Debit"] - totals["Credit"])
+        .pivot_table(index=keys, columns="Period", values="Net", aggfunc="sum",
+                     fill_value=0.0, sort=True)
+    )
+    long = wide.stack().rename("Net").reset_index()
+    long["Previous"] = wide.shift(1, axis=1, fill_value=0.0).stack().to_numpy()
+    long["Change"] = long["Net"] - long["Previous"]
+    previous = long["Previous"].abs().replace(0, np.nan)
+    long["Change_%"] = (long["Change"] / previous * 100).round(2)
+    return long.round({"Net": 2, "Previous": 2, "Change": 2})
+
+
+def balance_difference(tb):
+    total = tb.iloc[-1]
+    return round(total["Debit"] - total["Credit"], 2)
+
+
+def report_frames(totals):
+    return {
+        "Trial_Balance": trial_balance(totals),
+        "Periods": totals,
+        "Variance": variance(totals),
+    }
+
+
+def export_report(totals, fmt="xlsx"):
+    from gst_reco import frames_bytes
+
+    return frames_bytes(report_frames(totals), fmt)
+
+
+def main(argv=None):
+    from gst_reco import EXPORT_FORMATS, export_name
+
+    parser = argparse.ArgumentParser(description="Trial balance from a GL export")
+    parser.add_argument("gl", help="GL export (xlsx, csv or parquet)")
+    parser.add_argument("--freq", choices=list(FREQUENCIES), default="M",
+                        help="variance period: M(onth), Q(uarter) or Y(ear) of the FY")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="xlsx")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    totals = stream_totals(args.gl, freq=args.freq, chunk_size=args.chunk_size)
+    data = export_report(totals, args.format)
+
+    stem = os.path.splitext(os.path.basename(args.gl))[0]
+    out = args.out or export_name(args.format, f"{stem}_TB")
+    with open(out, "wb") as f:
+        f.write(data)
+
+    tb = trial_balance(totals)
+    print(f"{out}: {len(tb) - 1:,} accounts, {int(totals['Lines'].sum()):,} lines, "
+          f"Dr-Cr difference {balance_difference(tb):,.2f} "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
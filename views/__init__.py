@@ -0,0 +1,32 @@
+"""
+App pages, one module per page with a ``render()`` function.
+
+A page module is imported the first time its page is opened, so its
+helpers, cached resources and heavy imports (plotly, openpyxl, the engine)
+are set up once per server process instead of on every rerun.
+"""
+
+import importlib
+
+
+MENU_VIEWS = {
+    "🏠 Home": "home_page",
+    "🏦 EMI Calculator": "emi_page",
+    "🧮 Calculator": "calculator_page",
+    "📘 Taxation Hub": "taxation_page",
+    "📝 Notes": "notes_page",
+    "🌐 Portals": "portals_page",
+    "📊 GST Reconciliation": "gst_page",
+}
+
+# sidebar Tools; "GST Reco" is the GST Reconciliation menu page itself
+TOOL_VIEWS = {
+    "GST Reco": None,
+    "Trial Balance": "trial_balance_page",
+    "TDS Calc": "tds_page",
+    "History": "history_page",
+}
+
+
+def render(view):
+    importlib.import_module(f"{__name__}.{view}").render()
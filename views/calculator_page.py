@@ -0,0 +1,76 @@
+"""Calculator page."""
+
+import pandas as pd
+import streamlit as st
+
+import expression
+import gst_reco
+
+
+def render():
+    st.title("🧮 Quick Calculator")
+
+    expr = st.text_input("Enter expression (example: 20*0.01*100 or 5000*18%)")
+
+    if st.button("Compute"):
+        try:
+            st.success(expression.calculate(expr))
+        except ValueError as e:
+            st.error(str(e))
+
+    st.markdown("---")
+    st.subheader("📂 Apply to a sheet")
+    st.caption("Use column names in the expression, e.g. Taxable*18% "
+               "or [Taxable Value]*Rate% for names with spaces")
+
+    sheet_file = st.file_uploader("Sheet", type=["xlsx", "csv"], key="calc_sheet")
+    if sheet_file is not None:
+        # parsed once per upload, not on every rerun
+        file_key = getattr(sheet_file, "file_id", None) or (sheet_file.name, sheet_file.size)
+        loaded = st.session_state.get("calc_loaded")
+        if not loaded or loaded["file"] != file_key:
+            if sheet_file.name.lower().endswith(".csv"):
+                sheet = pd.read_csv(sheet_file)
+            else:
+                sheet = pd.read_excel(sheet_file)
+            loaded = st.session_state.calc_loaded = {"file": file_key, "sheet": sheet}
+        sheet = loaded["sheet"]
+        st.caption(f"{len(sheet):,} rows — columns: {', '.join(map(str, sheet.columns))}")
+
+        s1, s2 = st.columns([3, 1])
+        column_expr = s1.text_input("Column expression")
+        result_name = s2.text_input("Result column", value="Result")
+        calc_fmt = st.selectbox(
+            "Output format",
+            [f for f in gst_reco.EXPORT_FORMATS if f != "parquet"],
+            key="calc_fmt"
+        )
+
+        if column_expr:
+            # evaluated and serialised again only when one of these changes
+            key = (file_key, column_expr, result_name, calc_fmt)
+            result = st.session_state.get("calc_result")
+            if not result or result["key"] != key:
+                try:
+                    out = sheet.assign(**{result_name: expression.evaluate_columns(column_expr, sheet)})
+                except ValueError as e:
+                    result = {"key": key, "error": str(e)}
+                else:
+                    result = {
+                        "key": key,
+                        "error": None,
+                        "preview": out.head(1000),
+                        "data": gst_reco.frames_bytes({"Result": out}, calc_fmt),
+                    }
+                st.session_state.calc_result = result
+
+            if result["error"]:
+                st.error(result["error"])
+            else:
+                st.dataframe(result["preview"], use_container_width=True, hide_index=True)
+                st.download_button(
+                    "⬇ Download with result column",
+                    result["data"],
+                    file_name=gst_reco.export_name(calc_fmt, "Calculator_Result"),
+                    mime=gst_reco.EXPORT_FORMATS[calc_fmt]
+                )
@@ -0,0 +1,172 @@
+"""EMI Calculator page."""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import emi as emi_engine
+import gst_reco
+
+
+def cached(name, key, build):
+    """
+    The dict ``build()`` returns, kept in session state under ``name`` and
+    rebuilt only when ``key`` changes. A ValueError is kept as ``error``.
+    """
+    entry = st.session_state.get(name)
+    if not entry or entry["key"] != key:
+        try:
+            entry = {"key": key, "error": None, **build()}
+        except ValueError as e:
+            entry = {"key": key, "error": str(e)}
+        st.session_state[name] = entry
+    return entry
+
+
+def build_schedule(loan, rate, years, prepay_text, reset_text, keep, fmt):
+    schedule = emi_engine.amortisation_schedule(
+        loan, rate, int(years*12),
+        emi_engine.parse_events(prepay_text, "prepayment"),
+        emi_engine.parse_events(reset_text, "rate reset"),
+        keep
+    )
+    return {
+        "schedule": schedule,
+        "summary": emi_engine.schedule_summary(schedule),
+        "data": gst_reco.frames_bytes({"Schedule": schedule}, fmt),
+    }
+
+
+def build_grid(loan, rate_from, rate_to, rate_steps, years_from, years_to, fmt):
+    emi_grid, interest_grid = emi_engine.scenario_grid(
+        loan,
+        np.round(np.linspace(rate_from, rate_to, int(rate_steps)), 2),
+        np.arange(years_from, max(years_from, years_to) + 1)
+    )
+    return {
+        "emi_grid": emi_grid,
+        "interest_grid": interest_grid,
+        "data": gst_reco.frames_bytes(emi_engine.grid_frames(emi_grid, interest_grid), fmt),
+    }
+
+
+def build_portfolio(loans_file, fmt):
+    loans_file.seek(0)
+    if loans_file.name.lower().endswith(".csv"):
+        loans = pd.read_csv(loans_file)
+    else:
+        loans = pd.read_excel(loans_file)
+    portfolio = emi_engine.loan_portfolio(loans)
+    return {
+        "portfolio": portfolio,
+        "preview": portfolio.head(1000),
+        "data": gst_reco.frames_bytes({"Portfolio": portfolio}, fmt),
+    }
+
+
+def render():
+    st.title("🏦 EMI Calculator")
+
+    c1, c2, c3 = st.columns(3)
+
+    with c1:
+        loan = st.number_input("Loan (₹)", value=2000000)
+
+    with c2:
+        rate = st.number_input("Rate %", value=10.0)
+
+    with c3:
+        years = st.number_input("Years", value=5)
+
+    if st.button("Calculate"):
+        emi = round(emi_engine.monthly_emi(loan, rate, years*12), 0)
+        total = emi*years*12
+        st.success(f"Monthly EMI: ₹{emi:,.0f}")
+        st.info(f"Total Payment: ₹{total:,.0f}")
+
+    emi_fmt = st.selectbox(
+        "Export format",
+        [f for f in gst_reco.EXPORT_FORMATS if f != "parquet"],
+        key="emi_fmt"
+    )
+
+    tab_schedule, tab_grid, tab_portfolio = st.tabs(
+        ["📅 Amortisation Schedule", "🔢 Scenario Grid", "📂 Loan Portfolio"]
+    )
+
+    with tab_schedule:
+        p1, p2 = st.columns(2)
+        prepay_text = p1.text_input("Prepayments (month:amount, ...)", placeholder="12:100000, 36:50000")
+        reset_text = p2.text_input("Rate resets (month:rate %, ...)", placeholder="24:9.5")
+        keep = st.radio(
+            "After a prepayment or rate reset",
+            ["emi", "tenure"],
+            format_func={"emi": "Keep EMI, change tenure", "tenure": "Keep tenure, change EMI"}.get,
+            horizontal=True
+        )
+
+        # built and serialised again only when an input changes
+        args = (loan, rate, years, prepay_text, reset_text, keep, emi_fmt)
+        result = cached("emi_schedule", args, lambda: build_schedule(*args))
+        if result["error"]:
+            st.error(result["error"])
+        else:
+            summary = result["summary"]
+            s1, s2, s3 = st.columns(3)
+            s1.metric("Months", summary["months"])
+            s2.metric("Total Interest", f"₹{summary['total_interest']:,.0f}")
+            s3.metric("Total Paid", f"₹{summary['total_paid']:,.0f}")
+
+            st.dataframe(result["schedule"], use_container_width=True, hide_index=True)
+            st.download_button(
+                "⬇ Download Schedule",
+                result["data"],
+                file_name=gst_reco.export_name(emi_fmt, "EMI_Schedule"),
+                mime=gst_reco.EXPORT_FORMATS[emi_fmt]
+            )
+
+    with tab_grid:
+        g1, g2, g3 = st.columns(3)
+        rate_from = g1.number_input("Rate from %", value=7.0)
+        rate_to = g2.number_input("Rate to %", value=12.0)
+        rate_steps = g3.number_input("Rate steps", min_value=1, max_value=100, value=11)
+        g4, g5 = st.columns(2)
+        years_from = g4.number_input("Years from", min_value=1, value=5)
+        years_to = g5.number_input("Years to", min_value=1, value=30)
+
+        args = (loan, rate_from, rate_to, rate_steps, years_from, years_to, emi_fmt)
+        grid = cached("emi_grid", args, lambda: build_grid(*args))
+        st.markdown("**Monthly EMI**")
+        st.dataframe(grid["emi_grid"], use_container_width=True)
+        st.markdown("**Total interest**")
+        st.dataframe(grid["interest_grid"], use_container_width=True)
+        st.download_button(
+            "⬇ Download Grid",
+            grid["data"],
+            file_name=gst_reco.export_name(emi_fmt, "EMI_Scenarios"),
+            mime=gst_reco.EXPORT_FORMATS[emi_fmt]
+        )
+
+    with tab_portfolio:
+        st.caption("Sheet with Principal, Rate and Years (or Months) per loan")
+        loans_file = st.file_uploader("Loan sheet", type=["xlsx", "csv"])
+        if loans_file is not None:
+            # parsed once per upload and format, not on every rerun
+            file_key = getattr(loans_file, "file_id", None) or (loans_file.name, loans_file.size)
+            result = cached("emi_portfolio", (file_key, emi_fmt),
+                            lambda: build_portfolio(loans_file, emi_fmt))
+            if result["error"]:
+                st.error(result["error"])
+            else:
+                portfolio = result["portfolio"]
+                q1, q2, q3 = st.columns(3)
+                q1.metric("Loans", f"{len(portfolio):,}")
+                q2.metric("Total EMI", f"₹{portfolio['EMI'].sum():,.0f}")
+                q3.metric("Total Interest", f"₹{portfolio['Total_Interest'].sum():,.0f}")
+                st.dataframe(result["preview"], use_container_width=True, hide_index=True)
+                st.download_button(
+                    "⬇ Download Portfolio",
+                    result["data"],
+                    file_name=gst_reco.export_name(emi_fmt, "EMI_Portfolio"),
+                    mime=gst_reco.EXPORT_FORMATS[emi_fmt]
+                )
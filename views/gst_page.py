@@ -0,0 +1,384 @@
+"""GST Reconciliation page."""
+
+import os
+import time
+from io import BytesIO
+
+import pandas as pd
+import streamlit as st
+
+import gst_reco
+import ingest
+import instrument
+import jobs
+import reco_cache
+
+
+# seconds between job table refreshes while this session has jobs running
+JOB_POLL_SECONDS = 2
+
+
+@st.cache_resource
+def gst_template_bytes():
+    """The sample GSTR_2B / BOOKS workbook, built once per server process."""
+    sample = pd.DataFrame({
+        "Supplier_Name": ["ABC Traders", "XYZ Pvt Ltd"],
+        "GSTIN": ["27ABCDE1234F1Z5", "29PQRSX5678L1Z2"],
+        "Invoice_Date": ["01-01-2026", "02-01-2026"],
+        "Invoice_No": ["INV001", "BILL45"],
+        "IGST": [0, 0],
+        "CGST": [900, 450],
+        "SGST": [900, 450]
+    })
+
+    output = BytesIO()
+
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        sample.to_excel(writer, sheet_name="GSTR_2B", index=False)
+        sample.to_excel(writer, sheet_name="BOOKS", index=False)
+
+    return output.getvalue()
+
+
+@st.cache_resource
+def job_queue():
+    """The server's background job queue, shared by every session."""
+    return jobs.JobQueue()
+
+
+def job_table(queue, owner):
+    """Status of this session's background jobs, plus downloads of finished ones."""
+    owned = queue.list(owner)
+    if not owned:
+        st.caption("No background jobs yet")
+        return
+
+    counts = queue.counts()
+    st.caption(
+        f"Server: {counts[jobs.RUNNING]} running, {counts[jobs.QUEUED]} queued "
+        f"(max {queue.max_jobs} at once)"
+    )
+    st.dataframe(
+        pd.DataFrame([j.row() for j in owned]),
+        use_container_width=True,
+        hide_index=True,
+        column_config={"Progress": st.column_config.ProgressColumn(
+            "Progress", min_value=0, max_value=100, format="%d%%"
+        )},
+    )
+
+    done = {j.summary["file"]: j for j in owned if j.state == jobs.DONE}
+    if done:
+        import run_history
+
+        file_name = st.selectbox(
+            "Finished run", list(done),
+            format_func=lambda f: f"#{done[f].job_id} {done[f].name} → {f}"
+        )
+        if st.button("Prepare job download"):
+            st.session_state.job_download = file_name
+        if st.session_state.get("job_download") == file_name:
+            name, data = run_history.read_run_bytes(os.path.splitext(file_name)[0])
+            st.download_button(f"⬇ Download {name}", data, file_name=name)
+
+    # last job finished: one full rerun swaps the polling table for a static one
+    if not any(j.active for j in owned) and st.session_state.get("jobs_polling"):
+        st.session_state.jobs_polling = False
+        st.rerun()
+
+
+static_job_table = st.fragment(job_table)
+polling_job_table = st.fragment(job_table, run_every=JOB_POLL_SECONDS)
+
+
+def render():
+    st.title("📊 GST 2B vs Books Reconciliation Tool")
+
+    st.info("Upload GST_Reco.xlsx containing sheets: GSTR_2B and BOOKS, "
+            "or the two sheets as separate CSV / Parquet files")
+
+    st.subheader("Step 1 — Download Template")
+
+    st.download_button(
+        "⬇ Download GST Template",
+        gst_template_bytes(),
+        file_name="Friday_GST_Template.xlsx"
+    )
+
+    st.markdown("---")
+
+    st.subheader("Step 2 — Upload Filled File")
+
+    input_mode = st.radio(
+        "Input",
+        ["Excel workbook (GSTR_2B + BOOKS sheets)", "Separate GSTR_2B / BOOKS files"],
+        horizontal=True
+    )
+
+    books_file = None
+
+    if input_mode.startswith("Excel"):
+        uploaded_file = st.file_uploader(
+        "Upload filled template",
+        type=["xlsx"]
+        )
+        large_mode = st.checkbox("Large file mode (stream rows in chunks)")
+    else:
+        uploaded_file = st.file_uploader("GSTR_2B file", type=ingest.FORMATS)
+        books_file = st.file_uploader("BOOKS file", type=ingest.FORMATS)
+        large_mode = True
+
+    date_window = st.number_input(
+        "Fallback date window (days, 0 = any date)",
+        min_value=0,
+        value=0
+    )
+
+    fuzzy_threshold = st.number_input(
+        "Fuzzy invoice match threshold (0 = off)",
+        min_value=0.0,
+        max_value=1.0,
+        value=gst_reco.FUZZY_THRESHOLD,
+        step=0.05,
+        help="Similarity needed to pair near-miss invoice numbers of the same GSTIN / supplier"
+    )
+
+    workers = st.number_input(
+        "Worker processes",
+        min_value=1,
+        max_value=os.cpu_count() or 1,
+        value=1,
+        help="Very large files are matched in parallel shards; results are identical"
+    )
+
+    export_fmt = st.selectbox(
+        "Output format",
+        list(gst_reco.EXPORT_FORMATS),
+        help="CSV and Parquet are downloaded as a zip with one file per sheet"
+    )
+
+    client = st.text_input(
+        "Client (optional)",
+        help="Runs are grouped by client and month in the Home trends (runs without "
+             "a client are saved but not trended); incremental runs use the client's "
+             "own invoice ledger"
+    )
+
+    incremental = st.checkbox(
+        "Incremental run (invoice ledger)",
+        help="Only new rows are matched, together with items still open from earlier periods"
+    )
+    period = None
+    needs_client = False
+    if incremental:
+        period = st.text_input("Period", value=time.strftime("%Y-%m"))
+        import run_history
+
+        needs_client = not run_history.client_key(client)
+        if needs_client:
+            st.warning("Enter the client: each client keeps its own invoice ledger")
+
+    # ==============================
+    # RUN BUTTON
+    # ==============================
+
+    results = reco_cache.session_cache(st.session_state)
+    run_key = None
+    entry = None
+    save_history = False
+
+    if uploaded_file and (books_file or input_mode.startswith("Excel")):
+
+        run_key = reco_cache.content_key(
+            [uploaded_file, books_file],
+            tolerance=gst_reco.TOLERANCE,
+            date_window=date_window,
+            large_mode=large_mode,
+            fuzzy_threshold=fuzzy_threshold,
+            period=period,
+            client=client
+        )
+
+        if st.button("Run Reconciliation", disabled=needs_client):
+
+            progress = st.progress(0)
+            status = st.empty()
+            start_time = time.time()
+
+            def report(pct, text):
+                progress.progress(pct)
+                status.text(text)
+
+            tracker = instrument.ThrottledProgress(report)
+            stages = instrument.Stages()
+            load_times = {}
+            ledger_stats = None
+
+            if large_mode:
+                # STEP 1–3 — Stream, clean and prepare chunk by chunk
+                with stages.stage("load + prepare (streamed)") as record:
+                    gstr2b, books = ingest.load_sources(uploaded_file, books_file)
+                    record["rows"] = len(gstr2b) + len(books)
+                    record["frame_mb"] = instrument.frame_mb(gstr2b, books)
+                tracker(55, "⚙ Preparing reconciliation", force=True)
+            else:
+                # STEP 1 — Read files
+                with stages.stage("load") as record:
+                    gstr2b, books = gst_reco.load_workbook(uploaded_file, load_times)
+                    record["rows"] = len(gstr2b) + len(books)
+                    record["frame_mb"] = instrument.frame_mb(gstr2b, books)
+                tracker(15, "📂 Files loaded", force=True)
+
+                # STEP 2–3 — Clean and prepare
+                gstr2b, books = gst_reco.prepare_both(
+                    gstr2b, books, progress=tracker, stages=stages
+                )
+
+            # STEP 4 — Match
+            if incremental:
+                import ledger
+
+                tracker(60, "📒 Matching new rows against the ledger...", force=True)
+                with stages.stage("ledger match", rows=len(gstr2b) + len(books)):
+                    gstr2b, books, ledger_stats = ledger.reconcile_incremental(
+                        gstr2b, books, period, gst_reco.TOLERANCE, date_window or None,
+                        fuzzy_threshold=fuzzy_threshold, client=client
+                    )
+                tracker(100, "✅ Reconciliation Completed", force=True)
+            else:
+                gstr2b, books = gst_reco.match(
+                    gstr2b, books, gst_reco.TOLERANCE, date_window or None,
+                    progress=tracker, stages=stages,
+                    fuzzy_threshold=fuzzy_threshold,
+                    workers=workers
+                )
+
+            # STEP 5 — Finish
+            status.success("✅ Reconciliation Completed")
+
+            entry = results.put(run_key, {
+                "gstr2b": gstr2b,
+                "books": books,
+                "summary": gst_reco.summarise(gstr2b, books),
+                "load_times": load_times,
+                "stages": stages.records,
+                "seconds": round(time.time()-start_time, 2),
+                "ledger": ledger_stats,
+                "exports": {},
+            })
+            st.session_state.reco_last_key = run_key
+            save_history = True
+
+    # Reruns (downloads, page switches) reuse the cached result of this
+    # upload, or of the last run when nothing is uploaded right now
+    if entry is None:
+        entry = results.get(run_key or st.session_state.get("reco_last_key"))
+
+    if entry:
+
+        summary = entry["summary"]
+
+        st.success(f"Matched: {summary['matched']}/{summary['rows_books']}")
+
+        if entry.get("ledger"):
+            st.caption("📒 Ledger — new rows matched with items still open from earlier periods")
+            st.dataframe(pd.DataFrame(entry["ledger"]).T, use_container_width=True)
+
+        # STEP 6 — Export once per format, reuse for download and history
+        if export_fmt not in entry["exports"]:
+            export_stages = instrument.Stages()
+            export_rows = summary["rows_2b"] + summary["rows_books"]
+            with export_stages.stage(f"export ({export_fmt})", rows=export_rows):
+                entry["exports"][export_fmt] = gst_reco.export_bytes(
+                    entry["gstr2b"], entry["books"], export_fmt
+                )
+            entry["stages"] = entry["stages"] + export_stages.records
+            results.evict()
+
+        export_data = entry["exports"][export_fmt]
+
+        with st.expander(f"⏱ Run details — reconciled in {entry['seconds']} sec"):
+            st.dataframe(
+                pd.DataFrame(entry["stages"], columns=instrument.STAGE_COLUMNS),
+                use_container_width=True,
+                hide_index=True
+            )
+            if entry["load_times"]:
+                st.caption("Load time per sheet: " + " · ".join(
+                    f"{sheet} {secs:.2f}s" for sheet, secs in entry["load_times"].items()
+                ))
+
+        st.download_button(
+         "⬇ Download Reconciled File",
+             export_data,
+             file_name=gst_reco.export_name(export_fmt),
+             mime=gst_reco.EXPORT_FORMATS[export_fmt]
+        )
+
+        # =============================
+        # AUTO SAVE TO HISTORY
+        # =============================
+
+        if save_history:
+
+            import datetime
+            import run_history
+
+            timestamp = datetime.datetime.now().strftime("%d_%b_%Y_%H_%M_%S")
+            # random suffix: two sessions can save within the same second
+            suffix = os.urandom(3).hex()
+
+            run_history.save_run(
+                entry["gstr2b"],
+                entry["books"],
+                export_data,
+                gst_reco.export_name(export_fmt, f"GST_Reco_{timestamp}_{suffix}"),
+                source_name=uploaded_file.name if uploaded_file else None,
+                source_hash=run_key,
+                seconds=entry["seconds"],
+                stages=entry["stages"],
+                client=client or None,
+                period=period
+            )
+
+    # =============================
+    # BACKGROUND RUNS
+    # =============================
+
+    st.markdown("---")
+    st.subheader("Background runs")
+    st.caption(
+        "Queue one or more workbooks with the settings above. They run on the "
+        "server while you keep working, and land in History when done."
+    )
+
+    queue = job_queue()
+    owner = st.session_state.setdefault("job_owner", os.urandom(8).hex())
+
+    job_files = st.file_uploader(
+        "Workbooks (GSTR_2B + BOOKS sheets)",
+        type=["xlsx"],
+        accept_multiple_files=True,
+        key="job_files"
+    )
+
+    if job_files and st.button(f"Queue {len(job_files)} file(s)"):
+        for f in job_files:
+            queue.submit(
+                f.name, f, owner=owner,
+                tolerance=gst_reco.TOLERANCE,
+                date_window=date_window,
+                fuzzy_threshold=fuzzy_threshold,
+                workers=workers,
+                fmt=export_fmt,
+                large_mode=large_mode,
+                client=client or None,
+                source_hash=reco_cache.content_key([f])
+            )
+        st.toast(f"Queued {len(job_files)} file(s)")
+
+    if any(j.active for j in queue.list(owner)):
+        st.session_state.jobs_polling = True
+        polling_job_table(queue, owner)
+    else:
+        static_job_table(queue, owner)
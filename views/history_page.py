@@ -0,0 +1,52 @@
+"""Run history of GST reconciliations."""
+
+import streamlit as st
+
+import run_history
+
+
+def render():
+    st.header("📜 Run History")
+
+    # index sync and retention walk the whole folder: once per session
+    if "history_retention" not in st.session_state:
+        run_history.sync_index()
+        st.session_state.history_retention = run_history.apply_retention()
+    compressed, deleted = st.session_state.history_retention
+    if compressed or deleted:
+        st.caption(f"Retention: {compressed} old run(s) compressed, {deleted} removed")
+
+    f1, f2 = st.columns([3, 1])
+    search = f1.text_input("🔍 Filter by file or source name")
+    min_pct = f2.number_input("Min match %", min_value=0.0, max_value=100.0, value=0.0)
+
+    filters = {"search": search, "min_pct": min_pct or None}
+    total_runs = run_history.count_runs(**filters)
+
+    if not total_runs:
+        st.info("No history available yet")
+    else:
+        PAGE_SIZE = 25
+        pages = (total_runs - 1) // PAGE_SIZE + 1
+        page_no = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+
+        runs = run_history.list_runs(
+            limit=PAGE_SIZE, offset=(page_no - 1) * PAGE_SIZE, **filters
+        )
+        runs["size_kb"] = (runs.pop("size_bytes") / 1024).round(2)
+
+        st.dataframe(runs, use_container_width=True, hide_index=True)
+
+        # Only the selected run's file is read, and only on request
+        run_id = st.selectbox("Run", runs["run_id"])
+
+        if st.button("Prepare download"):
+            st.session_state.history_download = run_id
+
+        if st.session_state.get("history_download") == run_id:
+            file_name, data = run_history.read_run_bytes(run_id)
+            st.download_button(
+                label=f"⬇ Download {file_name}",
+                data=data,
+                file_name=file_name
+            )
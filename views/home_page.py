@@ -0,0 +1,182 @@
+"""Home dashboard."""
+
+import os
+
+import pandas as pd
+import streamlit as st
+
+import analytics
+import run_history
+
+
+# Each run leaves a small summary next to its export; the cache is keyed
+# on the file's mtime so a new run is picked up on the next rerun
+load_summary = st.cache_data(run_history.read_summary)
+
+# same for the analytics rollups
+load_rollup = st.cache_data(analytics.load_rollup)
+
+ALL_CLIENTS = "All clients"
+
+
+def dark(fig):
+    fig.update_layout(
+        paper_bgcolor="#0f172a",
+        font_color="white"
+    )
+    return fig
+
+
+def render_trends():
+    """Match rate, unmatched tax and chronic suppliers across saved runs."""
+    try:
+        months = load_rollup(analytics.MONTH_ROLLUP,
+                             mtime=analytics.rollup_mtime(analytics.MONTH_ROLLUP))
+        suppliers = load_rollup(analytics.SUPPLIER_ROLLUP,
+                                mtime=analytics.rollup_mtime(analytics.SUPPLIER_ROLLUP))
+    except ImportError as e:
+        st.info(str(e))
+        return
+
+    if months is None or months.empty or suppliers is None:
+        st.caption("Trends appear once runs with a client are saved to history")
+        return
+
+    t1, t2, t3 = st.columns([2, 1, 1])
+    client = t1.selectbox("Client", [ALL_CLIENTS] + sorted(months["client"].unique()))
+    last = t2.number_input("Months", min_value=1, max_value=240, value=12)
+    min_periods = t3.number_input("Unmatched in at least (months)", min_value=1,
+                                  max_value=240, value=min(3, last))
+    client = None if client == ALL_CLIENTS else client
+
+    import plotly.express as px
+
+    trend = analytics.monthly_trend(months, client, last)
+    g1, g2 = st.columns(2)
+    g1.plotly_chart(dark(px.line(
+        trend, x="period", y="match_pct", markers=True,
+        title="Match % per month", labels={"period": "Month", "match_pct": "Match %"}
+    )), use_container_width=True)
+    g2.plotly_chart(dark(px.bar(
+        trend, x="period", y=["unmatched_tax", "unclaimed_tax_2b"], barmode="group",
+        title="Unmatched tax per month (₹)",
+        labels={"period": "Month", "value": "₹", "variable": ""}
+    )), use_container_width=True)
+
+    st.markdown("#### Suppliers unmatched month after month")
+    chronic = analytics.chronic_suppliers(suppliers, client, last, min_periods)
+    if chronic.empty:
+        st.caption(f"No supplier was unmatched in {min_periods}+ of the last {last} months")
+        return
+    st.dataframe(chronic, use_container_width=True, hide_index=True)
+
+    pick = st.selectbox(
+        "Supplier",
+        chronic.index,
+        format_func=lambda i: f"{chronic.at[i, 'supplier'] or '(blank)'} · {chronic.at[i, 'gstin']}"
+    )
+    row = chronic.loc[pick]
+    owner = client or row["client"]
+    history = analytics.supplier_trend(suppliers, row["gstin"], row["supplier"], owner, last)
+    st.plotly_chart(dark(px.bar(
+        history, x="period", y=["matched", "unmatched"],
+        title=f"{row['supplier'] or row['gstin']} — BOOKS lines per month",
+        labels={"period": "Month", "value": "Lines", "variable": ""}
+    )), use_container_width=True)
+
+    # row-level drill-down reads only this client's partitions
+    if st.button("Show unmatched invoices"):
+        st.dataframe(
+            analytics.unmatched_lines(owner, row["gstin"] or None, row["supplier"] or None),
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+def render():
+    st.title("💼 Friday Finance Assistant")
+    st.caption("GST • TDS • Automation • Reconciliation")
+
+
+    st.markdown("### 📊 GST Reconciliation Summary")
+
+    summary_file = run_history.LATEST_SUMMARY
+
+    if os.path.exists(summary_file):
+
+        summary = load_summary(summary_file, os.path.getmtime(summary_file))
+
+        total = summary["total"]
+        matched = summary["matched"]
+        unmatched = summary["unmatched"]
+        percent = summary["match_pct"]
+
+        # ======================
+        # METRICS CARDS
+        # ======================
+
+        c1, c2, c3, c4 = st.columns(4)
+
+        c1.metric("📄 Total Invoices", f"{total:,}")
+        c2.metric("✅ Matched", f"{matched:,}")
+        c3.metric("❌ Unmatched", f"{unmatched:,}")
+        c4.metric("🎯 Match %", f"{percent}%")
+
+
+        # ======================
+        # PIE CHART
+        # ======================
+
+        # plotly is only needed for the chart; importing it costs ~1s
+        import plotly.express as px
+
+        chart_df = pd.DataFrame({
+            "Status": ["Matched", "Unmatched"],
+            "Count": [matched, unmatched]
+        })
+
+        fig = px.pie(
+        chart_df,
+        names="Status",
+        values="Count",
+        hole=0.6,
+        )
+
+        st.plotly_chart(dark(fig), use_container_width=True)
+
+        st.caption(f"Last run: {summary['timestamp']} · {summary.get('file', '')}")
+
+        if summary["suppliers"]:
+            st.markdown("#### Suppliers with most unmatched invoices")
+            st.dataframe(
+                pd.DataFrame(summary["suppliers"][:20]),
+                use_container_width=True,
+                hide_index=True
+            )
+
+    else:
+        st.info("Run GST Reconciliation first to see dashboard metrics")
+
+    st.markdown("### 📈 Trends across runs")
+    render_trends()
+
+    # ======================
+    # QUICK TOOLS
+    # ======================
+
+    st.markdown("---")
+    st.markdown("### ⚡ Quick Tools")
+
+    b1, b2, b3 = st.columns(3)
+
+    if b1.button("📊 Run GST Reconciliation"):
+        st.session_state.menu = "📊 GST Reconciliation"
+        st.rerun()
+
+    if b2.button("📘 View TDS Handbook"):
+        st.session_state.menu = "📘 Taxation Hub"
+        st.rerun()
+
+    if b3.button("🏦 EMI Calculator"):
+        st.session_state.menu = "🏦 EMI Calculator"
+        st.rerun()
@@ -0,0 +1,67 @@
+"""Notes page."""
+
+import streamlit as st
+
+import notes_store
+
+
+def render():
+    st.title("📝 Notes")
+
+    if notes_store.legacy_import_pending():
+        st.info("Found notes.txt from the previous notes page")
+        if st.button("Import notes.txt"):
+            st.success(f"Imported {notes_store.import_notes_txt():,} note(s)")
+
+    note = st.text_area("Write your note")
+    n1, n2, n3 = st.columns(3)
+    note_tags = n1.text_input("Tags (comma separated)")
+    note_client = n2.text_input("Client")
+    note_gstin = n3.text_input("GSTIN")
+
+    if st.button("Save"):
+        try:
+            notes_store.add_note(note, note_tags, note_client, note_gstin)
+            st.success("Saved")
+        except ValueError as e:
+            st.error(str(e))
+
+    st.markdown("---")
+
+    f1, f2, f3 = st.columns([3, 1, 1])
+    note_search = f1.text_input("🔍 Search notes")
+    tags = notes_store.tag_counts()
+    tag_filter = f2.selectbox("Tag", [""] + list(tags),
+                              format_func=lambda t: f"{t} ({tags[t]})" if t else "All")
+    client_filter = f3.text_input("Client filter")
+
+    filters = {"search": note_search, "tag": tag_filter or None,
+               "client": client_filter or None}
+    total_notes = notes_store.count_notes(**filters)
+
+    if not total_notes:
+        st.info("No notes found")
+    else:
+        NOTES_PAGE_SIZE = 25
+        pages = (total_notes - 1) // NOTES_PAGE_SIZE + 1
+        page_no = st.number_input(f"Page (of {pages}) — {total_notes:,} note(s)",
+                                  min_value=1, max_value=pages, value=1)
+
+        page_notes = notes_store.list_notes(
+            limit=NOTES_PAGE_SIZE, offset=(page_no - 1) * NOTES_PAGE_SIZE, **filters
+        )
+        for row in page_notes.itertuples():
+            meta = [row.created_at]
+            if row.tags:
+                meta.append(" ".join(f"#{t}" for t in row.tags.split()))
+            if row.client:
+                meta.append(f"👤 {row.client}")
+            if isinstance(row.gstin, str) and row.gstin:
+                meta.append(f"🧾 {row.gstin}")
+
+            c1, c2 = st.columns([12, 1])
+            c1.caption(" · ".join(meta))
+            c1.text(row.body)
+            if c2.button("🗑", key=f"note_del_{row.note_id}"):
+                notes_store.delete_note(row.note_id)
+                st.rerun()
@@ -0,0 +1,12 @@
+"""Portals page."""
+
+import streamlit as st
+
+
+def render():
+    st.title("🌐 Quick Portals")
+
+    st.link_button("NSE", "https://www.nseindia.com")
+    st.link_button("GST Portal", "https://www.gst.gov.in")
+    st.link_button("ITR Portal", "https://www.incometax.gov.in")
+    st.link_button("Screener", "https://www.screener.in")
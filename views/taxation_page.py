@@ -0,0 +1,19 @@
+"""Taxation Hub page."""
+
+import streamlit as st
+
+import tds
+
+
+def render():
+    st.title("📘 TDS Handbook – Updated FY 2025-26 (AY 2026-27)")
+    st.info("Includes latest amended thresholds & rates (194I, 194J etc)")
+
+    search = st.text_input("🔍 Search section or keyword")
+
+    for row in tds.search_sections(search):
+        with st.expander(f"{row['Section']} – {row['Nature']}"):
+            st.write(f"**Threshold:** {row['Threshold']}")
+            st.write(f"**Rate:** {row['Rate']}")
+            if "Notes" in row:
+                st.write(f"**Notes:** {row['Notes']}")
@@ -0,0 +1,69 @@
+"""TDS Calc tool."""
+
+import streamlit as st
+
+import gst_reco
+import tds
+
+
+@st.cache_resource
+def ledger_template_csv():
+    return tds.create_ledger_template().to_csv(index=False)
+
+
+def render():
+    st.header("🧾 Bulk TDS Calculator")
+    st.caption("Upload a payment ledger with Party, Section, Date and Amount "
+               "(PAN and Deductee Type optional). Single-payment and yearly / monthly "
+               "thresholds are applied per deductee, section and financial year.")
+
+    st.download_button(
+        "⬇ Download Ledger Template",
+        ledger_template_csv(),
+        file_name="Friday_TDS_Ledger.csv"
+    )
+
+    ledger_file = st.file_uploader("Payment ledger", type=["xlsx", "csv", "parquet"])
+    tds_fmt = st.selectbox("Schedule format", list(gst_reco.EXPORT_FORMATS), key="tds_fmt")
+
+    if ledger_file is not None and st.button("Compute TDS"):
+        try:
+            with st.spinner("Computing deduction schedule..."):
+                schedule = tds.deduction_schedule(tds.load_ledger(ledger_file))
+            st.session_state.tds_result = {
+                "file": ledger_file.name,
+                "schedule": schedule,
+                "summary": tds.summarise_schedule(schedule),
+                "exports": {},
+            }
+        except ValueError as e:
+            st.error(str(e))
+
+    result = st.session_state.get("tds_result")
+    if result and ledger_file is not None and result["file"] == ledger_file.name:
+        schedule = result["schedule"]
+
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Payments", f"{len(schedule):,}")
+        c2.metric("TDS base", f"₹{schedule['TDS_Base'].sum():,.0f}")
+        c3.metric("TDS", f"₹{schedule['TDS_Amount'].sum():,.0f}")
+
+        not_computed = int((schedule["TDS_REMARK"] == "NOT COMPUTED").sum())
+        if not_computed:
+            st.warning(f"{not_computed:,} line(s) with a section the calculator "
+                       "can't compute (slab / DTAA rates or unknown section)")
+
+        st.subheader("Summary by deductee")
+        st.dataframe(result["summary"], use_container_width=True, hide_index=True)
+
+        st.subheader("Deduction schedule (first 1,000 lines)")
+        st.dataframe(schedule.head(1000), use_container_width=True, hide_index=True)
+
+        if tds_fmt not in result["exports"]:
+            result["exports"][tds_fmt] = tds.export_schedule(schedule, tds_fmt)
+        st.download_button(
+            "⬇ Download Deduction Schedule",
+            result["exports"][tds_fmt],
+            file_name=gst_reco.export_name(tds_fmt, "TDS_Schedule"),
+            mime=gst_reco.EXPORT_FORMATS[tds_fmt]
+        )
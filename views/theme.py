@@ -0,0 +1,73 @@
+"""Page theme (CSS and the cursor-glow script), injected on every rerun."""
+
+THEME = """
+<style>
+
+/* ===== BACKGROUND ===== */
+.stApp {
+    background-color: #000000;
+    color: white;
+}
+
+/* ===== SIDEBAR ===== */
+section[data-testid="stSidebar"] {
+    background-color: #0a0a0a;
+}
+
+/* ===== TEXT ===== */
+h1, h2, h3, h4, h5, h6, p, label, span, div {
+    color: white !important;
+}
+
+/* ===== KPI CARDS ===== */
+[data-testid="stMetric"] {
+    background-color: #111111;
+    border-radius: 14px;
+    padding: 18px;
+    border: 1px solid #222;
+    transition: 0.3s;
+}
+
+[data-testid="stMetric"]:hover {
+    box-shadow: 0 0 20px rgba(255,255,255,0.15);
+}
+
+/* ===== BUTTONS ===== */
+.stButton>button,
+.stDownloadButton>button {
+    background-color: white;
+    color: black;
+    border-radius: 8px;
+    font-weight: 600;
+    border: none;
+}
+
+/* ===== FILE UPLOADER ===== */
+[data-testid="stFileUploader"] {
+    background-color: #111;
+    border-radius: 12px;
+}
+
+/* ===== CURSOR SPILL EFFECT ===== */
+body::after {
+    content: "";
+    position: fixed;
+    width: 300px;
+    height: 300px;
+    pointer-events: none;
+    border-radius: 50%;
+    background: radial-gradient(circle, rgba(255,255,255,0.08) 0%, transparent 60%);
+    transform: translate(-50%, -50%);
+    left: var(--x);
+    top: var(--y);
+}
+
+</style>
+
+<script>
+document.addEventListener("mousemove", (e) => {
+    document.body.style.setProperty('--x', e.clientX + 'px');
+    document.body.style.setProperty('--y', e.clientY + 'px');
+});
+</script>
+"""
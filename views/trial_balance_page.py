@@ -0,0 +1,67 @@
+"""Trial Balance tool."""
+
+import streamlit as st
+
+import gst_reco
+import trial_balance
+
+
+def render():
+    st.header("📒 Trial Balance")
+    st.caption("Upload a GL export with Account, Date and Debit / Credit "
+               "(or Amount with Dr/Cr). Rows are read in chunks, so very large "
+               "ledgers stay within a fixed amount of memory.")
+
+    gl_file = st.file_uploader("GL export", type=["xlsx", "csv", "parquet"])
+    freq = st.selectbox(
+        "Variance period",
+        list(trial_balance.FREQUENCIES),
+        format_func=trial_balance.FREQUENCIES.get
+    )
+    tb_fmt = st.selectbox("Output format", list(gst_reco.EXPORT_FORMATS), key="tb_fmt")
+
+    if gl_file is not None and st.button("Build Trial Balance"):
+        status = st.empty()
+        try:
+            totals = trial_balance.stream_totals(
+                gl_file, freq=freq,
+                progress=lambda rows: status.text(f"Read {rows:,} lines...")
+            )
+            st.session_state.tb_result = {
+                "file": gl_file.name,
+                "freq": freq,
+                "tb": trial_balance.trial_balance(totals),
+                "variance": trial_balance.variance(totals),
+                "totals": totals,
+                "exports": {},
+            }
+            status.empty()
+        except ValueError as e:
+            status.empty()
+            st.error(str(e))
+
+    result = st.session_state.get("tb_result")
+    if (result and gl_file is not None and result["file"] == gl_file.name
+            and result["freq"] == freq):
+        tb = result["tb"]
+        total = tb.iloc[-1]
+
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Total Debit", f"₹{total['Debit']:,.2f}")
+        c2.metric("Total Credit", f"₹{total['Credit']:,.2f}")
+        c3.metric("Difference", f"₹{trial_balance.balance_difference(tb):,.2f}")
+
+        st.subheader("Trial Balance")
+        st.dataframe(tb, use_container_width=True, hide_index=True)
+
+        st.subheader("Period-over-period variance")
+        st.dataframe(result["variance"], use_container_width=True, hide_index=True)
+
+        if tb_fmt not in result["exports"]:
+            result["exports"][tb_fmt] = trial_balance.export_report(result["totals"], tb_fmt)
+        st.download_button(
+            "⬇ Download Trial Balance",
+            result["exports"][tb_fmt],
+            file_name=gst_reco.export_name(tb_fmt, "Trial_Balance"),
+            mime=gst_reco.EXPORT_FORMATS[tb_fmt]
+        )